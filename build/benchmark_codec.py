@@ -0,0 +1,82 @@
+"""
+Benchmarks hero struct decoding and encoding in savefiles: codec unpack and pack
+of whole hero, columnar decoding of all heroes at once, and hero subplugins
+parsing and serializing their categories.
+
+Usage: python benchmark_codec.py SAVEFILE [SAVEFILE ...] [--repeat N]
+
+@created   18.10.2026
+@modified  18.10.2026
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from h3sed import conf
+from h3sed import metadata
+from h3sed import plugins
+
+
+def measure(func, count, repeat):
+    """Returns best microseconds per item from calling func repeat times over count items."""
+    result = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = (time.time() - start) * 1E6 / max(count, 1)
+        result = elapsed if result is None else min(result, elapsed)
+    return result
+
+
+def run(filenames, repeat):
+    """Decodes and encodes heroes in each savefile, prints timings per hero, returns success."""
+    conf.CacheEnabled = False
+    plugins.init()
+    success = True
+    print("%-30s %6s %6s %8s %8s %8s  %s" % ("File", "Heroes", "Size", "Unpack", "Pack",
+                                              "Columns", "Subplugins parse/serialize"))
+    for filename in filenames:
+        savefile = metadata.Savefile(filename)
+        scanner = plugins.hero.HeroScanner(savefile)
+        scanner.feed(savefile.raw, final=True)
+        heroes = scanner.heroes()
+        pos = plugins.adapt(scanner, "pos", plugins.hero.POS)
+        codec = plugins.hero.make_codec(pos, savefile.version)
+        fields = [codec.unpack(h.bytes) for h in heroes]
+        same = all(codec.pack(h.bytes, {}) == h.bytes for h in heroes)
+        success = success and same
+
+        t_unpack = measure(lambda: [codec.unpack(h.bytes) for h in heroes], len(heroes), repeat)
+        t_pack   = measure(lambda: [codec.pack(h.bytes, f) for h, f in zip(heroes, fields)],
+                           len(heroes), repeat)
+        t_columns = measure(lambda: plugins.hero.make_columns(heroes, pos, savefile.version),
+                            len(heroes), repeat)
+        subtimes = []
+        for p in plugins.hero.PLUGINS:
+            instance = p["module"].factory(savefile, scanner, None)
+            states = instance.parse(heroes)
+            def serialize():
+                for hero, state in zip(heroes, states):
+                    instance._hero, instance._state = hero, state
+                    hero.state0[p["name"]] = state
+                    instance.serialize()
+            t_parse  = measure(lambda: instance.parse(heroes), len(heroes), repeat)
+            t_serial = measure(serialize, len(heroes), repeat)
+            subtimes.append("%s %.1f/%.1fus" % (p["name"], t_parse, t_serial))
+
+        print("%-30s %6s %6s %6.1fus %6.1fus %6.1fus  %s%s" % (
+              os.path.basename(filename)[:30], len(heroes), codec.size, t_unpack, t_pack, t_columns,
+              ", ".join(subtimes), "" if same else "  MISMATCH: pack does not round-trip"))
+    return success
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("FILE", nargs="+", help="Heroes3 savefile to read")
+    parser.add_argument("--repeat", type=int, default=3, help="times to process each file, "
+                        "taking best time (default 3)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.FILE, args.repeat) else 1)
@@ -0,0 +1,61 @@
+"""
+Benchmarks hero scanning in savefiles: regex scanner against NumPy-vectorized
+scanner, verifying that both find the same heroes.
+
+Usage: python benchmark_scanner.py SAVEFILE [SAVEFILE ...] [--repeat N]
+
+@created   18.10.2026
+@modified  18.10.2026
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from h3sed import conf
+from h3sed import metadata
+from h3sed import plugins
+
+
+def scan(savefile, vectorized):
+    """Returns heroes found in savefile contents, as [(name, span), ], and seconds taken."""
+    conf.VectorizedScan = vectorized
+    start = time.time()
+    scanner = plugins.hero.HeroScanner(savefile)
+    scanner.feed(savefile.raw, final=True)
+    result = [(x.name, x.span) for x in scanner.heroes()]
+    return result, time.time() - start
+
+
+def run(filenames, repeat):
+    """Scans each savefile with both scanners, prints timings, returns success."""
+    conf.CacheEnabled = False
+    plugins.init()
+    success = True
+    print("%-30s %8s %7s %10s %10s %8s" % ("File", "Size", "Heroes", "Regex", "NumPy", "Speedup"))
+    for filename in filenames:
+        savefile = metadata.Savefile(filename)
+        times = {}
+        for vectorized in (False, True):
+            for _ in range(repeat):
+                heroes, elapsed = scan(savefile, vectorized)
+                times[vectorized] = min(elapsed, times.get(vectorized, elapsed))
+            if not vectorized: heroes0 = heroes
+        same = (heroes == heroes0)
+        success = success and same
+        print("%-30s %7.1fM %7s %9.3fs %9.3fs %7.1fx%s" % (
+              os.path.basename(filename)[:30], len(savefile.raw) / 2.**20, len(heroes0),
+              times[False], times[True], times[False] / max(times[True], 1e-6),
+              "" if same else "  MISMATCH: %s vs %s heroes" % (len(heroes0), len(heroes))))
+    return success
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("FILE", nargs="+", help="Heroes3 savefile to scan")
+    parser.add_argument("--repeat", type=int, default=3, help="times to scan each file, "
+                        "taking best time (default 3)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.FILE, args.repeat) else 1)
@@ -48,7 +48,7 @@ atexit.register(cleanup)
 
 a = Analysis(
     [entrypoint],
-    excludes=["FixTk", "numpy", "tcl", "tk", "_tkinter", "tkinter", "Tkinter"],
+    excludes=["FixTk", "tcl", "tk", "_tkinter", "tkinter", "Tkinter"],
     hiddenimports=hiddenimports,
 )
 a.datas = a.datas + datas
@@ -53,6 +53,7 @@ setuptools.setup(
     keywords             = "homm homm3 heroes3 savegame",
 
     install_requires     = ["pyyaml", "step-template>=0.0.4", "wxPython>=4.0"],
+    extras_require       = {"fast": ["numpy"]}, # Vectorized scanning, backup chunking, .npz export
     entry_points         = {"gui_scripts": ["{0} = {0}.main:run".format(PACKAGE)]},
 
     package_dir          = {"": "src"},
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Catalog of savefile metadata in an SQLite database, populated by a background worker:
+map name and description, game version, heroes, file modification time and size.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import logging
+import os
+try: import queue  # Py3
+except ImportError: import Queue as queue  # Py2
+import sqlite3
+import threading
+
+from . lib import util
+from . import conf
+from . import metadata
+from . import plugins
+
+logger = logging.getLogger(__name__)
+
+
+class Catalog(object):
+    """
+    Savefile metadata catalog, one row per file.
+
+    Directories are scanned in a background thread, parsing only files
+    not yet cataloged or changed in modification time or size since.
+    Files are decompressed only up to the end of hero section.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS savefiles (
+          path      TEXT PRIMARY KEY,
+          directory TEXT NOT NULL,
+          filename  TEXT NOT NULL,
+          mtime     REAL NOT NULL,
+          size      INTEGER NOT NULL,
+          version   TEXT,
+          name      TEXT,
+          "desc"    TEXT,
+          herocount INTEGER,
+          heroes    TEXT,
+          error     TEXT
+        );
+        CREATE INDEX IF NOT EXISTS savefiles_directory ON savefiles (directory);
+    """
+
+    """Columns searched for filter text."""
+    SEARCH_COLUMNS = ["filename", "version", "name", "desc", "heroes"]
+
+
+    def __init__(self, path, callback=None):
+        """
+        @param   path      path to SQLite database file, created if missing
+        @param   callback  function(directory, [path, ]) invoked from worker thread
+                           after directory has been scanned, with changed file paths
+        """
+        self.path     = path
+        self.callback = callback
+        self._db      = None
+        self._lock    = threading.RLock()
+        self._queue   = queue.Queue()
+        self._thread  = None
+        self._closed  = False
+
+
+    def get(self, path):
+        """Returns catalog data for file as dict, or None if not cataloged or changed on disk."""
+        try: stat = os.stat(path)
+        except Exception: return None
+        with self._lock:
+            row = self._execute("SELECT * FROM savefiles WHERE path = ?",
+                                [self._key(path)]).fetchone()
+        if not row or (row["mtime"], row["size"]) != (stat.st_mtime, stat.st_size): return None
+        return self._make_item(row)
+
+
+    def search(self, directory, text=""):
+        """
+        Returns cataloged files in directory matching filter text, newest first.
+
+        @param   text  words to match in filename, game version, map name and description,
+                       or hero names; all words must match, case-insensitively
+        @return        [{path, directory, filename, mtime, size, version, name, desc, herocount, heroes}, ]
+        """
+        sql, args = "SELECT * FROM savefiles WHERE directory = ? AND error IS NULL", [self._key(directory)]
+        for word in text.split():
+            column = " || ' ' || ".join("COALESCE(\"%s\", '')" % x for x in self.SEARCH_COLUMNS)
+            sql += " AND (%s) LIKE ? ESCAPE '\\'" % column
+            args.append("%%%s%%" % word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_"))
+        sql += " ORDER BY mtime DESC"
+        with self._lock:
+            rows = self._execute(sql, args).fetchall()
+        return [self._make_item(x) for x in rows]
+
+
+    def queue(self, directory):
+        """Queues directory for scanning in background thread, started if not running."""
+        self._queue.put(directory)
+        with self._lock:
+            if self._thread and self._thread.is_alive(): return
+            self._thread = threading.Thread(target=self._run, name="h3sed-catalog")
+            self._thread.daemon = True
+            self._thread.start()
+
+
+    def refresh(self, directory):
+        """
+        Updates catalog rows for savefiles in directory, parsing new and changed files,
+        dropping rows of files no longer present. Returns paths of updated files.
+        """
+        extensions = tuple(x.lower() for _, exts in plugins.adapt(
+            None, "file_extensions", conf.FileExtensions
+        ) for x in exts)
+        files = {}  # {path: os.stat_result}
+        for name in os.listdir(directory) if os.path.isdir(directory) else ():
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(extensions): continue # for name
+            try: stat = os.stat(path)
+            except Exception: continue # for name
+            if os.path.isfile(path): files[self._key(path)] = stat
+
+        with self._lock:
+            rows = self._execute("SELECT path, mtime, size FROM savefiles WHERE directory = ?",
+                                 [self._key(directory)]).fetchall()
+        known = {x["path"]: (x["mtime"], x["size"]) for x in rows}
+        gone = [x for x in known if x not in files]
+        result = [x for x in sorted(files) if known.get(x) != (files[x].st_mtime, files[x].st_size)]
+        for i, path in enumerate(result):
+            if self._closed: return result[:i]
+            self._update(path, files[path])
+        if gone:
+            with self._lock:
+                self._db.executemany("DELETE FROM savefiles WHERE path = ?", [[x] for x in gone])
+                self._db.commit()
+        if result or gone:
+            logger.info("Cataloged %s in %s.", util.plural("changed savefile", result), directory)
+        return result + gone
+
+
+    def close(self):
+        """Stops background worker after file being parsed, closes database."""
+        self._closed = True
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+        with self._lock:
+            if self._db: self._db.close()
+            self._db = None
+
+
+    def _update(self, path, stat):
+        """Parses savefile header and hero names, stores catalog row."""
+        data = dict(path=path, directory=os.path.dirname(path),
+                    filename=os.path.basename(path), mtime=stat.st_mtime,
+                    size=stat.st_size, version=None, name=None, desc=None,
+                    herocount=None, heroes=None, error=None)
+        try:
+            savefile = metadata.Savefile(path, header_only=True)
+            scanner = plugins.scanners(savefile).get("hero")
+            if scanner: scanner.scan_file()
+            names = [x.name for x in scanner.heroes()] if scanner else []
+            data.update(version=savefile.version, name=savefile.mapdata.get("name"),
+                        desc=savefile.mapdata.get("desc"), herocount=len(names),
+                        heroes="\n".join(names))
+        except Exception as e:
+            logger.info("Error cataloging %s: %s", path, e)
+            data.update(error=util.format_exc(e))
+        sql = "INSERT OR REPLACE INTO savefiles (%s) VALUES (%s)" % \
+              (", ".join('"%s"' % x for x in data), ", ".join("?" * len(data)))
+        with self._lock:
+            self._execute(sql, list(data.values()))
+            self._db.commit()
+
+
+    def _run(self):
+        """Background worker, scans queued directories until stopped."""
+        while True:
+            directory = self._queue.get()
+            if directory is None: break # while
+            queued = [directory]
+            while not self._queue.empty():  # Merge repeated requests
+                item = self._queue.get()
+                if item is None: return
+                if item not in queued: queued.append(item)
+            for directory in queued:
+                try: paths = self.refresh(directory)
+                except Exception:
+                    logger.exception("Error cataloging savefiles in %s.", directory)
+                    continue # for directory
+                if paths and self.callback: self.callback(directory, paths)
+
+
+    def _execute(self, sql, args=()):
+        """Executes SQL in database, opened and initialized if not open, returns cursor."""
+        if not self._db:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory): os.makedirs(directory)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.executescript(self.SCHEMA)
+        return self._db.execute(sql, args)
+
+
+    def _key(self, path):
+        """Returns path in catalog form."""
+        return os.path.abspath(path)
+
+
+    def _make_item(self, row):
+        """Returns database row as dict, with heroes as list."""
+        result = dict(zip(row.keys(), row))
+        result["heroes"] = result["heroes"].split("\n") if result["heroes"] else []
+        return result
@@ -9,7 +9,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     14.03.2020
-@modified    25.06.2024
+@modified    18.10.2026
 ------------------------------------------------------------------------------
 """
 try: from ConfigParser import RawConfigParser                 # Py2
@@ -42,6 +42,15 @@ else:
     ResourceDirectory = os.path.join(ApplicationDirectory, "res")
     EtcDirectory = os.path.join(ApplicationDirectory, "etc")
 
+"""Directory for deduplicated savefile backups."""
+BackupDirectory = os.path.join(EtcDirectory, "backups")
+
+"""Directory for cached decompressed savefiles."""
+CacheDirectory = os.path.join(EtcDirectory, "cache")
+
+"""Path to database file of cataloged savefile metadata."""
+CatalogFile = os.path.join(EtcDirectory, "catalog.db")
+
 """Name of file where FileDirectives are kept."""
 ConfigFile = "%s.ini" % os.path.join(EtcDirectory, Name.lower())
 
@@ -52,8 +61,10 @@ FileDirectives = [
 ]
 """List of user-modifiable attributes, saved if changed from default."""
 OptionalFileDirectives = [
-    "FileExtensions", "HeroToggles", "MaxConsoleHistory", "MaxRecentFiles",
-    "PopupUnexpectedErrors", "Positions", "SavegameNewFormat", "StatusFlashLength",
+    "BackupCount", "BackupDays", "CacheEnabled", "CatalogEnabled", "CompressionLevel",
+    "CompressionWorkers", "FileExtensions", "HeroToggles", "MaxCacheSize", "MaxConsoleHistory",
+    "MaxRecentFiles", "PopupUnexpectedErrors", "Positions", "SavegameNewFormat",
+    "ScanTimeBudget", "StatusFlashLength", "VectorizedScan", "WatchFiles", "WatchInterval",
 ]
 Defaults = {}
 
@@ -62,9 +73,27 @@ Defaults = {}
 """Current selected path in directory list."""
 SelectedPath = None
 
+"""Cache decompressed savefiles on disk, for faster reopening."""
+CacheEnabled = True
+
+"""Catalog savefile metadata in selected directory, for filtering files list."""
+CatalogEnabled = True
+
 """Create a backup of savegame file before saving edits."""
 Backup = True
 
+"""Number of latest backups to keep per savefile."""
+BackupCount = 20
+
+"""Number of days to keep one daily backup per savefile for, beyond latest backups."""
+BackupDays = 30
+
+"""Compression level for saving savefiles, 1..9."""
+CompressionLevel = 6
+
+"""Number of parallel threads for compressing savefiles, 0 for CPU count."""
+CompressionWorkers = 0
+
 """Confirm on closing files with unsaved changes."""
 ConfirmUnsaved = True
 
@@ -93,6 +122,18 @@ RecentHeroes = []
 """Whether to assume new savegame format when ambiguous e.g. updated Armageddon's Blade."""
 SavegameNewFormat = True
 
+"""Seconds allowed for hero search in one savefile region, before switching to linear-time matching."""
+ScanTimeBudget = 0.5
+
+"""Find hero candidates in savefiles with vectorized NumPy checks, if NumPy available."""
+VectorizedScan = True
+
+"""Whether to watch opened savefiles for changes on disk and refresh automatically."""
+WatchFiles = False
+
+"""Interval for checking watched savefiles for changes, in milliseconds."""
+WatchInterval = 2000
+
 """Main window position, (x, y)."""
 WindowPosition = None
 
@@ -119,6 +160,9 @@ MinWindowSize = (500, 400)
 """Console window size in pixels, (width, height)."""
 ConsoleSize = (600, 300)
 
+"""Maximum total size of cached decompressed savefiles, in bytes."""
+MaxCacheSize = 256 * 2**20
+
 """Maximum number of console history commands to store."""
 MaxConsoleHistory = 1000
 
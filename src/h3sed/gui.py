@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     14.03.2020
-@modified    25.06.2024
+@modified    18.10.2026
 ------------------------------------------------------------------------------
 """
 import datetime
@@ -17,7 +17,6 @@ import math
 import os
 import shutil
 import sys
-import tempfile
 import time
 
 import step
@@ -28,10 +27,13 @@ import wx.lib.agw.flatnotebook
 import wx.lib.agw.labelbook
 import wx.lib.newevent
 
+from h3sed.lib import archives
+from h3sed.lib import binpatch
 from h3sed.lib import controls
 from h3sed.lib.controls import ColourManager
 from h3sed.lib import util
 from h3sed.lib import wx_accel
+from h3sed import catalog
 from h3sed import conf
 from h3sed import guibase
 from h3sed import images
@@ -51,6 +53,9 @@ PluginEvent,       EVT_PLUGIN        = wx.lib.newevent.NewCommandEvent()
 class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
     """Program main window."""
 
+    """Milliseconds to wait after edit before applying files filter."""
+    SEARCH_INTERVAL = 300
+
     def __init__(self):
         # Override default wx images with ones from 4.1.1 for better looks
         art_imgs = {wx.ART_COPY:  images.ToolbarCopy,  wx.ART_FILE_OPEN: images.ToolbarFileOpen,
@@ -75,6 +80,9 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.files = {} # {filename: {name, title, savefile, page}, }
         self.flags = {} # {name: various flags for UI flow}
         self.page_file_latest = None  # Last opened savefile page
+        self.catalog = catalog.Catalog(conf.CatalogFile, self.on_catalog_update) \
+                       if conf.CatalogEnabled else None
+        self.search_timer = None  # wx.CallLater for applying files filter
         # List of Notebook pages user has visited, used for choosing page to
         # show when closing one.
         self.pages_visited = []
@@ -122,6 +130,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.Bind(EVT_OPEN_SAVEFILE, self.on_open_savefile_event)
         self.Bind(EVT_SAVEFILE_PAGE, self.on_savefile_page_event)
 
+        self.Bind(wx.EVT_ACTIVATE, self.on_activate)
         self.Bind(wx.EVT_CLOSE, self.on_exit)
         self.Bind(wx.EVT_SIZE, self.on_size)
         self.Bind(wx.EVT_MOVE, self.on_move)
@@ -207,13 +216,26 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         button_open    = self.button_open    = wx.Button(page, label="&Open")
         button_refresh = self.button_refresh = wx.Button(page, label="&Refresh")
         button_browse  = self.button_browse  = wx.Button(page, label="&Browse..")
+        label_info  = self.label_info  = wx.StaticText(page, style=wx.ST_ELLIPSIZE_END)
+        search_files = self.search_files = wx.SearchCtrl(page, size=(200, -1))
         dir_ctrl = self.dir_ctrl = wx.GenericDirCtrl(page, filter="*.*", style=wx.DIRCTRL_SHOW_FILTERS)
+        list_files = self.list_files = wx.ListCtrl(page, style=wx.LC_REPORT | wx.LC_SINGLE_SEL)
 
         text_file.SetEditable(False)
         button_open.SetDefault()
         button_open.ToolTip    = "Open currently selected file"
         button_refresh.ToolTip = "Refresh file panel  (F5)"
         button_browse.ToolTip  = "Open dialog for selecting a file"
+        search_files.SetDescriptiveText("Filter files")
+        search_files.ShowSearchButton(True)
+        search_files.ShowCancelButton(True)
+        search_files.ToolTip = "Filter savefiles in current directory on filename, " \
+                               "game version, map name and description, or hero names"
+        search_files.Show(bool(self.catalog))
+        for i, (label, width) in enumerate([("File", 150), ("Map", 200), ("Version", 120),
+                                            ("Heroes", 60), ("Modified", 140), ("Size", 80)]):
+            list_files.InsertColumn(i, label, width=width)
+        list_files.Hide()
         dir_ctrl.ShowHidden(True)
         choice, tree = dir_ctrl.GetFilterListCtrl(), dir_ctrl.GetTreeCtrl()
         ColourManager.Manage(dir_ctrl, "ForegroundColour", wx.SYS_COLOUR_WINDOWTEXT)
@@ -221,6 +243,8 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         # Tree colours not get updated automatically from parent control
         ColourManager.Manage(tree, "ForegroundColour", wx.SYS_COLOUR_WINDOWTEXT)
         ColourManager.Manage(tree, "BackgroundColour", wx.SYS_COLOUR_WINDOW)
+        ColourManager.Manage(list_files, "ForegroundColour", wx.SYS_COLOUR_WINDOWTEXT)
+        ColourManager.Manage(list_files, "BackgroundColour", wx.SYS_COLOUR_WINDOW)
 
         page.Bind(wx.EVT_CHAR_HOOK,                    self.on_key_dir_ctrl)
         dir_ctrl.Bind(wx.EVT_CHAR_HOOK,                self.on_key_dir_ctrl)
@@ -232,13 +256,22 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         button_browse.Bind(wx.EVT_BUTTON,              self.on_browse)
         button_open.Bind(wx.EVT_BUTTON,                self.on_open_current_savefile)
         button_refresh.Bind(wx.EVT_BUTTON,             lambda e: self.refresh_dir_ctrl())
+        search_files.Bind(wx.EVT_CHAR,                 self.on_search_files)
+        search_files.Bind(wx.EVT_TEXT,                 self.on_search_files)
+        list_files.Bind(wx.EVT_LIST_ITEM_SELECTED,     self.on_select_list_files)
+        list_files.Bind(wx.EVT_LIST_ITEM_ACTIVATED,    self.on_open_from_list_files)
 
         hsizer.Add(text_file,      border=5, proportion=1, flag=wx.BOTTOM | wx.GROW)
         hsizer.Add(button_open,    border=5, flag=wx.BOTTOM | wx.LEFT)
         hsizer.Add(button_refresh, border=5, flag=wx.BOTTOM | wx.LEFT)
         hsizer.Add(button_browse,  border=5, flag=wx.BOTTOM | wx.LEFT)
+        hsizer2 = wx.BoxSizer(wx.HORIZONTAL)
+        hsizer2.Add(label_info,   proportion=1, flag=wx.ALIGN_CENTER_VERTICAL)
+        hsizer2.Add(search_files, border=5, flag=wx.LEFT)
         sizer.Add(hsizer, border=10, flag=wx.ALL ^ wx.BOTTOM | wx.GROW)
-        sizer.Add(dir_ctrl, border=10, proportion=1, flag=wx.ALL ^ wx.TOP | wx.GROW)
+        sizer.Add(hsizer2, border=10, flag=wx.LEFT | wx.RIGHT | wx.BOTTOM | wx.GROW)
+        sizer.Add(dir_ctrl,   border=10, proportion=1, flag=wx.ALL ^ wx.TOP | wx.GROW)
+        sizer.Add(list_files, border=10, proportion=1, flag=wx.ALL ^ wx.TOP | wx.GROW)
 
         def after():
             choice.Size = (1, choice.BestSize[1]) # Can be set too high
@@ -263,12 +296,22 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         menu_reload = self.menu_reload = menu_file.Append(
             wx.ID_ANY, "Re&load", "Reload savefile, losing any current changes"
         )
+        menu_restore = self.menu_restore = menu_file.Append(
+            wx.ID_ANY, "Restore from &backup...", "Replace savefile with a previous version from backups"
+        )
         menu_save = self.menu_save = menu_file.Append(
             wx.ID_ANY, "&Save", "Save the active file"
         )
         menu_save_as = self.menu_save_as = menu_file.Append(
             wx.ID_ANY, "Save &as...", "Save the active file under a new name"
         )
+        menu_file.AppendSeparator()
+        menu_export_patch = self.menu_export_patch = menu_file.Append(
+            wx.ID_ANY, "Export changes as pa&tch...", "Save unsaved changes as a patch file, for applying to other savefiles"
+        )
+        menu_apply_patch = self.menu_apply_patch = menu_file.Append(
+            wx.ID_ANY, "A&pply patch...", "Apply changes from a patch file to the active savefile, or to chosen savefiles on disk"
+        )
         menu_recent = wx.Menu()
         menu_file.AppendSubMenu(menu_recent, "&Recent files", "Recently opened files")
         menu_file.AppendSeparator()
@@ -278,7 +321,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         menu_options = wx.Menu()
         menu_file.AppendSubMenu(menu_options, "Opt&ions")
         menu_backup = self.menu_backup = menu_options.Append(
-            wx.ID_ANY, "&Back up files before saving", "Create backup copy of savefile before saving changes",
+            wx.ID_ANY, "&Back up files before saving", "Store previous version of savefile in backups before saving changes",
             kind=wx.ITEM_CHECK
         )
         menu_backup.Check(conf.Backup)
@@ -332,7 +375,8 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
             wx.ID_ANY, "&About %s" % conf.Title,
             "Show program information and copyright")
 
-        for x in (menu_close, menu_reload, menu_save, menu_save_as): x.Enable(False)
+        for x in (menu_close, menu_reload, menu_restore, menu_save, menu_save_as,
+                  menu_export_patch): x.Enable(False)
         for x in menu_edit.MenuItems: x.Enable(False)
 
         self.history_file = wx.FileHistory(conf.MaxRecentFiles)
@@ -350,8 +394,11 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.Bind(wx.EVT_MENU, self.on_open_savefile,    menu_open)
         self.Bind(wx.EVT_MENU, self.on_close_savefile,   menu_close)
         self.Bind(wx.EVT_MENU, self.on_reload_savefile,  menu_reload)
+        self.Bind(wx.EVT_MENU, self.on_restore_savefile, menu_restore)
         self.Bind(wx.EVT_MENU, self.on_save_savefile,    menu_save)
         self.Bind(wx.EVT_MENU, self.on_save_savefile_as, menu_save_as)
+        self.Bind(wx.EVT_MENU, self.on_export_patch,     menu_export_patch)
+        self.Bind(wx.EVT_MENU, self.on_apply_patch,      menu_apply_patch)
         self.Bind(wx.EVT_MENU, self.on_menu_backup,      menu_backup)
         self.Bind(wx.EVT_MENU, self.on_menu_confirm,     menu_confirm)
         self.Bind(wx.EVT_MENU, self.on_menu_newformat,   menu_newformat)
@@ -420,7 +467,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         @param   silent  if true, no error popups on failing to open the file
         """
         savefile, err = None, None
-        if os.path.exists(filename):
+        if archives.exists(filename):
             try:
                 savefile = metadata.Savefile(filename)
             except Exception as e:
@@ -461,6 +508,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
                     self.notebook.SetSelection(i)
                     break # for i
             self.on_change_page()
+            if not page.get_unsaved() and page.savefile.disk_changed(): page.refresh_file()
             return None
 
         savefile = savefile or self.load_savefile(filename)[0]
@@ -472,7 +520,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         page = opts["page"] = SavefilePage(self.notebook, tab_title, savefile)
         self.files[filename] = opts
         conf.FilesOpen.add(filename)
-        conf.SelectedPath = filename
+        conf.SelectedPath = archives.split_path(filename)[0]
         self.refresh_dir_ctrl(conf.SelectedPath)
         conf.save()
         for i in range(self.notebook.GetPageCount()):
@@ -491,9 +539,10 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         Skips files that are not recognizable as savefiles.
         """
         savefiles, notsave_filenames, missing_filenames = {}, [], []
+        filenames = self.choose_archive_members(filenames)
         for f in filenames:
             if f in self.files: savefiles[f] = self.files[f]["savefile"]
-            elif not os.path.exists(f): missing_filenames.append(f)
+            elif not archives.exists(f): missing_filenames.append(f)
             else:
                 savefile, err = self.load_savefile(f, silent=True)
                 if savefile: savefiles[f] = savefile
@@ -513,6 +562,38 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
             wx.MessageBox("\n\n".join(texts), conf.Title, wx.OK | wx.ICON_ERROR)
 
 
+    def choose_archive_members(self, filenames):
+        """
+        Returns filenames with archive files replaced by savefiles in archive,
+        as chosen by user from archive listing.
+        """
+        result = []
+        exts = tuple(x.lower() for _, xx in plugins.adapt(None, "file_extensions",
+                                                         conf.FileExtensions) for x in xx)
+        for filename in filenames:
+            if not archives.is_archive(filename) or not os.path.isfile(filename):
+                result.append(filename)
+                continue # for filename
+            try:
+                archive = metadata.open_archive(filename)
+                members = [x for x in archive.members if x.lower().endswith(exts)]
+            except Exception as e:
+                logger.exception("Error reading archive %s.", filename)
+                wx.MessageBox("Error reading archive %s:\n\n%s" % (filename, util.format_exc(e)),
+                              conf.Title, wx.OK | wx.ICON_ERROR)
+                continue # for filename
+            if not members:
+                wx.MessageBox("No savefiles in archive %s." % filename, conf.Title,
+                              wx.OK | wx.ICON_INFORMATION)
+                continue # for filename
+            dialog = wx.MultiChoiceDialog(self, "Choose savefiles to open from %s:" %
+                                          os.path.basename(filename), conf.Title, members)
+            if wx.ID_OK == dialog.ShowModal():
+                result.extend(archives.join_path(filename, members[i]) for i in dialog.Selections)
+            dialog.Destroy()
+        return result
+
+
     def populate_statusbar(self):
         """Adds file status fields to program statusbar."""
         self.StatusBar.SetFieldsCount(3)
@@ -546,11 +627,70 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
             conf.save()
         finally:
             self.page_main.Thaw()
+        self.queue_catalog()
         if "linux" in sys.platform:  # Linux appears to need time to lay out tree
             wx.CallLater(100, self.ensure_selection_visible, self.dir_ctrl.TreeCtrl)
         else: self.ensure_selection_visible(self.dir_ctrl.TreeCtrl)
 
 
+    def populate_list_files(self):
+        """Populates filtered files list from catalog, or shows directory tree if no filter."""
+        self.search_timer = None
+        if not self: return
+        text = self.search_files.Value.strip() if self.catalog else ""
+        self.page_main.Freeze()
+        try:
+            self.list_files.DeleteAllItems()
+            items = self.catalog.search(self.get_selected_directory(), text) if text else []
+            for i, item in enumerate(items):
+                stamp = datetime.datetime.fromtimestamp(item["mtime"])
+                values = [item["filename"], item["name"] or "",
+                          self.get_version_label(item["version"]), item["herocount"],
+                          stamp.strftime("%Y-%m-%d %H:%M:%S"), util.format_bytes(item["size"])]
+                self.list_files.InsertItem(i, values[0])
+                for j, value in enumerate(values[1:], 1):
+                    self.list_files.SetItem(i, j, util.to_unicode(value))
+            self.list_files.itemDataMap = [x["path"] for x in items]
+            self.dir_ctrl.Show(not text)
+            self.list_files.Show(bool(text))
+            self.page_main.Layout()
+        finally:
+            self.page_main.Thaw()
+
+
+    def queue_catalog(self):
+        """Queues current directory for cataloging savefile metadata, if catalog enabled."""
+        if self.catalog: self.catalog.queue(self.get_selected_directory())
+
+
+    def update_catalog_info(self):
+        """Shows cataloged metadata of currently selected file, if any."""
+        item, text = None, ""
+        if self.catalog and self.text_file.Value: item = self.catalog.get(self.text_file.Value)
+        if item and not item["error"]:
+            text = "%s%s, %s" % (item["name"] or "", item["version"] and
+                                 " (%s)" % self.get_version_label(item["version"]) or "",
+                                 util.plural("hero", item["herocount"]))
+            if item["heroes"]: text += ": " + ", ".join(item["heroes"])
+        elif item: text = "Error reading file: %s" % item["error"]
+        self.label_info.Label = text
+        self.label_info.ToolTip = item["desc"] or "" if item else ""
+
+
+    def get_selected_directory(self):
+        """Returns directory of current selection in files list."""
+        path = self.dir_ctrl.GetPath()
+        return path if not path or os.path.isdir(path) else os.path.dirname(path)
+
+
+    def get_version_label(self, version):
+        """Returns label for savefile game version."""
+        if getattr(plugins, "version", None):
+            version = next((x["label"] for x in plugins.version.PLUGINS if x["name"] == version),
+                           version)
+        return version or ""
+
+
     def ensure_selection_visible(self, treectrl, padding=6):
         """Ensures current selection is visible in wx.TreeCtrl, with N items of padding."""
         if not treectrl: return
@@ -690,6 +830,16 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
             self.notebook.SetAGWWindowStyleFlag(style)
 
 
+    def update_stale_pages(self):
+        """Marks tabs of savefiles changed on disk, checking file stat and gzip trailer only."""
+        for opts in self.files.values():
+            page = opts.get("page")
+            if not page or bool(opts.get("stale")) == page.savefile.disk_changed():
+                continue # for opts
+            evt = SavefilePageEvent(page.Id, source=page, modified=page.get_unsaved())
+            wx.PostEvent(self, evt)
+
+
     def update_title(self, page):
         """Updates program title with name and state of given page."""
         subtitle = ""
@@ -727,14 +877,16 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         if not self.pages_visited or self.pages_visited[-1] != page:
             self.pages_visited.append(page)
 
-        for x in (self.menu_close, self.menu_reload, self.menu_save, self.menu_save_as,
-                  self.menu_undo, self.menu_redo, self.menu_changes, self.menu_history):
+        for x in (self.menu_close, self.menu_reload, self.menu_restore, self.menu_save,
+                  self.menu_save_as, self.menu_export_patch, self.menu_undo, self.menu_redo,
+                  self.menu_changes, self.menu_history):
             x.Enable(False)
         self.Title = conf.Title
 
         if isinstance(page, SavefilePage):
             self.page_file_latest = page
-            for x in (self.menu_close, self.menu_reload, self.menu_save, self.menu_save_as):
+            for x in (self.menu_close, self.menu_reload, self.menu_restore, self.menu_save,
+                      self.menu_save_as, self.menu_export_patch):
                 x.Enable(True)
             self.menu_changes.Enable(page.get_unsaved())
             self.menu_history.Enable(bool(page.undoredo.Commands))
@@ -743,9 +895,16 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.update_toolbar(page)
         self.update_fileinfo()
         self.update_title(page)
+        self.update_stale_pages()
         wx.CallAfter(self.update_notebook_header)
 
 
+    def on_activate(self, event):
+        """Handler for window activation, marks tabs of savefiles changed on disk."""
+        event.Skip()
+        if event.Active: self.update_stale_pages()
+
+
     def on_dragdrop_page(self, event=None):
         """
         Handler for dragging notebook tabs, keeps main-tab first and log-tab last.
@@ -849,7 +1008,8 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.menu_history.Enable(bool(page.undoredo.Commands))
 
         if modified is not None or rename:
-            suffix = "*" if modified else ""
+            stale = self.files[event.source.filename]["stale"] = page.savefile.disk_changed()
+            suffix = ("*" if modified else "") + (" (changed on disk)" if stale else "")
             title1 = not rename and self.files[event.source.filename].get("title") \
                      or self.get_unique_tab_title(event.source.filename)
             self.files[event.source.filename]["title"] = title1
@@ -1005,6 +1165,88 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         if isinstance(page, SavefilePage): page.reload_file()
 
 
+    def on_restore_savefile(self, event=None):
+        """Handler for restore savefile menu, lets user choose backup to restore."""
+        page = self.notebook.GetCurrentPage()
+        if isinstance(page, SavefilePage): page.restore_file()
+
+
+    def on_export_patch(self, event=None):
+        """Handler for export patch menu, saves unsaved changes of active savefile as patch."""
+        page = self.notebook.GetCurrentPage()
+        if isinstance(page, SavefilePage): page.export_patch()
+
+
+    def on_apply_patch(self, event=None):
+        """
+        Handler for apply patch menu, applies chosen patch file to active savefile,
+        or to savefiles chosen on disk if no savefile active.
+        """
+        with wx.FileDialog(self, message="Choose patch to apply",
+            wildcard="Savefile patches (*%s)|*%s|All files|*.*" % ((binpatch.EXTENSION, ) * 2),
+            style=wx.FD_FILE_MUST_EXIST | wx.FD_OPEN | wx.RESIZE_BORDER
+        ) as dialog:
+            if wx.ID_OK != dialog.ShowModal(): return
+            path = dialog.GetPath()
+        try:
+            with open(path, "rb") as f: patch = binpatch.Patch.loads(f.read())
+        except Exception as e:
+            logger.exception("Error reading patch %s.", path)
+            wx.MessageBox("Error reading patch %s:\n\n%s" % (path, util.format_exc(e)),
+                          conf.Title, wx.OK | wx.ICON_ERROR)
+            return
+
+        page = self.notebook.GetCurrentPage()
+        if isinstance(page, SavefilePage): return page.apply_patch(patch, path)
+
+        with wx.FileDialog(self, message="Choose savefiles to apply %s to" % os.path.basename(path),
+            style=wx.FD_FILE_MUST_EXIST | wx.FD_MULTIPLE | wx.FD_OPEN | wx.RESIZE_BORDER
+        ) as dialog:
+            self.set_savegame_filters(dialog)
+            if wx.ID_OK != dialog.ShowModal(): return
+            filenames = dialog.GetPaths()
+        self.apply_patch_files(patch, path, filenames)
+
+
+    def apply_patch_files(self, patch, path, filenames):
+        """
+        Applies patch to savefiles on disk, saving each savefile patched without errors,
+        skipping savefiles currently open. Reports results in a message box.
+
+        @param   patch      binpatch.Patch
+        @param   path       patch file path
+        @param   filenames  savefile paths
+        """
+        saved, errors = [], []
+        busy = controls.BusyPanel(self.notebook, "Applying %s." % os.path.basename(path))
+        try:
+            for filename in filenames:
+                if filename in conf.FilesOpen:
+                    errors.append("%s: file is open in %s." % (filename, conf.Title))
+                    continue # for filename
+                try:
+                    savefile = metadata.Savefile(filename)
+                    try:
+                        count = savefile.apply_patch(patch)
+                        savefile.write(backup=conf.Backup, validate=True)
+                    finally: savefile.close()
+                except Exception as e:
+                    logger.warning("Error applying patch %s to %s.", path, filename, exc_info=True)
+                    errors.append("%s: %s" % (filename, util.format_exc(e)))
+                    continue # for filename
+                logger.info("Applied patch %s to %s, %s.", path, filename,
+                            util.plural("change", count))
+                saved.append(filename)
+        finally:
+            busy.Close()
+        msg = "Applied %s to %s." % (os.path.basename(path), util.plural("savefile", saved))
+        if errors: msg += "\n\nFailed to apply to %s:\n\n%s" % (
+            util.plural("savefile", errors), "\n".join(errors))
+        wx.MessageBox(msg, conf.Title, wx.OK | (wx.ICON_WARNING if errors else wx.ICON_INFORMATION))
+        guibase.status("Applied %s to %s." % (os.path.basename(path),
+                       util.plural("savefile", saved)), flash=True)
+
+
     def on_open_savefile(self, event=None):
         """
         Handler for open savefile menu or button, displays a file dialog and
@@ -1051,6 +1293,41 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         self.button_open.Enable(os.path.isfile(filename))
         if self.Shown: conf.SelectedPath = filename
         self.update_fileinfo()
+        self.update_catalog_info()
+        if self.Shown: self.queue_catalog()
+
+
+    def on_catalog_update(self, directory, paths):
+        """Handler for catalog having updated savefiles in directory, invoked from worker."""
+        def after():
+            if not self: return
+            if self.text_file.Value and os.path.abspath(self.text_file.Value) in paths:
+                self.update_catalog_info()
+            if self.list_files.Shown \
+            and directory == os.path.abspath(self.get_selected_directory()):
+                self.populate_list_files()
+        wx.CallAfter(after)
+
+
+    def on_search_files(self, event):
+        """Handler for changing files filter text, filters files list after a delay."""
+        event.Skip()
+        self.search_timer, _ = None, self.search_timer and self.search_timer.Stop()
+        if getattr(event, "KeyCode", None) == wx.WXK_ESCAPE:
+            event.EventObject.Value = ""
+        self.search_timer = wx.CallLater(self.SEARCH_INTERVAL, self.populate_list_files)
+
+
+    def on_select_list_files(self, event):
+        """Handler for selecting a file in filtered files list, refreshes file controls."""
+        self.text_file.Value = self.list_files.itemDataMap[event.Index]
+        self.button_open.Enable()
+        self.update_catalog_info()
+
+
+    def on_open_from_list_files(self, event):
+        """Handler for activating a file in filtered files list, opens the file."""
+        self.load_savefile_pages([self.list_files.itemDataMap[event.Index]])
 
 
     def update_fileinfo(self):
@@ -1068,7 +1345,8 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
 
     def on_open_current_savefile(self, event=None):
         """Handler for clicking to open selected file from files list."""
-        self.load_savefile_pages([self.dir_ctrl.GetPath()])
+        if self.list_files.Shown: self.load_savefile_pages([self.text_file.Value])
+        else: self.load_savefile_pages([self.dir_ctrl.GetPath()])
 
 
     def on_open_from_dir_ctrl(self, event):
@@ -1125,6 +1403,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
         conf.WindowSize = [-1, -1] if self.IsMaximized() else self.Size[:]
         conf.save()
         self.Hide()
+        if self.catalog: self.catalog.close()
         sys.exit()
 
 
@@ -1167,6 +1446,7 @@ class MainWindow(guibase.TemplateFrameMixIn, wx.Frame):
 
         self.files.pop(page.filename, None)
         conf.FilesOpen.discard(page.filename)
+        page.savefile.close()
         logger.info("Closed tab for %s.", page.filename)
         conf.save()
 
@@ -1205,6 +1485,9 @@ class SavefilePage(wx.Panel):
         self.edit_vers = None
         self.undoredo = wx.CommandProcessor()
         self.undoredo.MarkAsSaved()
+        self.watch_timer = wx.Timer(self)  # Polling file for external changes, if watching
+        self.watch_stat  = None  # (mtime, size) of changed file awaiting refresh
+        self.watch_skip  = False # Whether refresh is pending on unsaved changes
 
         parent_notebook.InsertPage(1, self, title)
         busy = controls.BusyPanel(self, 'Loading "%s".' % self.filename)
@@ -1220,6 +1503,11 @@ class SavefilePage(wx.Panel):
         dlabel = wx.StaticText(filepanel, label="Description:", name="label_desc")
         dctrl  = self.edit_desc = wx.TextCtrl(filepanel, style=wx.TE_MULTILINE | wx.BORDER_NONE, name="desc")
 
+        wctrl  = self.cb_watch = wx.CheckBox(filepanel, label="Watch", name="watch")
+        wctrl.ToolTip = "Refresh automatically when file is changed on disk, " \
+                        "like when saved again in game"
+        wctrl.Value = conf.WatchFiles
+
         for c in (nctrl, vctrl, dctrl): c.SetEditable(False), c.SetMargins(0)
         dctrl.MinSize = -1, nctrl.Size.Height
         SASH_DEFAULTPOS = 2 * nctrl.Size.Height + 10
@@ -1238,6 +1526,9 @@ class SavefilePage(wx.Panel):
 
         self.TopLevelParent.page_file_latest = self
         self.Bind(EVT_SAVEFILE_PAGE, self.on_page_event)
+        self.Bind(wx.EVT_TIMER, self.on_watch_timer, self.watch_timer)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+        wctrl.Bind(wx.EVT_CHECKBOX, self.on_toggle_watch)
         splitter.Bind(wx.EVT_SPLITTER_DCLICK, lambda e: (splitter.SetSashPosition(SASH_DEFAULTPOS),
                       conf.Positions.update(savepage_splitter=SASH_DEFAULTPOS)))
         splitter.Bind(wx.EVT_SPLITTER_SASH_POS_CHANGED,
@@ -1247,7 +1538,7 @@ class SavefilePage(wx.Panel):
         sizer = self.Sizer = wx.BoxSizer(wx.VERTICAL)
         filepanel.Sizer = wx.BoxSizer(wx.VERTICAL)
         isizer = wx.GridBagSizer(hgap=5, vgap=2)
-        isizer.SetCols(4)
+        isizer.SetCols(5)
         isizer.AddGrowableCol(1)
         isizer.AddGrowableRow(1)
 
@@ -1255,8 +1546,9 @@ class SavefilePage(wx.Panel):
         isizer.Add(nctrl,  pos=(0, 1), flag=wx.GROW)
         isizer.Add(vlabel, pos=(0, 2))
         isizer.Add(vctrl,  pos=(0, 3))
+        isizer.Add(wctrl,  pos=(0, 4), border=5, flag=wx.RIGHT)
         isizer.Add(dlabel, pos=(1, 0), border=5, flag=wx.LEFT)
-        isizer.Add(dctrl,  pos=(1, 1), span=(1, 3), flag=wx.GROW)
+        isizer.Add(dctrl,  pos=(1, 1), span=(1, 4), flag=wx.GROW)
 
         filepanel.Sizer.Add(isizer, border=5, flag=wx.GROW | wx.TOP, proportion=1)
         sizer.Add(splitter, proportion=1, border=5, flag=wx.GROW | wx.ALL)
@@ -1267,6 +1559,7 @@ class SavefilePage(wx.Panel):
         wx_accel.accelerate(self)
         try:
             self.load_data()
+            if wctrl.Value: self.watch_timer.Start(conf.WatchInterval)
             guibase.status("Opened %s." % self.filename, flash=True)
         finally:
             busy.Close()
@@ -1283,7 +1576,9 @@ class SavefilePage(wx.Panel):
             "Are you sure you want to lose all changes?", conf.Title,
             wx.OK | wx.CANCEL | wx.ICON_INFORMATION
         ): return
-        try: self.savefile.read()
+        try:
+            if self.savefile.disk_changed(): self.savefile.read()
+            else: self.savefile.revert()  # Contents on disk as loaded, no need to reread
         except Exception as e:
             logger.exception("Error reloading %s.", self.filename)
             wx.MessageBox("Error reloading %s:\n\n%s" % (self.filename, util.format_exc(e)),
@@ -1304,16 +1599,148 @@ class SavefilePage(wx.Panel):
             busy.Close()
 
 
+    def restore_file(self):
+        """Lets user choose a backup of current file, replaces file with backup contents."""
+        try: backups = self.savefile.list_backups()
+        except Exception as e:
+            logger.exception("Error listing backups of %s.", self.filename)
+            wx.MessageBox("Error listing backups of %s:\n\n%s" %
+                          (self.filename, util.format_exc(e)), conf.Title, wx.OK | wx.ICON_ERROR)
+            return
+        if not backups:
+            wx.MessageBox("No backups of %s." % self.filename, conf.Title,
+                          wx.OK | wx.ICON_INFORMATION)
+            return
+
+        choices = []
+        for backup in backups:
+            stamp = datetime.datetime.fromtimestamp(backup["mtime"] or backup["created"])
+            choices.append("%s  (%s)" % (stamp.strftime("%Y-%m-%d %H:%M:%S"),
+                                         util.format_bytes(backup["size"])))
+        dialog = wx.SingleChoiceDialog(self, "Choose version of %s to restore:" %
+                                       os.path.basename(self.filename), conf.Title, choices)
+        if wx.ID_OK != dialog.ShowModal(): return
+        backup = backups[dialog.Selection]
+        dialog.Destroy()
+        if self.savefile.is_changed() and wx.CANCEL == wx.MessageBox(
+            "Are you sure you want to lose all changes?", conf.Title,
+            wx.OK | wx.CANCEL | wx.ICON_INFORMATION
+        ): return
+
+        busy = controls.BusyPanel(self.Parent, "Restoring file.")
+        try: self.savefile.restore(backup)
+        except Exception as e:
+            busy.Close()
+            logger.exception("Error restoring %s.", self.filename)
+            wx.MessageBox("Error restoring %s:\n\n%s" % (self.filename, util.format_exc(e)),
+                          conf.Title, wx.OK | wx.ICON_ERROR)
+            return
+        self.undoredo.ClearCommands()
+        self.undoredo.SetMenuStrings()
+        evt = SavefilePageEvent(self.Id, source=self, modified=False)
+        wx.PostEvent(self.Parent, evt)
+        self.Freeze()
+        try:
+            self.update_metadata()
+            for p in self.plugins: p.render(reparse=True)
+            self.SendSizeEvent()
+        finally:
+            self.Thaw()
+            busy.Close()
+        guibase.status("Restored %s from backup." % self.filename, flash=True)
+
+
+    def export_patch(self):
+        """Lets user save unsaved changes as a patch file."""
+        if not self.savefile.is_changed():
+            wx.MessageBox("No unsaved changes in %s." % self.filename, conf.Title,
+                          wx.OK | wx.ICON_INFORMATION)
+            return
+        basename = os.path.splitext(os.path.basename(self.filename))[0]
+        with wx.FileDialog(self, message="Export changes as patch",
+            wildcard="Savefile patches (*%s)|*%s" % ((binpatch.EXTENSION, ) * 2),
+            defaultFile=basename + binpatch.EXTENSION,
+            style=wx.FD_OVERWRITE_PROMPT | wx.FD_SAVE | wx.RESIZE_BORDER
+        ) as dialog:
+            if wx.ID_OK != dialog.ShowModal(): return
+            path = dialog.GetPath()
+        try:
+            patch = self.savefile.make_patch()
+            with open(path, "wb") as f: f.write(patch.dumps())
+        except Exception as e:
+            logger.exception("Error exporting patch from %s.", self.filename)
+            wx.MessageBox("Error exporting patch:\n\n%s" % util.format_exc(e),
+                          conf.Title, wx.OK | wx.ICON_ERROR)
+            return
+        logger.info("Exported %s from %s as patch %s.",
+                    util.plural("change", patch.records), self.filename, path)
+        guibase.status("Exported changes as %s." % path, flash=True)
+
+
+    def apply_patch(self, patch, path):
+        """
+        Applies patch to loaded contents, as unsaved changes.
+
+        @param   patch  binpatch.Patch
+        @param   path   patch file path, for logging
+        """
+        try: count = self.savefile.apply_patch(patch)
+        except Exception as e:
+            logger.warning("Error applying patch %s to %s.", path, self.filename, exc_info=True)
+            wx.MessageBox("Error applying patch %s:\n\n%s" % (path, util.format_exc(e)),
+                          conf.Title, wx.OK | wx.ICON_ERROR)
+            return
+        logger.info("Applied patch %s to %s, %s.", path, self.filename,
+                    util.plural("change", count))
+        self.undoredo.ClearCommands()
+        self.undoredo.SetMenuStrings()
+        self.Freeze()
+        try:
+            for p in self.plugins: p.render(reparse=True)
+        finally:
+            self.Thaw()
+        evt = SavefilePageEvent(self.Id, source=self, modified=self.savefile.is_changed())
+        wx.PostEvent(self.Parent, evt)
+        guibase.status("Applied %s to %s." % (os.path.basename(path), self.filename), flash=True)
+
+
+    def refresh_file(self):
+        """
+        Rereads file changed on disk, updating plugins in place where possible
+        and re-rendering others. File must have no unsaved changes.
+        """
+        raw0 = self.savefile.snapshot()  # Keeps previous contents readable after reread
+        try: self.savefile.read()
+        except Exception:  # File may still be in the middle of being written
+            logger.warning("Error refreshing %s.", self.filename, exc_info=True)
+            return
+        logger.info("Refreshing %s, changed on disk.", self.filename)
+        self.undoredo.ClearCommands()
+        self.undoredo.SetMenuStrings()
+        self.Freeze()
+        try:
+            self.update_metadata()
+            for p in self.plugins:
+                if not callable(getattr(p, "refresh", None)) or not p.refresh(raw0):
+                    p.render(reparse=True)
+        finally:
+            self.Thaw()
+        evt = SavefilePageEvent(self.Id, source=self, modified=False)
+        wx.PostEvent(self.Parent, evt)
+        guibase.status("Refreshed %s from disk." % self.filename, flash=True)
+
+
     def save_file(self, rename=False):
         """Saves the file, under a new name if specified, returns success."""
         filename1 = filename2 = self.filename
+        archive, member = archives.split_path(self.filename)
 
-        if rename:
-            title = "Save %s as.." % os.path.split(self.filename)[-1]
+        if rename or member is not None:  # Savefiles in archives can only be saved separately
+            title = "Save %s as.." % os.path.basename(member or self.filename)
             dialog = wx.FileDialog(self,
                 message=title, wildcard="|".join(metadata.wildcards()),
-                defaultDir=os.path.split(self.filename)[0],
-                defaultFile=os.path.basename(self.filename),
+                defaultDir=os.path.dirname(archive),
+                defaultFile=os.path.basename(member or self.filename),
                 style=wx.FD_OVERWRITE_PROMPT | wx.FD_SAVE | wx.RESIZE_BORDER
             )
             if wx.ID_OK != dialog.ShowModal(): return False
@@ -1338,59 +1765,26 @@ class SavefilePage(wx.Panel):
         @param   changes   text to log with all changes
         @param   spans     specific byte ranges to save if not all, as [(from, exclusive to)]
         """
-        filename1, filename2, tempname, error = self.filename, filename or self.filename, None, None
+        filename1, filename2 = self.filename, filename or self.filename
 
         rename = (filename1 != filename2)
+        problems = self.savefile.validate(spans)
+        if problems:
+            logger.warning("Invalid changes in %s:\n\n%s", filename1, "\n".join(problems))
+            if wx.YES != wx.MessageBox(
+                "Changes in %s do not look valid:\n\n%s\n\nSave anyway?" %
+                (filename1, "\n".join(problems)), conf.Title,
+                wx.YES | wx.NO | wx.NO_DEFAULT | wx.ICON_WARNING
+            ): return False
         logger.info("Saving %s%s.", filename1, " as %s" % filename2 if rename else "")
         if changes: logger.info("Saving changes:\n\n%s", changes)
 
-        if rename:
-            # Use a tertiary file in case something fails
-            fh, tempname = tempfile.mkstemp(".gm1")
-            os.close(fh)
-
-        try:
-            if rename: shutil.copy(filename1, tempname)
-        except Exception as e:
-            logger.exception("Error saving %s as %s.", filename1, filename2)
-            try: os.unlink(tempname)
-            except Exception: pass
-            wx.MessageBox("Error saving %s as %s:\n\n%s" %
-                          (filename1, filename2, util.format_exc(e)),
-                          conf.Title, wx.OK | wx.ICON_ERROR)
-            return False
-
-        if conf.Backup and os.path.exists(filename2):
-            backupname = "%s.%s" % (filename2, datetime.datetime.now().strftime("%Y%m%d"))
-            if os.path.exists(backupname):
-                logger.info("Skipping saving backup file, %s already exists.", backupname) 
-            else:
-                logger.info("Saving backup file %s.", backupname)
-                try:
-                    shutil.copy(filename2, backupname)
-                except Exception:
-                    logger.warning("Error saving backup of %s as %s.",
-                                   filename2, backupname, exc_info=True)
-
         try:
-            self.savefile.write_ranges(spans, tempname) if spans else self.savefile.write(tempname)
+            self.savefile.write(filename2, spans, backup=conf.Backup)
         except Exception as e:
             logger.exception("Error saving changes in %s.", filename2)
-            error = "Error saving changes:\n\n%s" % util.format_exc(e)
-
-        if not error and rename:
-            try:
-                shutil.copy(tempname, filename2)
-            except Exception as e:
-                error = "Error saving %s as %s:\n\n%s" % \
-                        (self.filename, filename2, util.format_exc(e))
-                logger.exception("Error saving temporary file %s as %s.", tempname, filename2)
-
-        try: tempname and os.unlink(tempname)
-        except Exception: pass
-
-        if error:
-            wx.MessageBox(error, conf.Title, wx.OK | wx.ICON_ERROR)
+            wx.MessageBox("Error saving changes:\n\n%s" % util.format_exc(e),
+                          conf.Title, wx.OK | wx.ICON_ERROR)
             return False
 
         self.filename = self.savefile.filename = filename2
@@ -1398,8 +1792,6 @@ class SavefilePage(wx.Panel):
             conf.FilesOpen.discard(filename1)
             conf.FilesOpen.add(filename2)
         if not spans:
-            try: self.savefile.read()
-            except Exception: logger.warning("Error re-reading %s.", filename2, exc_info=True)
             if rename:
                 evt = SavefilePageEvent(self.Id, source=self, rename=True,
                                         filename1=filename1, filename2=filename2)
@@ -1453,6 +1845,43 @@ class SavefilePage(wx.Panel):
         controls.HtmlDialog(self, title, content, style=wx.RESIZE_BORDER).ShowModal()
 
 
+    def on_destroy(self, event):
+        """Handler for page being destroyed, stops file watcher."""
+        event.Skip()
+        if event.EventObject is self: self.watch_timer.Stop()
+
+
+    def on_toggle_watch(self, event):
+        """Handler for toggling file watch, starts or stops polling file for changes."""
+        self.watch_stat = None
+        if event.IsChecked(): self.watch_timer.Start(conf.WatchInterval)
+        else: self.watch_timer.Stop()
+
+
+    def on_watch_timer(self, event):
+        """
+        Handler for file watch timer, refreshes file if changed on disk
+        and unchanged since last check, and no unsaved changes in program.
+        """
+        if not self.savefile.disk_changed():
+            self.watch_stat = None
+            return
+        try: stat = os.stat(self.filename)
+        except Exception: return
+        stat = (stat.st_mtime, stat.st_size)
+        if stat != self.watch_stat:  # Wait one more interval for file to stay unchanged
+            self.watch_stat, self.watch_skip = stat, False
+            return
+        if self.savefile.is_changed():
+            if not self.watch_skip:
+                logger.info("Not refreshing %s changed on disk, as it has unsaved changes.",
+                            self.filename)
+            self.watch_skip = True
+            return
+        self.watch_stat = None
+        self.refresh_file()
+
+
     def on_page_event(self, event):
         """Handler for notification from subtabs, updates UI if modified."""
         args = event.ClientData if isinstance(event.ClientData, dict) else {}
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Reading files inside zip and tar archives without extracting,
+addressed as "path/to/archive.zip!/path/in/archive".
+
+Zip archives are listed from their central directory. Tar archives have no
+central directory, so their member listings are indexed on first read,
+with data offsets for seeking straight to members of uncompressed tars.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+from collections import OrderedDict
+import json
+import logging
+import os
+import re
+import tarfile
+import threading
+import time
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+
+"""Separator between archive path and member name."""
+SEPARATOR = "!/"
+
+"""Archive filename extensions."""
+EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+"""Filename extension of archive listing entries in file cache."""
+LISTING_EXTENSION = ".lst"
+
+"""Listings of archives read this session, as {(path, mtime, size): Archive.members}."""
+LISTINGS = {}
+LISTINGS_LOCK = threading.Lock()
+
+"""Archive member separator, with backslash for paths normalized on Windows."""
+RGX_SEPARATOR = re.compile(r"!(?=[/\\])")
+
+
+def exists(path):
+    """Returns whether path is an existing file or archive member."""
+    archive, member = split_path(path)
+    if member is None: return os.path.isfile(path)
+    try: return member in Archive(archive).members
+    except Exception: return False
+
+
+def is_archive(path):
+    """Returns whether path has an archive filename extension."""
+    return path.lower().endswith(EXTENSIONS)
+
+
+def join_path(archive, member):
+    """Returns member path in archive."""
+    return archive + SEPARATOR + member
+
+
+def split_path(path):
+    """
+    Returns (archive path, member name) for path to archive member,
+    or (path, None) if not an archive member path.
+    """
+    for match in RGX_SEPARATOR.finditer(path):
+        archive = path[:match.start()]
+        if is_archive(archive) and os.path.isfile(archive):
+            return archive, path[match.end() + 1:].replace("\\", "/")
+    return path, None
+
+
+
+class Archive(object):
+    """Zip or tar archive, with member listing and streamed member reading."""
+
+    """Leading bytes of gzip, bzip2 and xz streams, for compressed tar archives."""
+    COMPRESSED_MAGICS = (b"\x1F\x8B", b"BZh", b"\xFD7zXZ")
+
+
+    def __init__(self, path, cache=None):
+        """
+        @param   path   archive file path
+        @param   cache  filecache.FileCache for storing tar listings across sessions, if any
+        """
+        self.path  = path
+        self.cache = cache
+        self.is_zip = zipfile.is_zipfile(path)
+        self._members = None
+
+
+    @property
+    def members(self):
+        """
+        Returns archive file members, as {name: {name, size, mtime, offset}}, in archive order,
+        with size as stored size, mtime as UNIX timestamp, and offset as data offset
+        in uncompressed tar, else None.
+        """
+        if self._members is None: self._members = self._list()
+        return self._members
+
+
+    def open(self, name):
+        """Returns readable binary file object streaming member contents."""
+        item = self.members.get(name)
+        if not item: raise KeyError("No such file in %s: %s." % (self.path, name))
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as zf: return zf.open(name)
+        if item["offset"] is not None:
+            f = open(self.path, "rb")
+            f.seek(item["offset"])
+            return MemberFile(f, item["size"])
+        tf = tarfile.open(self.path, "r:*")
+        try:  # Lookup by name would decompress and list the whole archive first
+            info = next((x for x in iter(tf.next, None) if x.name == name and x.isfile()), None)
+            if not info: raise KeyError("No such file in %s: %s." % (self.path, name))
+            return MemberFile(tf.extractfile(info), item["size"], tf)
+        except Exception:
+            tf.close()
+            raise
+
+
+    def _list(self):
+        """Returns archive member listing, from session or file cache if archive unchanged."""
+        stat = os.stat(self.path)
+        memokey = (os.path.realpath(self.path), stat.st_mtime, stat.st_size)
+        cachekey = self.cache.key(self.path) if self.cache and not self.is_zip else None
+        with LISTINGS_LOCK: result = LISTINGS.get(memokey)
+        if result is None and cachekey:
+            cached = self.cache.get(cachekey, LISTING_EXTENSION)
+            try: result = cached and OrderedDict((x["name"], x) for x in json.loads(cached[:]))
+            except Exception:
+                logger.warning("Error reading cached listing of %s.", self.path, exc_info=True)
+            finally: cached and cached.close()
+        if result is None:
+            result = OrderedDict((x["name"], x) for x in self._read_listing())
+        if cachekey:  # Skipped if already cached
+            data = json.dumps(list(result.values())).encode("utf-8")
+            self.cache.put(cachekey, data, LISTING_EXTENSION)
+        with LISTINGS_LOCK: LISTINGS[memokey] = result
+        return result
+
+
+    def _read_listing(self):
+        """Returns archive file members read from archive, as [{name, size, mtime, offset}]."""
+        result = []
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as zf:
+                for info in zf.infolist():
+                    if info.filename.endswith("/"): continue # for info
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                    result.append(dict(name=info.filename, size=info.compress_size,
+                                       mtime=mtime, offset=None))
+            return result
+
+        with open(self.path, "rb") as f: plain = not f.read(6).startswith(self.COMPRESSED_MAGICS)
+        with tarfile.open(self.path, "r:*") as tf:
+            for info in iter(tf.next, None):
+                if not info.isfile(): continue # for info
+                result.append(dict(name=info.name, size=info.size, mtime=info.mtime,
+                                   offset=info.offset_data if plain else None))
+        return result
+
+
+
+class MemberFile(object):
+    """Readable binary file object over member contents in archive file."""
+
+    def __init__(self, fileobj, size, owner=None):
+        """
+        @param   fileobj  file object positioned at member start
+        @param   size     member size
+        @param   owner    object to close together with file object, if any
+        """
+        self.fileobj = fileobj
+        self.size    = size
+        self.owner   = owner
+        self.pos     = 0
+
+
+    def read(self, size=-1):
+        """Returns up to size bytes from member, or all remaining if size negative."""
+        remaining = self.size - self.pos
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        result = self.fileobj.read(size) if size > 0 else b""
+        self.pos += len(result)
+        return result
+
+
+    def close(self):
+        """Closes file object."""
+        self.fileobj.close()
+        if self.owner: self.owner.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Deduplicating backup store: file contents are split into content-defined chunks,
+each distinct chunk kept once in an object directory, and each backup
+becomes a small manifest listing its chunks.
+
+Store layout:
+
+    objects/ab/abcdef..         zlib-compressed chunk, named by SHA-1 of chunk
+    manifests/0123../<id>.json  backup manifest, under SHA-1 of source name
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+try: import numpy
+except ImportError: numpy = None
+
+from . import util
+
+logger = logging.getLogger(__name__)
+
+
+"""Minimum chunk size, no boundaries are searched before this."""
+CHUNK_MIN = 2**11
+
+"""Chunk boundary bitmask of rolling hash, giving average size of 8KB beyond minimum."""
+CHUNK_MASK = 2**13 - 1
+
+"""Chunk size used if content-defined chunking unavailable, as average of content-defined."""
+CHUNK_FIXED = CHUNK_MIN + CHUNK_MASK + 1
+
+"""Maximum chunk size, chunk gets cut here if no boundary found."""
+CHUNK_MAX = 2**16
+
+"""Pseudo-random values for rolling gear hash, fixed for stable chunk boundaries."""
+GEAR = [util.bytoi(hashlib.sha1(bytearray([i])).digest()[:4]) for i in range(256)]
+
+
+def chunk_spans(data):
+    """
+    Returns content-defined chunk spans of data, as [(start, end), ].
+
+    Uses a gear hash over a window of preceding bytes, so that boundaries depend only
+    on nearby content and inserting or removing bytes shifts only the chunks around
+    the change. Hash is computed for all positions at once with NumPy;
+    falls back to fixed-size chunks if NumPy not available.
+    """
+    size = len(data)
+    if numpy is None:
+        return [(i, min(i + CHUNK_FIXED, size)) for i in range(0, size, CHUNK_FIXED)]
+
+    # Only hash bits under mask matter for boundaries, and bit k of gear hash at position
+    # depends only on the last k + 1 bytes: sum of gear values shifted by distance.
+    bits   = CHUNK_MASK.bit_length()
+    gear   = numpy.array(GEAR, dtype=numpy.uint32).astype(numpy.uint16)
+    hashed = gear[numpy.frombuffer(data, numpy.uint8)]
+    value  = hashed.copy()
+    for i in range(1, min(bits, size)):
+        value[i:] += hashed[:size - i] << numpy.uint16(i)
+    marks = numpy.flatnonzero((value & numpy.uint16(CHUNK_MASK)) == 0)
+
+    result, start = [], 0
+    while start < size:
+        end = min(start + CHUNK_MAX, size)
+        i = numpy.searchsorted(marks, start + CHUNK_MIN)
+        if i < len(marks) and marks[i] < end: end = int(marks[i]) + 1
+        result.append((start, end))
+        start = end
+    return result
+
+
+
+class BackupStore(object):
+    """
+    Directory of deduplicated file content backups, with retention policy
+    of keeping a number of latest backups plus one backup per day for a number of days.
+    """
+
+    LOCK = threading.RLock() # Guards manifest and object changes across store instances
+
+
+    def __init__(self, directory, count=None, days=None):
+        """
+        @param   directory  path to store directory, created if missing
+        @param   count      number of latest backups to keep per source, if limited
+        @param   days       number of days to keep the latest backup of each day for,
+                            in addition to latest backups, if limited
+        """
+        self.directory = directory
+        self.count     = count
+        self.days      = days
+
+
+    def add(self, name, data, mtime=None):
+        """
+        Stores contents as new backup, unless identical to latest backup of source,
+        applies retention policy.
+
+        @param    name   source name, like file path
+        @param    data   bytes-like file contents
+        @param    mtime  source modification time as UNIX timestamp, if any
+        @return          backup manifest as {id, name, created, mtime, size, sha1, chunks}
+        """
+        sha1 = hashlib.sha1(bytes(data)).hexdigest()
+        latest = next(iter(self.list(name)), None)
+        if latest and latest["sha1"] == sha1:
+            logger.info("Skipping backup of %s, unchanged since last backup.", name)
+            return latest
+
+        chunks, buffer, written = [], bytearray(data), 0
+        with self.LOCK:
+            for start, end in chunk_spans(buffer):
+                chunk = bytes(buffer[start:end])
+                key = hashlib.sha1(chunk).hexdigest()
+                chunks.append([key, end - start])
+                path = self._object_path(key)
+                if os.path.isfile(path): continue # for start, end
+                self._write(path, zlib.compress(chunk))
+                written += 1
+            created = time.time()
+            manifest = dict(id="%.6f" % created, name=name, created=created, mtime=mtime,
+                            size=len(data), sha1=sha1, chunks=chunks)
+            self._write(self._manifest_path(name, manifest["id"]),
+                        json.dumps(manifest).encode("utf-8"))
+        logger.info("Backed up %s (%s, %s of %s new).", name, util.format_bytes(len(data)),
+                    written, util.plural("chunk", chunks))
+        self.prune(name)
+        return manifest
+
+
+    def list(self, name=None):
+        """Returns backup manifests of source, or of all sources, newest first."""
+        result = []
+        root = os.path.join(self.directory, "manifests")
+        dirs = [self._manifest_dir(name)] if name is not None else \
+               [os.path.join(root, x) for x in os.listdir(root)] if os.path.isdir(root) else []
+        for path in dirs:
+            for filename in os.listdir(path) if os.path.isdir(path) else ():
+                if not filename.endswith(".json"): continue # for filename
+                try:
+                    with open(os.path.join(path, filename), "rb") as f:
+                        result.append(json.loads(f.read().decode("utf-8")))
+                except Exception:
+                    logger.warning("Error reading backup manifest %s.", filename, exc_info=True)
+        return sorted(result, key=lambda x: -x["created"])
+
+
+    def read(self, manifest):
+        """Returns contents of backup, raises on missing or corrupt data."""
+        result = bytearray()
+        for key, size in manifest["chunks"]:
+            with open(self._object_path(key), "rb") as f: chunk = zlib.decompress(f.read())
+            if len(chunk) != size: raise ValueError("Corrupt backup chunk %s." % key)
+            result += chunk
+        if hashlib.sha1(result).hexdigest() != manifest["sha1"]:
+            raise ValueError("Corrupt backup %s of %s." % (manifest["id"], manifest["name"]))
+        return result
+
+
+    def remove(self, manifests):
+        """Deletes backups, and chunks no longer used by any backup."""
+        if not manifests: return
+        with self.LOCK:
+            for manifest in manifests:
+                try: os.remove(self._manifest_path(manifest["name"], manifest["id"]))
+                except Exception:
+                    logger.warning("Error deleting backup %s of %s.", manifest["id"],
+                                   manifest["name"], exc_info=True)
+            self.collect()
+
+
+    def prune(self, name):
+        """Deletes backups of source not retained by retention policy, returns deleted."""
+        manifests, keep, days = self.list(name), set(), set()
+        if self.count is None and self.days is None: return []
+        for i, manifest in enumerate(manifests):
+            day = datetime.date.fromtimestamp(manifest["created"])
+            if self.count is None or i < self.count: keep.add(manifest["id"])
+            elif self.days and day not in days \
+            and (datetime.date.today() - day).days < self.days: keep.add(manifest["id"])
+            days.add(day)
+        result = [x for x in manifests if x["id"] not in keep]
+        if result:
+            logger.info("Deleting %s of %s.", util.plural("old backup", result), name)
+            self.remove(result)
+        return result
+
+
+    def collect(self):
+        """Deletes chunks not used by any backup."""
+        used, root = set(), os.path.join(self.directory, "objects")
+        with self.LOCK:
+            for manifest in self.list():
+                used.update(key for key, _ in manifest["chunks"])
+            for dirname in os.listdir(root) if os.path.isdir(root) else ():
+                for filename in os.listdir(os.path.join(root, dirname)):
+                    if dirname + filename in used: continue # for filename
+                    try: os.remove(os.path.join(root, dirname, filename))
+                    except Exception: pass
+
+
+    def _write(self, path, data):
+        """Writes file atomically, via temporary file renamed over target."""
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory): os.makedirs(directory)
+        fd, tmppath = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f: f.write(data)
+            util.replace_file(tmppath, path)
+        except Exception:
+            try: os.remove(tmppath)
+            except Exception: pass
+            raise
+
+
+    def _manifest_dir(self, name):
+        """Returns manifest directory path for source."""
+        key = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "manifests", key)
+
+
+    def _manifest_path(self, name, backup_id):
+        """Returns manifest file path for backup."""
+        return os.path.join(self._manifest_dir(name), "%s.json" % backup_id)
+
+
+    def _object_path(self, key):
+        """Returns object file path for chunk."""
+        return os.path.join(self.directory, "objects", key[:2], key[2:])
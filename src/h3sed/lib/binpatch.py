@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Compact binary patches of byte span changes, with original bytes for verification
+and optional named anchors for relocating spans in other contents.
+
+Patch format, integers unsigned little-endian:
+
+    magic        b"H3PATCH\x01"
+    version      uint16 length + UTF-8 text: content version label, like game version
+    count        uint32 number of records
+    records      count x (uint32 offset, uint32 old length, uint32 new length,
+                          uint16 anchor length + UTF-8 anchor name, uint32 offset from anchor,
+                          old bytes, new bytes)
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import bisect
+from collections import namedtuple
+import struct
+
+
+"""Default filename extension of patch files."""
+EXTENSION = ".h3patch"
+
+"""Patch record: absolute offset, original and new bytes, anchor name and offset from anchor."""
+Record = namedtuple("Record", "offset old new anchor delta")
+
+
+def find_duplicates(names):
+    """Returns names occurring more than once, as set."""
+    seen, result = set(), set()
+    for name in names:
+        if name in seen: result.add(name)
+        seen.add(name)
+    return result
+
+
+
+class Patch(object):
+    """Binary patch, as a list of span change records."""
+
+    """Header bytes of serialized patch."""
+    MAGIC = b"H3PATCH\x01"
+
+
+    def __init__(self, version=None, records=None):
+        """
+        @param   version  content version label, if any
+        @param   records  [Record, ] in any order
+        """
+        self.version = version or ""
+        self.records = list(records or [])
+
+
+    @classmethod
+    def from_spans(cls, old, new, spans, anchors=(), version=None):
+        """
+        Returns patch of changed spans, with records anchored to named spans containing them.
+        Raises ValueError if a changed span lies in a span whose name is not unique.
+
+        @param   old      original contents
+        @param   new      changed contents
+        @param   spans    changed spans, as [(start, end), ]
+        @param   anchors  named spans in original contents, as [(name, (start, end)), ]
+        """
+        duplicates = find_duplicates(name for name, _ in anchors)
+        anchors = sorted((span, name) for name, span in anchors)
+        starts, records = [x[0][0] for x in anchors], []
+        for start, end in spans:
+            anchor, delta = "", 0
+            i = bisect.bisect_right(starts, start) - 1
+            if i >= 0 and start < anchors[i][0][1]:
+                anchor, delta = anchors[i][1], start - anchors[i][0][0]
+            if anchor in duplicates:
+                raise ValueError("Change at %s is in %r, which occurs more than once." %
+                                 (start, anchor))
+            records.append(Record(start, bytes(old[start:end]), bytes(new[start:end]),
+                                  anchor, delta))
+        return cls(version, records)
+
+
+    def resolve(self, buffer, locate=None):
+        """
+        Returns patch record positions in buffer, verifying original bytes,
+        raises ValueError if any record cannot be placed, or if placed records overlap.
+
+        Anchored records are placed at their offset from anchor, and only if anchor
+        is found in buffer exactly once; records without anchor are placed
+        at their absolute offset.
+
+        @param   buffer  contents to patch
+        @param   locate  callback returning named spans in buffer as [(name, (start, end)), ],
+                         invoked once if any record is anchored
+        @return          [(offset, Record), ] in descending offset order
+        """
+        result, anchors, duplicates, errors = [], None, set(), []
+        for record in self.records:
+            size, offset = len(record.old), record.offset
+            if record.anchor:
+                if anchors is None:
+                    anchors = list(locate()) if locate else []
+                    duplicates = find_duplicates(name for name, _ in anchors)
+                    anchors = dict(anchors)
+                offset = None
+                if record.anchor in anchors and record.anchor not in duplicates:
+                    offset = anchors[record.anchor][0] + record.delta
+            if offset is not None and buffer[offset:offset + size] != record.old: offset = None
+            if offset is not None: result.append((offset, record))
+            elif record.anchor in duplicates:
+                errors.append("%s (%s, occurs more than once)" % (record.offset, record.anchor))
+            elif record.anchor: errors.append("%s (%s)" % (record.offset, record.anchor))
+            else: errors.append(str(record.offset))
+        if errors:
+            raise ValueError("Original content mismatch at %s of %s: %s." % (
+                len(errors), len(self.records), ", ".join(errors)))
+        result.sort(key=lambda x: x[0])
+        for (offset1, record1), (offset2, record2) in zip(result, result[1:]):
+            if offset2 < offset1 + len(record1.old):
+                raise ValueError("Changes at %s and %s overlap, at %s and %s." % (
+                                 record1.offset, record2.offset, offset1, offset2))
+        return result[::-1]
+
+
+    def dumps(self):
+        """Returns patch as serialized bytes."""
+        version = self.version.encode("utf-8")
+        parts = [self.MAGIC, struct.pack("<H", len(version)), version,
+                 struct.pack("<L", len(self.records))]
+        for record in self.records:
+            anchor = record.anchor.encode("utf-8")
+            parts += [struct.pack("<LLLH", record.offset, len(record.old), len(record.new),
+                                  len(anchor)), anchor, struct.pack("<L", record.delta),
+                      record.old, record.new]
+        return b"".join(parts)
+
+
+    @classmethod
+    def loads(cls, data):
+        """Returns Patch from serialized bytes, raises ValueError if invalid."""
+        data = bytes(data)
+        if not data.startswith(cls.MAGIC): raise ValueError("Not a recognized patch file.")
+        try:
+            pos = len(cls.MAGIC)
+            size, = struct.unpack_from("<H", data, pos)
+            version = data[pos + 2:pos + 2 + size].decode("utf-8")
+            pos += 2 + size
+            count, = struct.unpack_from("<L", data, pos)
+            pos += 4
+            records = []
+            for _ in range(count):
+                offset, oldsize, newsize, size = struct.unpack_from("<LLLH", data, pos)
+                anchor = data[pos + 14:pos + 14 + size].decode("utf-8")
+                pos += 14 + size
+                delta, = struct.unpack_from("<L", data, pos)
+                pos += 4
+                old, new = data[pos:pos + oldsize], data[pos + oldsize:pos + oldsize + newsize]
+                pos += oldsize + newsize
+                if len(old) != oldsize or len(new) != newsize: raise ValueError("Truncated data.")
+                records.append(Record(offset, old, new, anchor, delta))
+        except (struct.error, ValueError) as e:
+            raise ValueError("Corrupt patch file: %s" % e)
+        return cls(version, records)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent size-bounded cache of decompressed file contents,
+served as copy-on-write memory maps, and of gzip random access indexes.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+
+from . import gzstream
+from . import util
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache(object):
+    """
+    Directory of decompressed file contents, keyed by source file path,
+    modification time, size and gzip trailer checksum.
+
+    Least recently used entries are evicted once cache exceeds its maximum size.
+    """
+
+    """Filename extension of cache entries."""
+    EXTENSION = ".raw"
+
+    """Filename extension of gzip index entries."""
+    INDEX_EXTENSION = ".idx"
+
+    """Filename extension of entries being written."""
+    TEMP_EXTENSION = ".tmp"
+
+
+    def __init__(self, directory, maxsize):
+        """
+        @param   directory  path to directory holding cache entries, created if missing
+        @param   maxsize    maximum total size of cache entries, in bytes
+        """
+        self.directory = directory
+        self.maxsize   = maxsize
+
+
+    def key(self, filename):
+        """Returns cache key for file in its current state, or None if file unavailable."""
+        try:
+            stat, trailer = os.stat(filename), gzstream.read_trailer(filename)
+        except Exception:
+            return None
+        parts = (os.path.realpath(filename), repr(stat.st_mtime), stat.st_size, trailer)
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+    def get(self, key, extension=None):
+        """Returns cached contents as copy-on-write mmap.mmap, or None if not cached."""
+        path = key and self._path(key, extension)
+        if not path or not os.path.isfile(path): return None
+        try:
+            with open(path, "rb") as f:
+                result = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            os.utime(path, None)  # Mark as recently used
+        except Exception:
+            logger.warning("Error reading cache entry %s.", path, exc_info=True)
+            return None
+        return result
+
+
+    def get_index(self, key):
+        """Returns cached gzstream.Index, or None if not cached."""
+        path = key and self._path(key, self.INDEX_EXTENSION)
+        if not path or not os.path.isfile(path): return None
+        try:
+            with open(path, "rb") as f: result = gzstream.Index.loads(f.read())
+            os.utime(path, None)  # Mark as recently used
+        except Exception:
+            logger.warning("Error reading cache entry %s.", path, exc_info=True)
+            return None
+        return result
+
+
+    def put(self, key, data, extension=None, overwrite=False):
+        """
+        Stores contents in cache, evicting least recently used entries as needed.
+
+        @param   overwrite  whether to replace existing entry, for entries not derived
+                            from key alone
+        """
+        if not key or not data or len(data) > self.maxsize: return
+        path, tmppath = self._path(key, extension), None
+        if os.path.isfile(path) and not overwrite: return
+        try:
+            if not os.path.isdir(self.directory): os.makedirs(self.directory)
+            fd, tmppath = tempfile.mkstemp(suffix=self.TEMP_EXTENSION, dir=self.directory)
+            with os.fdopen(fd, "wb") as f: f.write(data)
+            util.replace_file(tmppath, path)  # Entry appears complete or not at all
+        except Exception:
+            logger.warning("Error writing cache entry %s.", path, exc_info=True)
+            if tmppath and os.path.exists(tmppath):
+                try: os.remove(tmppath)
+                except Exception: pass
+            return
+        self.evict()
+
+
+    def put_index(self, key, index):
+        """Stores gzstream.Index in cache."""
+        self.put(key, index.dumps(), self.INDEX_EXTENSION)
+
+
+    def evict(self):
+        """Deletes least recently used entries of any kind until cache fits its maximum size."""
+        entries = []
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if name.endswith(self.TEMP_EXTENSION): continue # for name  Entry being written
+            try: stat = os.stat(os.path.join(self.directory, name))
+            except Exception: continue # for name
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(x[1] for x in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.maxsize: break # for _, size, name
+            try:
+                os.remove(os.path.join(self.directory, name))
+                total -= size
+                logger.info("Evicted cache entry %s (%s).", name, util.format_bytes(size))
+            except Exception:  # Can fail on Windows if entry is currently mapped
+                pass
+
+
+    def _path(self, key, extension=None):
+        """Returns cache entry file path for key."""
+        return os.path.join(self.directory, "%s%s" % (key, extension or self.EXTENSION))
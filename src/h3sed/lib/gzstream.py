@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming gzip functionality: incremental decompression of gzipped files,
+tolerating truncated files and trailing garbage; parallel compression
+of gzipped files in independent blocks, reusable in recompression;
+random access into compressed files via checkpoint index.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+from multiprocessing.pool import ThreadPool
+import bisect
+import collections
+import logging
+import multiprocessing
+import struct
+import threading
+import time
+import zlib
+
+try: import queue                          # Py3
+except ImportError: import Queue as queue  # Py2
+
+from . import util
+
+logger = logging.getLogger(__name__)
+
+
+"""Size of compressed chunks read from file at a time, in bytes."""
+CHUNK_SIZE = 2**16
+
+"""Maximum size of uncompressed chunks yielded at a time, in bytes."""
+OUTPUT_SIZE = 2**18
+
+"""Number of uncompressed chunks to buffer ahead when decompressing in background."""
+QUEUE_SIZE = 16
+
+"""Gzip member header magic bytes."""
+MAGIC = b"\x1F\x8B"
+
+"""Gzip header flags."""
+FTEXT, FHCRC, FEXTRA, FNAME, FCOMMENT = 1, 2, 4, 8, 16
+
+"""Size of uncompressed blocks to compress independently, in bytes."""
+BLOCK_SIZE = 2**17
+
+"""Default compression level, 1..9."""
+LEVEL = 6
+
+"""Size of gzip header written by compress(), in bytes."""
+HEADER_SIZE = 10
+
+"""Size of deflate history window, in bytes."""
+WINDOW_SIZE = 2**15
+
+"""Final empty deflate block ending a stream of flushed blocks."""
+FINAL_BLOCK = b"\x03\x00"
+
+"""Compressed block of a stream written by compress(), with uncompressed span and CRC32."""
+Block = collections.namedtuple("Block", ["start", "end", "level", "crc", "data"])
+
+"""Cache of CRC32 combination operators, as {length: [32 x GF(2) matrix row]}."""
+CRC_OPERATORS = {}
+
+
+def compress(buffer, fileobj, level=LEVEL, workers=None, blocksize=BLOCK_SIZE,
+             blocks=None, changed=None):
+    """
+    Writes buffer to file as a single-member gzip stream, compressing blocks in parallel.
+
+    Blocks are deflated independently, primed with preceding content as dictionary,
+    and ended with a full flush, so that concatenated they form one valid deflate stream.
+
+    If given blocks from a previous compress() of the same-length buffer,
+    reuses blocks where neither block content nor its dictionary has changed.
+
+    @param   buffer     bytes-like content to compress
+    @param   fileobj    writable binary file object
+    @param   level      compression level, 1..9
+    @param   workers    number of compression threads, defaults to CPU count
+    @param   blocksize  size of uncompressed blocks
+    @param   blocks     [Block, ] from previous compress() to reuse, if any
+    @param   changed    spans changed in buffer since previous compress(),
+                        as [(start, end), ]; all blocks considered changed if None
+    @return             [Block, ] as written
+    """
+    spans = [(i, min(i + blocksize, len(buffer))) for i in range(0, len(buffer), blocksize)]
+    reusables = {}
+    if blocks and changed is not None and sum(b.end - b.start for b in blocks) == len(buffer):
+        reusables = {(b.start, b.end): b for b in blocks if b.level == level
+                     and not any(s < b.end and e > b.start - WINDOW_SIZE for s, e in changed)}
+
+    def deflate(span):
+        if span in reusables: return reusables[span]
+        start, end = span
+        data = deflate_block(buffer[start:end], level, buffer[max(0, start - WINDOW_SIZE):start])
+        return Block(start, end, level, zlib.crc32(buffer[start:end]) & 0xFFFFFFFF, data)
+
+    result, crc = [], 0
+    todo = [x for x in spans if x not in reusables]
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(todo)))
+    pool = ThreadPool(workers) if workers > 1 else None
+    try:
+        xfl = b"\x02" if level >= 9 else b"\x04" if level <= 1 else b"\x00"
+        fileobj.write(MAGIC + b"\x08\x00" + struct.pack("<L", int(time.time())) + xfl + b"\xFF")
+        for block in pool.imap(deflate, spans) if pool else map(deflate, spans):
+            fileobj.write(block.data)
+            crc = crc32_combine(crc, block.crc, block.end - block.start)
+            result.append(block)
+        fileobj.write(FINAL_BLOCK)
+        fileobj.write(struct.pack("<LL", crc, len(buffer) & 0xFFFFFFFF))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    if reusables:
+        logger.info("Reused %s of %s compressed blocks.", len(spans) - len(todo), len(spans))
+    return result
+
+
+def crc32_combine(crc1, crc2, len2):
+    """Returns CRC32 of concatenated content, from CRC32 of both parts and second length."""
+    if not len2: return crc1
+    if len2 not in CRC_OPERATORS:
+        # Operator for advancing CRC32 over a single zero bit, then squared to cover len2 bytes
+        power, result, bits = [0xEDB88320] + [1 << i for i in range(31)], None, len2 * 8
+        while bits:
+            if bits & 1: result = power if result is None else _gf2_matrix_product(power, result)
+            bits >>= 1
+            if bits: power = _gf2_matrix_product(power, power)
+        CRC_OPERATORS[len2] = result
+    return _gf2_matrix_times(CRC_OPERATORS[len2], crc1) ^ crc2
+
+
+def deflate_block(buffer, level=LEVEL, zdict=None):
+    """
+    Returns buffer compressed as raw deflate data ending with a full flush.
+
+    @param   zdict  content preceding buffer in stream, if any, for back-references
+    """
+    args = (level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    try: compressor = zlib.compressobj(*args, zdict=zdict) if zdict else zlib.compressobj(*args)
+    except TypeError: compressor = zlib.compressobj(*args)  # Py2 has no zdict
+    return compressor.compress(buffer) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+def header_length(buffer):
+    """
+    Returns the length of gzip member header at start of buffer,
+    or None if buffer does not contain the full header yet.
+
+    @throws  ValueError  if buffer does not start with a gzip header
+    """
+    if len(buffer) < 10: return None
+    if buffer[:2] != MAGIC or buffer[2:3] != b"\x08":
+        raise ValueError("Not a gzipped file.")
+    flags, pos = ord(buffer[3:4]), 10
+    if flags & FEXTRA:
+        if len(buffer) < pos + 2: return None
+        pos += 2 + struct.unpack("<H", buffer[pos:pos + 2])[0]
+    for flag in (FNAME, FCOMMENT):
+        if not flags & flag: continue # for flag
+        end = buffer.find(b"\x00", pos)
+        if end < 0: return None
+        pos = end + 1
+    if flags & FHCRC: pos += 2
+    return pos if len(buffer) >= pos else None
+
+
+def read_range(source, start, end, index=None):
+    """
+    Returns uncompressed content from start to end, inflating only as much as needed:
+    from the nearest checkpoint before start if index given, else from stream start.
+
+    @param   source  file path, or readable binary file object if no index
+    @param   index   Index for source, if any
+    """
+    point = index.locate(start) if index else None
+    if point:
+        uoffset, coffset, window = point
+        try:
+            args = (-zlib.MAX_WBITS, ) + ((window, ) if window else ())
+            inflater = zlib.decompressobj(*args)
+        except TypeError: point = None  # Py2 cannot set dictionary
+    result = bytearray()
+    if not point:
+        for chunk in Inflater(source).iterate():
+            result += chunk
+            if len(result) >= end: break # for chunk
+        return bytes(result[start:end])
+
+    with open(source, "rb") as f:
+        f.seek(coffset)
+        while uoffset + len(result) < end and not inflater.eof:
+            data = inflater.unconsumed_tail or f.read(CHUNK_SIZE)
+            if not data: break # while
+            result += inflater.decompress(data, OUTPUT_SIZE)
+    return bytes(result[start - uoffset:end - uoffset])
+
+
+def read_trailer(filename):
+    """
+    Returns (CRC32, ISIZE) from the last 8 bytes of gzipped file,
+    or None if file is too short.
+    """
+    with open(filename, "rb") as f:
+        f.seek(0, 2)
+        if f.tell() < 18: return None
+        f.seek(-8, 2)
+        return struct.unpack("<LL", f.read(8))
+
+
+
+class Index(object):
+    """
+    Checkpoint index for random access into a gzip stream: points where inflate can
+    resume at a byte boundary, given the preceding window of uncompressed content.
+
+    Available for streams written by compress(), whose blocks end with a full flush.
+    """
+
+    """Header bytes of serialized index."""
+    MAGIC = b"H3GZIDX\x01"
+
+
+    def __init__(self, points=()):
+        """
+        @param   points  [(uncompressed offset, compressed offset, window bytes), ]
+        """
+        self.points = sorted(points)
+        self._offsets = [x[0] for x in self.points]
+
+
+    def locate(self, offset):
+        """Returns the last checkpoint at or before uncompressed offset, or None."""
+        i = bisect.bisect_right(self._offsets, offset)
+        return self.points[i - 1] if i else None
+
+
+    def dumps(self):
+        """Returns index serialized as bytes."""
+        result = [self.MAGIC, struct.pack("<L", len(self.points))]
+        for uoffset, coffset, window in self.points:
+            window = zlib.compress(window, 1) if window else b""
+            result.append(struct.pack("<QQL", uoffset, coffset, len(window)) + window)
+        return b"".join(result)
+
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Returns index deserialized from bytes.
+
+        @throws  ValueError  if data is not a valid serialized index
+        """
+        if data[:len(cls.MAGIC)] != cls.MAGIC: raise ValueError("Not a gzip index.")
+        try:
+            pos = len(cls.MAGIC) + 4
+            points, (count, ) = [], struct.unpack("<L", data[pos - 4:pos])
+            for _ in range(count):
+                uoffset, coffset, size = struct.unpack("<QQL", data[pos:pos + 20])
+                window = zlib.decompress(data[pos + 20:pos + 20 + size]) if size else b""
+                points.append((uoffset, coffset, window))
+                pos += 20 + size
+        except (struct.error, zlib.error) as e:
+            raise ValueError("Invalid gzip index: %s" % e)
+        return cls(points)
+
+
+    @classmethod
+    def from_blocks(cls, blocks, buffer):
+        """
+        Returns index with a checkpoint at every block of stream written by compress().
+
+        @param   blocks  [Block, ] as returned from compress()
+        @param   buffer  uncompressed content as given to compress()
+        """
+        points, coffset = [], HEADER_SIZE
+        for block in blocks:
+            window = bytes(buffer[max(0, block.start - WINDOW_SIZE):block.start])
+            points.append((block.start, coffset, window))
+            coffset += len(block.data)
+        return cls(points)
+
+
+
+class Inflater(object):
+    """
+    Incremental gzip decompressor, iterable over uncompressed chunks.
+
+    Concatenated gzip members are decompressed in sequence. Decompression
+    stops without error at end of a truncated file, and at any content
+    other than null padding or another member after a complete member.
+    """
+
+    def __init__(self, source, chunksize=CHUNK_SIZE, outsize=OUTPUT_SIZE):
+        """
+        @param   source     file path, or readable binary file object
+        @param   chunksize  size of compressed chunks to read at a time
+        @param   outsize    maximum size of uncompressed chunks to yield at a time
+        """
+        self.source    = source
+        self.chunksize = chunksize
+        self.outsize   = outsize
+        self.crc       = 0     # CRC32 of uncompressed content
+        self.size      = 0     # Size of uncompressed content
+        self.members   = 0     # Number of gzip members fully decompressed
+        self.trailer   = None  # (CRC32, ISIZE) from last complete member trailer
+        self.truncated = False # Whether file ended before end of gzip stream
+
+
+    def __iter__(self):
+        """Yields uncompressed chunks from source."""
+        f = open(self.source, "rb") if isinstance(self.source, util.text_types) else self.source
+        try:
+            for chunk in self._inflate(f): yield chunk
+        finally:
+            if f is not self.source: f.close()
+
+
+    def iterate(self, background=False):
+        """
+        Yields uncompressed chunks from source.
+
+        @param   background  whether to decompress in a background thread,
+                             overlapping decompression with chunk consumption
+        """
+        if not background:
+            for chunk in self: yield chunk
+            return
+
+        chunks, stop = queue.Queue(QUEUE_SIZE), threading.Event()
+        def put(item):  # Gives up once consumer has stopped, as queue may stay full
+            while not stop.is_set():
+                try: chunks.put(item, timeout=0.1)
+                except queue.Full: continue # while
+                break # while
+        def worker():
+            try:
+                for chunk in self:
+                    put((chunk, None))
+                    if stop.is_set(): break # for chunk
+            except Exception as e:
+                put((None, e))
+            else:
+                put((None, None))
+        thread = threading.Thread(target=worker, name="gzstream")
+        thread.daemon = True
+        thread.start()
+        try:
+            while True:
+                chunk, error = chunks.get()
+                if error is not None: raise error
+                if chunk is None: break # while
+                yield chunk
+        finally:
+            stop.set()
+            thread.join()
+
+
+    def _inflate(self, f):
+        """Yields uncompressed chunks from file object."""
+        buffer = f.read(self.chunksize)
+        while True:
+            try:
+                size = header_length(buffer)
+                while size is None:
+                    more = f.read(self.chunksize)
+                    if not more: break # while
+                    buffer += more
+                    size = header_length(buffer)
+            except ValueError:
+                if not self.members: raise
+                logger.info("Ignoring trailing content after gzip stream in %s.", self.source)
+                return
+            if size is None:
+                if not self.members: raise ValueError("Not a gzipped file.")
+                self.truncated = True
+                return
+
+            inflater, data, crc = zlib.decompressobj(-zlib.MAX_WBITS), buffer[size:], 0
+            while not inflater.eof:
+                if not data:
+                    data = f.read(self.chunksize)
+                    if not data: break # while
+                chunk = inflater.decompress(data, self.outsize)
+                data = inflater.unconsumed_tail
+                if chunk:
+                    crc = zlib.crc32(chunk, crc)
+                    self.crc, self.size = zlib.crc32(chunk, self.crc), self.size + len(chunk)
+                    yield chunk
+            if not inflater.eof:
+                logger.warning("Compressed file %s ended before end of gzip stream.", self.source)
+                self.truncated = True
+                return
+
+            buffer = inflater.unused_data
+            while len(buffer) < 8:
+                more = f.read(self.chunksize)
+                if not more: break # while
+                buffer += more
+            if len(buffer) < 8:
+                logger.warning("Compressed file %s ended before gzip trailer.", self.source)
+                self.truncated = True
+                return
+            self.members += 1
+            self.trailer = struct.unpack("<LL", buffer[:8])
+            if self.trailer[0] != crc & 0xFFFFFFFF:
+                logger.warning("CRC mismatch in %s gzip member #%s.", self.source, self.members)
+
+            buffer = buffer[8:].lstrip(b"\x00")  # Consume null padding until next member
+            while not buffer:
+                buffer = f.read(self.chunksize)
+                if not buffer: return
+                buffer = buffer.lstrip(b"\x00")
+
+
+def _gf2_matrix_product(mat, mat2):
+    """Returns GF(2) matrix product of 32x32 matrices, as operator applying mat2 then mat."""
+    return [_gf2_matrix_times(mat, row) for row in mat2]
+
+
+def _gf2_matrix_times(mat, vec):
+    """Returns GF(2) matrix times vector."""
+    result, i = 0, 0
+    while vec:
+        if vec & 1: result ^= mat[i]
+        vec >>= 1
+        i += 1
+    return result
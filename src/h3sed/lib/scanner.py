@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental scanning of binary content for fixed-width structs,
+able to consume content as it arrives.
+
+Uses NumPy if available for vectorized prefiltering of match candidates.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import logging
+import re
+import time
+try: import re._parser as sre_parse  # Py3.11+
+except ImportError: import sre_parse
+
+try: import numpy
+except ImportError: numpy = None
+
+logger = logging.getLogger(__name__)
+
+
+"""Results of pattern analysis, as {(function name, regex): result}."""
+PATTERN_CACHE = {}
+
+
+def pattern_checks(regex):
+    """
+    Returns byte class checks at fixed offsets from match start of regular expression,
+    with consecutive same-class bytes merged, and branches of equal-width alternatives
+    as nested checks per alternative.
+
+    @return  ([(offset, length, table) or (offset, [[alternative checks], ])], complete),
+             with table as 256-byte bytes of 1 for allowed values, and complete
+             as whether checks span the whole regex, or end at its first element
+             of variable width; elements of unsupported byte class are skipped
+    """
+    if ("checks", regex) in PATTERN_CACHE: return PATTERN_CACHE["checks", regex]
+    if regex.flags & re.IGNORECASE: return [], False
+
+    def make_table(name, value):
+        table = bytearray(256)
+        if "LITERAL" == name and value < 256: table[value] = 1
+        elif "NOT_LITERAL" == name:
+            table = bytearray(b"\x01" * 256)
+            if value < 256: table[value] = 0
+        elif "IN" == name:
+            negate = False
+            for op, av in value:
+                opname = str(op).upper()
+                if "NEGATE" == opname: negate = True
+                elif "LITERAL" == opname and av < 256: table[av] = 1
+                elif "RANGE" == opname:
+                    lo, hi = av[0], min(av[1], 255)
+                    table[lo:hi + 1] = b"\x01" * (hi + 1 - lo)
+                else: return None
+            if negate: table = bytearray(1 - x for x in table)
+        else: return None
+        return bytes(table)
+
+    def merge(items):
+        result = []
+        for item in items:
+            if len(item) > 2: offset, table = item[0], item[2]
+            if len(item) < 3 or not result or len(result[-1]) < 3 \
+            or result[-1][2] != table or sum(result[-1][:2]) != offset:
+                result.append(item)
+            else: result[-1] = (result[-1][0], result[-1][1] + 1, table)
+        return result
+
+    def walk(items, offset, result):
+        for op, av in items:
+            name = str(op).upper()
+            if name in ("LITERAL", "NOT_LITERAL", "IN"):
+                table = make_table(name, av)
+                if table is not None: result.append((offset, 1, table))
+                offset += 1
+            elif "ANY" == name: offset += 1
+            elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+                if av[0] != av[1]: return None
+                for _ in range(av[0]):
+                    offset = walk(av[2], offset, result)
+                    if offset is None: return None
+            elif "SUBPATTERN" == name:
+                offset = walk(av[-1], offset, result)
+                if offset is None: return None
+            elif "BRANCH" == name:
+                widths = set(x.getwidth() for x in av[1])
+                if len(widths) != 1 or len(set(next(iter(widths)))) != 1: return None
+                alternatives = []
+                for alternative in av[1]:
+                    checks = []
+                    if walk(alternative, 0, checks) is None: return None
+                    alternatives.append(merge(checks))
+                result.append((offset, alternatives))
+                offset += next(iter(widths))[0]
+            elif "AT" != name: return None
+        return offset
+
+    items = []
+    complete = walk(sre_parse.parse(regex.pattern, regex.flags), 0, items) is not None
+    PATTERN_CACHE["checks", regex] = result = (merge(items), complete)
+    return result
+
+
+def pattern_constraints(regex):
+    """
+    Returns byte class constraints at fixed offsets from match start of regular expression,
+    up to its first element of variable width, with consecutive same-class bytes merged.
+
+    Constraints are necessary conditions for a match, not sufficient:
+    branches of equal-width alternatives only advance offset.
+
+    @return  [(offset, length, table)], with table as 256-byte bytes of 1 for allowed values
+    """
+    return [x for x in pattern_checks(regex)[0] if len(x) > 2]
+
+
+def pattern_width(regex):
+    """Returns maximum match length of compiled regular expression, or None if unbounded."""
+    _, maxwidth = pattern_widths(regex)
+    return None if maxwidth >= sre_parse.MAXREPEAT else maxwidth
+
+
+def pattern_widths(regex):
+    """Returns (minimum, maximum) match length of compiled regular expression."""
+    if ("widths", regex) not in PATTERN_CACHE:
+        PATTERN_CACHE["widths", regex] = sre_parse.parse(regex.pattern, regex.flags).getwidth()
+    return PATTERN_CACHE["widths", regex]
+
+
+
+class StreamScanner(object):
+    """
+    Finds consecutive regex matches in a growing buffer.
+
+    Scanning starts with a search for the first match from given offset,
+    and continues with searches constrained to a window after the previous match,
+    ending at the first window without matches.
+
+    Searches proceed region by region, reporting progress and checking for cancel
+    between regions. If searching a region exceeds time budget, scanning switches
+    to linear-time matching for the remainder, guarding against catastrophic
+    regex backtracking on unusual content. A region search already underway
+    cannot be interrupted, as regex engine holds the interpreter lock.
+    """
+
+    """Maximum content size to search at a time, between progress reports."""
+    REGION = 2**16
+
+    def __init__(self, regex, start=0, window=None, accept=None, budget=None, progress=None):
+        """
+        @param   regex     compiled regular expression with bounded match length
+        @param   start     buffer offset to start searching from
+        @param   window    size of search window from current position once any match
+                           has been found, if not searching until end of buffer
+        @param   accept    callback(match) returning whether match is a valid result;
+                           on rejection, scanning resumes from next byte after match start
+        @param   budget    seconds allowed for searching one region before switching
+                           to linear-time matching, if any
+        @param   progress  callback(pos, size) invoked after each region searched, if any
+        """
+        self.regex    = regex
+        self.window   = window
+        self.accept   = accept
+        self.budget   = budget
+        self.progress = progress
+        self.pos      = start
+        self.matches  = []     # [re.Match, ] accepted so far
+        self.done     = False  # Whether scanning has reached its end
+        self.linear   = False  # Whether scanning has switched to linear-time matching
+        self.cancelled = False # Whether scanning was cancelled before reaching its end
+        self._width   = pattern_width(regex)
+        self._found   = False  # Whether any match has been encountered yet
+        self._matcher = None   # LinearMatcher, once switched to linear-time matching
+        self._layout  = None   # Match spans expected from an earlier scan, if any
+
+
+    def cancel(self):
+        """Stops scanning at the next region boundary, keeping matches found so far."""
+        self.cancelled = True
+
+
+    def feed(self, buffer, final=False):
+        """
+        Scans buffer content available so far, returns list of new accepted matches.
+
+        @param   buffer  bytes-like content, with previously fed content unchanged
+        @param   final   whether buffer contains all content
+        """
+        result, size = [], len(buffer)
+        while not self.done:
+            if self.cancelled:
+                self.done = True
+                break # while
+            expected = self._expect()
+            if expected: endpos = expected[1]
+            else: endpos = size if not self._found or not self.window else self.pos + self.window
+            if endpos > size:
+                if not final and self._found: break # while
+                endpos = size
+            if self._width is None and not final: break # while
+            match = self._search_regions(buffer, self.pos, endpos)
+            if self.cancelled: continue # while
+            if expected and (not match or match.span() != expected):
+                if not final and endpos < expected[1] \
+                and (not match or match.start() > size - self._width):  # Not arrived yet
+                    self.pos = max(self.pos, size - self._width + 1)
+                    break # while
+                self._layout = None  # Content differs from earlier scan
+                continue # while  Regular scanning takes over from current position
+            if not match:
+                if final or (self._found and self.window):
+                    self.done = True
+                else:  # Resume after content that can no longer start a complete match
+                    self.pos = max(self.pos, size - self._width + 1)
+                break # while
+            if not final and match.start() > size - self._width:
+                break # while  Earlier match might still start before this one
+            self._found = True
+            if not self.accept or self.accept(match):
+                self.matches.append(match)
+                result.append(match)
+                self.pos = match.end()
+            else: self.pos = match.start() + 1
+        return result
+
+
+    def expect(self, spans):
+        """
+        Sets match spans expected from an earlier scan of similar content,
+        confirming each next match at the same spacing from the previous one
+        by searching only up to its expected end, instead of the whole window.
+
+        Scanning proceeds as usual, including the search for content before
+        the first expected match, and gives the same results as without expectations:
+        regular scanning takes over from the first match not where expected.
+
+        @param   spans  match spans from earlier scan, as [(start, end), ]
+        """
+        if not self.matches and not self.done: self._layout = list(spans) or None
+
+
+    def _expect(self):
+        """Returns span of next expected match, or None if no more expectations."""
+        index = len(self.matches)
+        if not self._layout or index >= len(self._layout): return None
+        if not index: start, end = self._layout[0]
+        else:
+            (_, end0), (start1, end1) = self._layout[index - 1], self._layout[index]
+            start, end = self.pos + start1 - end0, self.pos + end1 - end0
+        if start < self.pos or (self._found and self.window and end > self.pos + self.window):
+            self._layout = None
+            return None
+        return start, end
+
+
+    def _search(self, buffer, pos, endpos):
+        """Returns first regex match in buffer starting from pos and ending by endpos, or None."""
+        return self.regex.search(buffer, pos, endpos)
+
+
+    def _search_linear(self, buffer, pos, endpos):
+        """Returns first match like _search(), using linear-time matching."""
+        matcher = self._get_matcher()
+        return matcher.search(buffer, pos, endpos) if matcher else self._search(buffer, pos, endpos)
+
+
+    def _get_matcher(self):
+        """Returns LinearMatcher for regex, or None if regex not supported."""
+        if self._matcher is None:
+            self._matcher = LinearMatcher(self.regex) if LinearMatcher.supports(self.regex) else False
+        return self._matcher or None
+
+
+    def _search_regions(self, buffer, pos, endpos):
+        """
+        Returns first match like _search(), searching region by region within time budget,
+        switching to linear-time matching once any region exceeds budget.
+        Returns None on cancel.
+        """
+        while True:
+            if self.cancelled: return None
+            end = endpos if not self._width else min(endpos, pos + self.REGION + self._width - 1)
+            started = time.time()
+            if self.linear: match = self._search_linear(buffer, pos, end)
+            else: match = self._search(buffer, pos, end)
+            if self.budget and not self.linear and time.time() - started > self.budget:
+                logger.warning("Regex search of %s bytes at offset %s exceeded time budget of "
+                               "%s seconds, switching to linear-time matching.",
+                               end - pos, pos, self.budget)
+                self.linear = True
+            if self.progress: self.progress(end, len(buffer))
+            if match or end >= endpos: return match
+            pos = end - self._width + 1
+
+
+
+class LinearMatcher(object):
+    """
+    Regex search in time linear to content size, for fixed-width regular expressions
+    prone to catastrophic backtracking.
+
+    Finds candidates with a probe regex of plain byte classes at fixed offsets,
+    verifies each byte class and each branch of equal-width alternatives independently
+    at its own offset, and runs the regex itself only on fully verified candidates.
+    """
+
+    def __init__(self, regex):
+        """
+        @param   regex  compiled regular expression of fixed match length,
+                        supported by LinearMatcher.supports()
+        """
+        self.regex  = regex
+        self.width  = pattern_width(regex)
+        self.checks = self._compile(pattern_checks(regex)[0])
+        parts, pos = [], 0
+        for offset, length, table in pattern_constraints(regex):
+            ranges, value = [], 0
+            while value < 256:
+                if not table[value]:
+                    value += 1
+                    continue # while
+                last = value
+                while last < 255 and table[last + 1]: last += 1
+                ranges.append(b"\\x%02X-\\x%02X" % (value, last))
+                value = last + 1
+            if offset > pos: parts.append(b".{%d}" % (offset - pos))
+            parts.append(b"[%s]{%d}" % (b"".join(ranges), length) if ranges else b"(?!)")
+            pos = offset + length
+        self.probe = re.compile(b"(?=%s)" % b"".join(parts), re.DOTALL)
+
+
+    @classmethod
+    def supports(cls, regex):
+        """Returns whether regex has fixed width and byte class checks spanning all of it."""
+        minwidth, maxwidth = pattern_widths(regex)
+        return minwidth == maxwidth and pattern_checks(regex)[1]
+
+
+    def search(self, buffer, pos, endpos):
+        """Returns first regex match in buffer starting from pos and ending by endpos, or None."""
+        for probe in self.probe.finditer(buffer, pos, endpos):
+            start = probe.start()
+            if start + self.width > endpos: break # for probe
+            if self.verify(buffer, start):
+                match = self.regex.match(buffer, start, endpos)
+                if match: return match
+        return None
+
+
+    def verify(self, buffer, start):
+        """Returns whether buffer content at start passes all byte class and branch checks."""
+        return self._check(self.checks, buffer, start)
+
+
+    def _check(self, checks, buffer, start):
+        """Returns whether buffer content at start passes given compiled checks."""
+        for item in checks:
+            if 3 == len(item):
+                offset, length, invalids = item
+                chunk = bytes(buffer[start + offset:start + offset + length])
+                if len(chunk) != length or chunk.translate(None, invalids) != chunk: return False
+            elif not any(self._check(x, buffer, start + item[0]) for x in item[1]):
+                return False
+        return True
+
+
+    @classmethod
+    def _compile(cls, checks):
+        """Returns pattern_checks() result with tables as bytes of disallowed values."""
+        result = []
+        for item in checks:
+            if 3 == len(item):
+                invalids = bytes(bytearray(i for i, x in enumerate(bytearray(item[2])) if not x))
+                result.append((item[0], item[1], invalids))
+            else: result.append((item[0], [cls._compile(x) for x in item[1]]))
+        return result
+
+
+
+class MaskScanner(StreamScanner):
+    """
+    StreamScanner finding match candidates with vectorized NumPy checks of byte classes
+    at fixed offsets in regex, confirming only the candidates with regex itself.
+
+    Produces the same matches as StreamScanner. Requires NumPy and a fixed-width regex.
+    """
+
+    """Minimum content size to find candidates in at a time."""
+    BLOCK = 2**18
+
+    def __init__(self, regex, start=0, window=None, accept=None, budget=None, progress=None):
+        """
+        @param   regex     compiled regular expression of fixed match length
+        @param   start     buffer offset to start searching from
+        @param   window    size of search window from current position once any match
+                           has been found, if not searching until end of buffer
+        @param   accept    callback(match) returning whether match is a valid result;
+                           on rejection, scanning resumes from next byte after match start
+        @param   budget    seconds allowed for searching one region before switching
+                           to linear-time matching, if any
+        @param   progress  callback(pos, size) invoked after each region searched, if any
+        """
+        super(MaskScanner, self).__init__(regex, start, window, accept, budget, progress)
+        self._runs  = sorted(pattern_constraints(regex), key=lambda x: -x[1])  # Longest first
+        self._luts  = {}  # {table: numpy boolean array of allowed byte values}
+        self._upto  = start  # Offset up to which candidates have been found, exclusive
+        self._candidates = numpy.zeros(0, dtype=numpy.intp)
+
+
+    @classmethod
+    def supports(cls, regex):
+        """Returns whether NumPy is available and regex has fixed width and byte constraints."""
+        if numpy is None: return False
+        minwidth, maxwidth = pattern_widths(regex)
+        return minwidth == maxwidth and bool(pattern_constraints(regex))
+
+
+    def _search(self, buffer, pos, endpos, verify=None):
+        """
+        Returns first regex match in buffer starting from pos and ending by endpos, or None.
+
+        @param   verify  callback(buffer, start) returning whether to try regex on candidate
+        """
+        limit = min(endpos, len(buffer)) - self._width + 1  # Last possible match start + 1
+        while True:
+            index = numpy.searchsorted(self._candidates, pos)
+            while index < len(self._candidates):
+                start = int(self._candidates[index])
+                if start >= limit: return None
+                if not verify or verify(buffer, start):
+                    match = self.regex.match(buffer, start, endpos)
+                    if match: return match
+                index += 1
+            if self._upto >= limit: return None
+            pos = max(pos, self._upto)
+            self._extend(buffer, self._upto + self.BLOCK)
+
+
+    def _search_linear(self, buffer, pos, endpos):
+        """Returns first match like _search(), verifying candidates before running regex."""
+        matcher = self._get_matcher()
+        return self._search(buffer, pos, endpos, matcher.verify if matcher else None)
+
+
+    def _extend(self, buffer, end):
+        """Finds candidates for match starts in buffer content not yet examined, up to end."""
+        lo, hi = self._upto, min(end, len(buffer) - self._width + 1)
+        if hi <= lo: return
+        view = numpy.frombuffer(buffer, numpy.uint8, hi - lo + self._width - 1, lo)
+        try: starts = self._filter(view, hi - lo) + lo
+        finally: del view  # Release buffer export, allowing bytearray to grow
+        self._candidates = numpy.concatenate([self._candidates, starts])
+        self._upto = hi
+
+
+    def _filter(self, view, count):
+        """
+        Returns positions in view passing all byte class constraints, as numpy array.
+
+        Long runs are checked over all positions with a cumulative count of
+        disallowed bytes, remaining runs only at positions still passing.
+        """
+        result = None
+        for offset, length, table in self._runs:
+            if table not in self._luts:
+                self._luts[table] = numpy.frombuffer(table, numpy.uint8).astype(bool)
+            lut = self._luts[table]
+            if result is None or len(result) * length > count:
+                valid = lut[view[offset:offset + count + length - 1]]
+                if length > 1:
+                    invalids = numpy.concatenate(([0], numpy.cumsum(~valid, dtype=numpy.intp)))
+                    valid = invalids[length:] == invalids[:-length]
+                result = numpy.flatnonzero(valid) if result is None else result[valid[result]]
+            else:
+                columns = view[result[:, None] + (offset + numpy.arange(length))]
+                result = result[lut[columns].all(axis=1)]
+            if not len(result): break # for offset, length, table
+        return numpy.arange(count) if result is None else result
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Map of named sections in binary content, like savefile header and hero table,
+with unmapped regions between them reported as unknown.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import bisect
+
+
+class SectionMap(object):
+    """
+    Named non-overlapping byte spans of content, ordered by offset.
+
+    Kept up to date with content patches: spans after a resized patch get shifted,
+    and a section containing a resized patch grows or shrinks with it.
+    """
+
+    """Name of regions not covered by any section."""
+    UNKNOWN = "unknown"
+
+
+    def __init__(self, size=0, sections=()):
+        """
+        @param   size      total content size
+        @param   sections  [(name, (start, end)), ] in any order
+        """
+        self.size    = size
+        self._starts = []  # [section start, ] in ascending order
+        self._items  = []  # [(start, end, name), ] in ascending order
+        for name, span in sections: self.add(name, span)
+
+
+    def add(self, name, span):
+        """
+        Adds or replaces named section, raises ValueError if span overlaps another section.
+
+        @param   span  (start, end)
+        """
+        start, end = span
+        self.remove(name)
+        i = bisect.bisect_right(self._starts, start)
+        if end < start or (i and self._items[i - 1][1] > start) \
+        or (i < len(self._items) and self._items[i][0] < end):
+            raise ValueError("Section %r %s overlaps existing sections." % (name, span))
+        self._starts.insert(i, start)
+        self._items.insert(i, (start, end, name))
+        self.size = max(self.size, end)
+
+
+    def remove(self, name):
+        """Removes named section, if any."""
+        for i, item in enumerate(self._items):
+            if item[2] == name:
+                del self._starts[i], self._items[i]
+                break # for i, item
+
+
+    def get(self, name):
+        """Returns (start, end) of named section, or None."""
+        return next(((s, e) for s, e, n in self._items if n == name), None)
+
+
+    def find(self, offset):
+        """Returns (name, (start, end)) of section or unknown region containing offset."""
+        if not 0 <= offset < self.size: return None
+        i = bisect.bisect_right(self._starts, offset)
+        if i and offset < self._items[i - 1][1]:
+            start, end, name = self._items[i - 1]
+            return name, (start, end)
+        start = self._items[i - 1][1] if i else 0
+        end = self._items[i][0] if i < len(self._items) else self.size
+        return self.UNKNOWN, (start, end)
+
+
+    def items(self):
+        """Returns all sections and unknown regions, as [(name, (start, end)), ] in order."""
+        result, pos = [], 0
+        for start, end, name in self._items:
+            if start > pos: result.append((self.UNKNOWN, (pos, start)))
+            result.append((name, (start, end)))
+            pos = end
+        if pos < self.size: result.append((self.UNKNOWN, (pos, self.size)))
+        return result
+
+
+    def resize(self, span, length):
+        """
+        Updates sections for content span replaced with content of new length:
+        shifts sections after span, and resizes section containing span.
+        Sections partially overlapping a resized span are removed.
+        """
+        start, end = span
+        delta = length - (end - start)
+        if not delta: return
+        items = []
+        for s, e, name in self._items:
+            if e <= start:                  items.append((s, e, name))
+            elif s >= end:                  items.append((s + delta, e + delta, name))
+            elif s <= start and e >= end:   items.append((s, e + delta, name))
+        self._items  = items
+        self._starts = [x[0] for x in items]
+        self.size   += delta
+
+
+    def copy(self):
+        """Returns a copy of this map."""
+        result = SectionMap(self.size)
+        result._starts, result._items = list(self._starts), list(self._items)
+        return result
+
+
+    def __contains__(self, name):
+        """Returns whether map has named section."""
+        return any(n == name for _, _, n in self._items)
+
+
+    def __repr__(self):
+        return "%s(size=%s, %s)" % (type(self).__name__, self.size, ", ".join(
+               "%s=%s..%s" % (n, s, e) for s, e, n in self._items))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Span overlay for tracking original contents of a buffer patched in place.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+
+
+class SpanBuffer(object):
+    """
+    Read-only view of original buffer contents, for a buffer being patched in place.
+
+    Shares all unpatched memory with the live buffer, keeping only pre-images
+    of patched spans. Supports len() and indexing or slicing like bytes.
+
+    Safe for reading in another thread while buffer is being patched:
+    pre-images are in place before buffer changes, and reads take buffer
+    content before overlaying pre-images.
+    """
+
+    def __init__(self, buffer, revision=None):
+        """
+        @param   buffer    live bytearray or writable mmap, to be patched only after record()
+        @param   revision  buffer revision this view was taken at, if tracked
+        """
+        self.buffer   = buffer
+        self.revision = revision
+        self._spans   = []  # Pre-images of patched spans, as [(start, bytes), ], sorted
+
+
+    def record(self, start, end):
+        """Saves original content of span about to be patched in buffer, if not already saved."""
+        lo, hi, merged, result = start, end, [], []
+        for s, blob in self._spans:
+            if s + len(blob) < start or s > end: result.append((s, blob))
+            else:
+                lo, hi = min(lo, s), max(hi, s + len(blob))
+                merged.append((s, blob))
+        if len(merged) == 1 and (lo, hi) == (merged[0][0], merged[0][0] + len(merged[0][1])):
+            return  # Span fully recorded already
+        blob = bytearray(self.buffer[lo:hi])
+        for s, x in merged: blob[s - lo:s - lo + len(x)] = x
+        result.append((lo, bytes(blob)))
+        self._spans = sorted(result)
+
+
+    def discard(self, start, end):
+        """Forgets pre-images within span, making current buffer content original."""
+        result = []
+        for s, blob in self._spans:
+            e = s + len(blob)
+            if e <= start or s >= end:
+                result.append((s, blob))
+                continue # for s, blob
+            if s < start: result.append((s, blob[:start - s]))
+            if e > end:   result.append((end, blob[end - s:]))
+        self._spans = result
+
+
+    def clear(self):
+        """Forgets all pre-images, making current buffer contents original."""
+        del self._spans[:]
+
+
+    def copy(self):
+        """Returns a copy of this view, over the same buffer."""
+        result = SpanBuffer(self.buffer, self.revision)
+        result._spans = list(self._spans)
+        return result
+
+
+    def dirty_spans(self):
+        """Returns spans where buffer differs from original, as [(start, end), ]."""
+        return [(s, s + len(blob)) for s, blob in self._spans
+                if self.buffer[s:s + len(blob)] != blob]
+
+
+    def is_changed(self):
+        """Returns whether buffer differs from original anywhere."""
+        return any(self.buffer[s:s + len(blob)] != blob for s, blob in self._spans)
+
+
+    def __getitem__(self, key):
+        """Returns original byte value at index, or original contents of slice as bytes."""
+        if not isinstance(key, slice):
+            index, value = key + len(self) if key < 0 else key, self.buffer[key]
+            for s, blob in self._spans:
+                if s <= index < s + len(blob): return bytearray(blob[index - s:index - s + 1])[0]
+            return value
+
+        start, stop, step = key.indices(len(self))
+        if step != 1: return bytes(bytearray(self[:])[key])
+        result = bytearray(self.buffer[start:stop])
+        for s, blob in self._spans:
+            e = s + len(blob)
+            if e <= start or s >= stop: continue # for s, blob
+            lo, hi = max(s, start), min(e, stop)
+            result[lo - start:hi - start] = blob[lo - s:hi - s]
+        return bytes(result)
+
+
+    def __len__(self):
+        """Returns buffer length."""
+        return len(self.buffer)
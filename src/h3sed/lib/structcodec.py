@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Codecs for fixed-layout binary structs, compiled from declarative field layouts
+into a single struct.Struct unpacking and packing all fields in one call,
+and into a NumPy structured dtype for decoding many structs at once.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import re
+import struct
+
+try: import numpy
+except ImportError: numpy = None
+
+
+"""Struct format item, as optional repeat count and type character."""
+RGX_FORMAT_ITEM = re.compile(r"(\d*)([xcbB?hHiIlLqQnNefdspP])")
+
+"""NumPy little-endian types for struct format characters, in standard sizes."""
+NUMPY_TYPES = {"b": "i1", "B": "u1", "?": "?", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4",
+               "l": "<i4", "L": "<u4", "q": "<i8", "Q": "<u8", "e": "<f2", "f": "<f4",
+               "d": "<f8", "s": "S"}
+
+
+class StructCodec(object):
+    """
+    Little-endian codec for struct fields at fixed offsets.
+
+    Fields of a single item decode to a value, fields of several items to a tuple.
+    Bytes between fields are carried over unchanged on packing.
+    """
+
+    def __init__(self, fields):
+        """
+        @param   fields  field layout as {name: (offset, struct format like "B" or "7L")}
+        @raise   ValueError  if fields overlap
+        """
+        self.fields = dict(fields)
+        self.size   = 0
+        self._slices = {}  # {name: (index in unpacked items, item count or None if single)}
+        formats, index = ["<"], 0
+        for name, (offset, fmt) in sorted(self.fields.items(), key=lambda x: x[1][0]):
+            if offset < self.size:
+                raise ValueError("Field %r at offset %s overlaps previous field ending at %s." %
+                                 (name, offset, self.size))
+            if offset > self.size:
+                formats.append("%ss" % (offset - self.size))
+                index += 1
+            count = sum(int(n or 1) if t not in "sp" else 1 for n, t in
+                        RGX_FORMAT_ITEM.findall(fmt) if "x" != t)
+            self._slices[name] = (index, None if "s" in fmt or count == 1 else count)
+            formats.append(fmt)
+            index += count
+            self.size = offset + struct.calcsize("<" + fmt)
+        self._struct = struct.Struct("".join(formats))
+        self._dtype  = None
+
+
+    @property
+    def dtype(self):
+        """NumPy structured dtype of codec fields, or None if NumPy not available."""
+        if self._dtype is None and numpy is not None:
+            names, formats, offsets = [], [], []
+            for name, (offset, fmt) in self.fields.items():
+                items = RGX_FORMAT_ITEM.findall(fmt)
+                if len(items) != 1 or items[0][1] not in NUMPY_TYPES:
+                    raise ValueError("Field %r format %r has no NumPy type." % (name, fmt))
+                count, char = int(items[0][0] or 1), items[0][1]
+                if "s" == char: ntype = "S%s" % count
+                elif count > 1: ntype = (NUMPY_TYPES[char], (count, ))
+                else: ntype = NUMPY_TYPES[char]
+                names.append(name), formats.append(ntype), offsets.append(offset)
+            self._dtype = numpy.dtype(dict(names=names, formats=formats, offsets=offsets,
+                                           itemsize=self.size))
+        return self._dtype
+
+
+    def unpack(self, buffer):
+        """Returns field values decoded from start of buffer, as {name: value or (value, )}."""
+        items = self._struct.unpack_from(buffer)
+        return {name: items[i] if n is None else items[i:i + n]
+                for name, (i, n) in self._slices.items()}
+
+
+    def pack(self, buffer, values):
+        """
+        Returns bytearray of buffer content with given fields encoded over it,
+        other content retained as is.
+
+        @param   buffer  bytes-like content at least codec size long
+        @param   values  {name: value or [value, ]} for fields to change
+        """
+        items = list(self._struct.unpack_from(buffer))
+        for name, value in values.items():
+            i, n = self._slices[name]
+            if n is None: items[i] = value
+            elif len(value) != n:
+                raise ValueError("Field %r takes %s values, got %s." % (name, n, len(value)))
+            else: items[i:i + n] = value
+        result = bytearray(buffer)
+        self._struct.pack_into(result, 0, *items)
+        return result
+
+
+    def unpack_array(self, buffer, offsets):
+        """
+        Returns structs at given offsets in buffer decoded as one NumPy structured array,
+        with a row per offset and a column per field. Requires NumPy.
+
+        @param   buffer   bytes-like content
+        @param   offsets  struct start positions in buffer, as [offset, ]
+        """
+        data = numpy.frombuffer(buffer, numpy.uint8)
+        starts = numpy.asarray(offsets, dtype=numpy.intp).reshape(-1, 1)
+        rows = data[starts + numpy.arange(self.size)]  # Gathered into a new contiguous block
+        return rows.view(self.dtype).reshape(-1)
@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     19.11.2011
-@modified    15.06.2024
+@modified    18.10.2026
 ------------------------------------------------------------------------------
 """
 import codecs
@@ -80,6 +80,34 @@ class csv_writer(object):
         if self._name: self._file.close()
 
 
+class FrozenDict(dict):
+    """Immutable dictionary, comparing equal to plain dictionaries of same content."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("%r object is immutable" % type(self).__name__)
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):          return self
+    def __deepcopy__(self, memo): return self
+    def __reduce__(self):        return (type(self), (dict(self), ))
+
+
+class FrozenList(list):
+    """Immutable list, comparing equal to plain lists of same content."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("%r object is immutable" % type(self).__name__)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __copy__(self):          return self
+    def __deepcopy__(self, memo): return self
+    def __reduce__(self):        return (type(self), (list(self), ))
+
+
 def add_unique(lst, item, direction=1, maxlen=sys.maxsize):
     """
     Adds the item to the list from start or end. If item is already in list,
@@ -139,6 +167,17 @@ def format_exc(e):
     return result
 
 
+def freeze(value):
+    """
+    Returns value as immutable, with nested dictionaries and lists converted
+    to FrozenDict and FrozenList. Values already frozen are returned as is.
+    """
+    if isinstance(value, (FrozenDict, FrozenList)): return value
+    if isinstance(value, dict): return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list): return FrozenList(freeze(x) for x in value)
+    return value
+
+
 def get(collection, *path, **kwargs):
     """
     Returns the value at specified collection path. If path not available,
@@ -248,6 +287,13 @@ def plural(word, items=None, numbers=True, single="1", sep="", pref="", suf=""):
     return result.strip()
 
 
+def replace_file(src, dst):
+    """Renames file over another, atomically where platform supports it."""
+    if hasattr(os, "replace"): return os.replace(src, dst)  # Py3
+    if "nt" == os.name and os.path.exists(dst): os.unlink(dst)  # Py2 cannot rename over in Windows
+    os.rename(src, dst)
+
+
 def select_file(path):
     """
     Tries to open the file directory, and select file if path is a file.
@@ -300,6 +346,13 @@ def start_file(filepath):
     return success, error
 
 
+def thaw(value):
+    """Returns mutable copy of frozen value, with nested FrozenDict and FrozenList as plain."""
+    if isinstance(value, dict): return dict((k, thaw(v)) for k, v in value.items())
+    if isinstance(value, list): return [thaw(x) for x in value]
+    return value
+
+
 def to_unicode(value, encoding=None):
     """
     Returns the value as a Unicode string. Tries decoding as UTF-8 if
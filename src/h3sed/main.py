@@ -8,11 +8,10 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     14.03.2020
-@modified    27.05.2024
+@modified    18.10.2026
 ------------------------------------------------------------------------------
 """
 import argparse
-import gzip
 import locale
 import logging
 import os
@@ -85,28 +84,6 @@ def install_thread_excepthook():
     threading.Thread.__init__ = init
 
 
-def patch_gzip_for_partial():
-    """
-    Replaces gzip.GzipFile._read_eof() with a version not throwing CRC error.
-    For decompressing partial files.
-    """
-
-    def read_eof_py3(self):
-        if not all(self._fp.read(1) for _ in range(8)): # Consume and require 8 bytes of CRC
-            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
-        c = b"\x00"
-        while c == b"\x00": c = self._fp.read(1) # Consume stream until first non-zero byte
-        if c: self._fp.prepend(c)
-
-    def read_eof_py2(self):
-        c = "\x00"
-        while c == "\x00": c = self.fileobj.read(1) # Consume stream until first non-zero byte
-        if c: self.fileobj.seek(-1, 1)
-
-    readercls = getattr(gzip, "_GzipReader", gzip.GzipFile)  # Py3/Py2
-    readercls._read_eof = read_eof_py2 if readercls is gzip.GzipFile else read_eof_py3
-
-
 def run_gui(filename):
     """Main GUI program entrance."""
     global logger
@@ -115,7 +92,6 @@ def run_gui(filename):
     logger.addHandler(guibase.GUILogHandler())
     logger.setLevel(logging.DEBUG)
 
-    patch_gzip_for_partial()
     install_thread_excepthook()
     sys.excepthook = except_hook
 
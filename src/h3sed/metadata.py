@@ -7,20 +7,31 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     22.03.2020
-@modified    23.06.2024
+@modified    18.10.2026
 ------------------------------------------------------------------------------
 """
 from collections import defaultdict, OrderedDict
 import copy
 import datetime
-import gzip
 import logging
+import mmap
 import os
 import re
+import shutil
 import sys
+import tempfile
+import threading
+import weakref
 
 from h3sed import conf
 from h3sed import plugins
+from h3sed.lib import archives
+from h3sed.lib import backupstore
+from h3sed.lib import binpatch
+from h3sed.lib import filecache
+from h3sed.lib import gzstream
+from h3sed.lib import sectionmap
+from h3sed.lib import spanbuffer
 from h3sed.lib import util
 
 
@@ -1098,6 +1109,13 @@ for t in Spells:
 
 
 
+def open_archive(path, cache=True):
+    """Returns archives.Archive for path, with archive listing kept in disk cache if enabled."""
+    cache = filecache.FileCache(conf.CacheDirectory, conf.MaxCacheSize) \
+            if cache and conf.CacheEnabled else None
+    return archives.Archive(path, cache)
+
+
 def wildcards():
     """Returns wildcard strings for file controls, as ["label (*.ext)|*.ext", ]."""
     result = ["All files (*.*)|*.*"]
@@ -1107,6 +1125,10 @@ def wildcards():
         if "linux" in sys.platform:  # Case-sensitive operating system
             exts2 = ";".join("*%s;*%s" % (x.lower(), x.upper()) for x in exts)
         result.insert(0, "%s (%s)|%s" % (name, exts1, exts2))
+    exts1 = exts2 = ";".join("*" + x for x in archives.EXTENSIONS)
+    if "linux" in sys.platform:
+        exts2 = ";".join("*%s;*%s" % (x.lower(), x.upper()) for x in archives.EXTENSIONS)
+    result.insert(-1, "Archives (%s)|%s" % (exts1, exts2))
     return result
 
 
@@ -1128,8 +1150,16 @@ class Savefile(object):
 
     HEADER_TEXTS = OrderedDict([("name", 2), ("desc", 2)])  # {name in mapdata: byte length count}
 
+    HEADER_SIZE = 2048  # Uncompressed bytes needed for detecting version and parsing map header
 
-    def __init__(self, filename):
+
+    def __init__(self, filename, header_only=False, cache=True):
+        """
+        @param   filename     path to savefile, or to savefile in archive
+                              as "archive.zip!/path/in/archive"
+        @param   header_only  whether to read only savefile header, for version and map data
+        @param   cache        whether to use disk cache of decompressed savefiles, if enabled
+        """
         self.filename = filename
         self.raw      = None
         self.raw0     = None
@@ -1138,52 +1168,326 @@ class Savefile(object):
         self.mapdata  = {}
         self.size     = 0
         self.usize    = 0
+        self.trailer  = None  # (CRC32, uncompressed size) from gzip trailer of file on disk
+        self.scanners = {}  # {plugin name: scanner initialized during last read}
+        self.sections = sectionmap.SectionMap()  # Savefile sections like header and heroes
+        self.blocks   = None  # [gzstream.Block, ] compressed in last write, for reuse
+        self.revision = 0  # Counter of changes to loaded contents
         self.assume_newformat = conf.SavegameNewFormat  # Persist current config setting
-        self.read()
+        self.use_cache = cache
+        self._snapshots = weakref.WeakSet()  # Views over live contents, kept as they were
+        self.read_header_only() if header_only else self.read()
 
 
     def patch(self, bytes, span):
-        """Patches unpacked contents with bytes from span[0] to span[1]."""
+        """
+        Patches unpacked contents with bytes from span[0] to span[1].
+
+        Contents are patched in place if length remains the same,
+        with original content of span retained in `raw0`.
+        """
         if not span or not bytes: return
-        self.raw = self.raw[0:span[0]] + bytes + self.raw[span[1]:]
+        if len(bytes) == span[1] - span[0] and self.raw0.buffer is self.raw:
+            for view in [self.raw0] + list(self._snapshots): view.record(*span)
+            self.raw[span[0]:span[1]] = bytes
+        else:  # Contents get resized: detach original from current
+            if self.raw0.buffer is self.raw: self.raw0 = spanbuffer.SpanBuffer(self.raw0[:])
+            raw, self.raw = self.raw, bytearray(self.raw[0:span[0]]) + bytes + self.raw[span[1]:]
+            self._release(raw)
+            self._snapshots.clear()  # Previous buffer no longer changes
+            self.sections.resize(span, len(bytes))
+        self.scanners.clear()  # Scanners created while reading no longer apply
         self.usize = len(self.raw)
+        self.revision += 1
+
+
+    def snapshot(self, original=False):
+        """
+        Returns read-only view of loaded contents as they are now, or of original contents
+        as last read or written, staying unchanged as contents get patched further.
+
+        The view shares memory with loaded contents, keeping copies only of spans
+        patched after taking it, and is safe to read in background threads
+        while editing continues. Supports len() and indexing or slicing like bytes.
+
+        @return  spanbuffer.SpanBuffer, with `revision` as savefile revision taken at
+        """
+        if original: view = self.raw0.copy()
+        else: view = spanbuffer.SpanBuffer(self.raw)
+        view.revision = self.revision
+        if view.buffer is self.raw: self._snapshots.add(view)
+        return view
+
+
+    def make_patch(self):
+        """
+        Returns unsaved changes as binpatch.Patch, with changed spans anchored
+        to plugin items containing them, like heroes, for applying to other savefiles.
+        Raises ValueError if there are no changes, or changes are in non-unique items.
+        """
+        if not self.is_changed(): raise ValueError("No unsaved changes in %s." % self.filename)
+        return binpatch.Patch.from_spans(self.raw0, self.raw, self.dirty_spans(),
+                                         plugins.anchors(self), self.version)
+
+
+    def apply_patch(self, patch):
+        """
+        Patches contents with binpatch.Patch, verifying original bytes of all changes
+        before applying any. Changes anchored to plugin items, like hero name,
+        are placed relative to the item in this savefile, and only if the item is unique.
+        Raises ValueError on mismatch or overlapping changes.
+
+        @return   number of changes applied
+        """
+        if patch.version and self.version and patch.version != self.version:
+            raise ValueError("Patch is for game version %r, %s is %r." %
+                             (patch.version, self.filename, self.version))
+        positions = patch.resolve(self.raw, lambda: plugins.anchors(self))
+        for offset, record in positions:
+            self.patch(record.new, (offset, offset + len(record.old)))
+        return len(positions)
 
 
     def read(self):
-        """Reads in file contents and attributes."""
-        with gzip.GzipFile(self.filename, "rb") as f: raw = bytearray(f.read())
-        self.raw0 = self.raw = raw
-        self.detect_version()
-        self.parse_metadata()
+        """
+        Reads in file contents and attributes.
+
+        Uses decompressed contents from disk cache if available, as read-only memory map.
+        Otherwise decompresses in a background thread. Plugin scanners are initialized
+        but left for plugins to feed in a worker thread, as regex search cannot be
+        interrupted and could otherwise block the caller for long on unusual content.
+        """
+        state0 = self.raw0, self.raw, self.version, dict(self.mapdata), self.sections
+        cache = self.get_cache()
+        cachekey = cache.key(self.filename) if cache else None
+        cached = cache.get(cachekey) if cache else None
+        self.raw = raw = cached if cached is not None else bytearray()
+        self.raw0 = spanbuffer.SpanBuffer(raw)
+        self.scanners.clear()
+        f = None
+        try:
+            f = self.open_file() if cached is None else None
+            chunks = gzstream.Inflater(f).iterate(background=True) if f else ()
+            for chunk in chunks: raw += chunk
+            self.read_header()
+            self.map_sections()
+        except Exception:
+            self.raw0, self.raw, self.version, self.mapdata, self.sections = state0
+            self.scanners.clear()
+            self._release(cached)
+            raise
+        finally:
+            f and f.close()
+        self.revision += 1
+        self._release(state0[1])
+        self._snapshots.clear()  # Previous buffer no longer changes
+        if cache and cached is None: cache.put(cachekey, raw)
+        self.blocks = None
         self.update_info()
         logger.info("Opened %s (%s, unzipped %s).", self.filename,
                     util.format_bytes(self.size), util.format_bytes(self.usize))
 
 
-    def write(self, filename=None):
-        """Writes out gzipped file."""
+    def read_header_only(self):
+        """Reads in file header and attributes, decompressing only as much as needed."""
+        self.raw = bytearray(self.read_range(0, self.HEADER_SIZE))
+        self.raw0 = spanbuffer.SpanBuffer(self.raw)
+        self.revision += 1
+        self._snapshots.clear()
+        self.detect_version()
+        self.parse_metadata()
+        self.update_info()
+        self.usize = (self.trailer or (0, len(self.raw)))[1]
+
+
+    def read_range(self, start, end):
+        """
+        Returns uncompressed bytes from start to end of file on disk, decompressing
+        only as much as needed: from disk cache or checkpoint index if available.
+        """
+        cache = self.get_cache()
+        key = cache.key(self.filename) if cache else None
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            try: return cached[start:end]
+            finally: cached.close()
+        index = cache.get_index(key) if cache else None
+        if index or archives.split_path(self.filename)[1] is None:
+            return gzstream.read_range(self.filename, start, end, index)
+        with self.open_file() as f: return gzstream.read_range(f, start, end)
+
+
+    def read_header(self):
+        """Detects game version and parses map header, initializes plugin scanners."""
+        self.detect_version()
+        self.parse_metadata()
+        self.scanners.update(plugins.scanners(self))
+
+
+    def write(self, filename=None, spans=None, backup=False, validate=False):
+        """
+        Writes out gzipped file, via a temporary file in the same directory
+        renamed over target file only after being fully written to disk.
+
+        @param   filename  file to write if not current
+        @param   spans     specific byte ranges to write if not all, as [(start, end), ]
+        @param   backup    whether to store existing target file contents in backup store,
+                           done in a background thread
+        @param   validate  whether to check changes with validate() first,
+                           raising ValueError on problems
+        """
         filename = filename or self.filename
-        try: os.makedirs(os.path.dirname(filename))
+        archive, member = archives.split_path(filename)
+        if member is not None:
+            raise ValueError("Cannot save into archive %s, save as a separate file." % archive)
+        problems = self.validate(spans) if validate else None
+        if problems:
+            raise ValueError("Invalid changes in %s:\n\n%s" % (self.filename, "\n".join(problems)))
+        directory, basename = os.path.split(os.path.abspath(filename))
+        try: os.makedirs(directory)
         except Exception: pass
-        with gzip.GzipFile(filename, "wb") as f: f.write(bytes(self.raw))
-        self.raw0 = self.raw
+
+        if not spans:
+            raw, changed, raw0 = self.raw, self.dirty_spans(), None
+        elif self.raw0.buffer is self.raw:
+            raw0 = self.raw0.copy()
+            for start, end in spans: raw0.discard(start, end)
+            raw, changed = raw0, spans  # Span view is compressed directly, without full copy
+        else:  # Contents have been resized, original is detached from current
+            raw = self.raw0[:]
+            for start, end in spans: raw = raw[0:start] + self.raw[start:end] + raw[end:]
+            raw0 = spanbuffer.SpanBuffer(raw)
+            changed = spans
+
+        original = None  # Left as view over contents if unchanged on disk, for backup thread
+        if backup and os.path.exists(filename):
+            try: original = self.read_original(filename)
+            except Exception:
+                logger.warning("Error reading %s for backup.", filename, exc_info=True)
+
+        fd, tempname = tempfile.mkstemp(prefix=basename + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self.compress(raw, f, changed)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(filename): shutil.copymode(filename, tempname)
+            else:
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tempname, 0o666 & ~umask)
+            mtime = os.path.getmtime(filename) if original is not None else None
+            util.replace_file(tempname, filename)
+        except Exception:
+            try: os.unlink(tempname)
+            except Exception: pass
+            raise
+
+        if original is not None:
+            threading.Thread(target=self.backup, args=(filename, original, mtime)).start()
+        self.raw0 = raw0 or spanbuffer.SpanBuffer(self.raw)
         self.update_info(filename)
-        logger.info("Saved %s (%s, unzipped %s).", filename,
-                    util.format_bytes(self.size), util.format_bytes(self.usize))
+        cache = self.get_cache()
+        if cache and self.blocks:  # Keep random access index for file as written
+            cache.put_index(cache.key(filename), gzstream.Index.from_blocks(self.blocks, raw))
+        if spans:
+            logger.info("Saved %s byte %s %s (%s, unzipped %s).", filename,
+                        util.plural("range", spans, numbers=False),
+                        " and ".join("..".join(map(str, x)) for x in spans),
+                        util.format_bytes(self.size), util.format_bytes(self.usize))
+        else:
+            logger.info("Saved %s (%s, unzipped %s).", filename,
+                        util.format_bytes(self.size), util.format_bytes(self.usize))
+
+
+    def read_original(self, filename=None):
+        """
+        Returns current uncompressed contents of file on disk, as bytes,
+        or as snapshot view of original contents if file unchanged since loaded.
+        """
+        filename = filename or self.filename
+        if os.path.abspath(filename) == os.path.abspath(self.filename) and not self.disk_changed():
+            return self.snapshot(original=True)
+        return b"".join(gzstream.Inflater(filename))
+
+
+    def backup(self, filename=None, raw=None, mtime=None):
+        """
+        Stores file contents in backup store, logs errors.
+
+        @param   filename  name to store contents under if not current file
+        @param   raw       uncompressed contents if not current file on disk
+        @param   mtime     file modification time if not current
+        """
+        filename = os.path.realpath(filename or self.filename)
+        try:
+            if raw is None: raw = self.read_original(filename)
+            if mtime is None: mtime = os.path.getmtime(filename)
+            self.get_backups().add(filename, raw[:], mtime)
+        except Exception:
+            logger.exception("Error backing up %s.", filename)
+
+
+    def list_backups(self):
+        """Returns backup manifests of current file, newest first."""
+        return self.get_backups().list(os.path.realpath(self.filename))
+
+
+    def restore(self, backup):
+        """
+        Replaces file on disk with contents from backup, backing up current file first.
+
+        @param   backup  backup manifest from list_backups()
+        """
+        raw = self.get_backups().read(backup)
+        state0 = self.raw0, self.raw, self.blocks
+        if self.raw0.buffer is self.raw: self.raw0 = spanbuffer.SpanBuffer(self.raw0[:])
+        self.raw, self.blocks = raw, None
+        try: self.write(backup=True)
+        except Exception:
+            self.raw0, self.raw, self.blocks = state0
+            raise
+        self.revision += 1
+        self._release(state0[1])
+        self._snapshots.clear()
+        self.scanners.clear()
+        self.read_header()
+        self.map_sections()
+        logger.info("Restored %s from backup of %s.", self.filename,
+                    datetime.datetime.fromtimestamp(backup["created"]).strftime("%Y-%m-%d %H:%M:%S"))
 
 
     def write_ranges(self, spans, filename=None):
         """Writes out gzipped file with specified byte ranges only."""
-        filename = filename or self.filename
-        raw = self.raw0
-        for start, end in spans: raw = raw[0:start] + self.raw[start:end] + raw[end:]
-        with gzip.GzipFile(filename, "wb") as f: f.write(bytes(raw))
-        self.raw0 = raw
-        self.update_info(filename)
-        logger.info("Saved %s byte %s %s (%s, unzipped %s).", filename,
-                    util.plural("range", spans, numbers=False),
-                    " and ".join("..".join(map(str, x)) for x in spans),
-                    util.format_bytes(self.size), util.format_bytes(self.usize))
+        self.write(filename, spans)
+
+
+    def compress(self, raw, fileobj, changed=None):
+        """
+        Writes contents to file object as gzip, with configured compression settings,
+        reusing compressed blocks from last write where contents are unchanged.
+
+        @param   changed  spans changed in contents since last write, as [(start, end), ]
+        """
+        self.blocks = gzstream.compress(raw, fileobj, conf.CompressionLevel,
+                                        conf.CompressionWorkers, blocks=self.blocks,
+                                        changed=changed)
+
+
+    def get_backups(self):
+        """Returns savefile backup store."""
+        return backupstore.BackupStore(conf.BackupDirectory, conf.BackupCount, conf.BackupDays)
+
+
+    def get_archive(self, path):
+        """Returns archives.Archive for archive path, with listing cached if cache enabled."""
+        return open_archive(path, self.use_cache)
+
+
+    def get_cache(self):
+        """Returns savefile disk cache if enabled, else None."""
+        if not conf.CacheEnabled or not self.use_cache: return None
+        return filecache.FileCache(conf.CacheDirectory, conf.MaxCacheSize)
 
 
     def detect_version(self):
@@ -1201,9 +1505,21 @@ class Savefile(object):
                                  "of any supported game version.")
 
 
+    def map_sections(self):
+        """
+        Completes savefile section map with sections from plugins
+        whose scanners have been fed all contents.
+        """
+        self.sections.size = len(self.raw)
+        for name, span in plugins.sections(self):
+            try: self.sections.add(name, span)
+            except ValueError as e: logger.warning("Error mapping %s: %s", self.filename, e)
+
+
     def parse_metadata(self):
-        """Populates savefile map name and description."""
-        match = self.RGX_HEADER.match(self.raw[:2048])
+        """Populates savefile map name and description, starts section map with header."""
+        self.sections = sectionmap.SectionMap(len(self.raw))
+        match = self.RGX_HEADER.match(self.raw[:self.HEADER_SIZE])
         if not match:
             logger.warning("Failed to parse map name and description from %s.", self.filename)
             return
@@ -1218,19 +1534,113 @@ class Savefile(object):
                 cpos += clen + nlen
             except Exception:
                 logger.exception("Failed to parse map name and description from %s.", self.filename)
+                return
+        self.sections.add("header", (0, cpos))
+
+
+    def open_file(self):
+        """Returns savefile opened as readable binary file object, from disk or archive."""
+        archive, member = archives.split_path(self.filename)
+        if member is None: return open(self.filename, "rb")
+        return self.get_archive(archive).open(member)
 
 
     def update_info(self, filename=None):
-        """Updates file modification and size information."""
+        """Updates file modification, size and gzip trailer information."""
         filename = filename or self.filename
-        self.dt    = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
-        self.size  = os.path.getsize(filename)
+        archive, member = archives.split_path(filename)
+        if member is not None:  # Size as stored in archive, no trailer without inflating
+            item = self.get_archive(archive).members[member]
+            self.dt      = datetime.datetime.fromtimestamp(item["mtime"])
+            self.size    = item["size"]
+            self.usize   = len(self.raw)
+            self.trailer = None
+            return
+        self.dt      = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
+        self.size    = os.path.getsize(filename)
+        self.usize   = len(self.raw)
+        self.trailer = gzstream.read_trailer(filename)
+
+
+    def disk_changed(self):
+        """
+        Returns whether file on disk has changed since last read or write,
+        without decompressing: by file size, and if modification time differs,
+        by CRC32 and uncompressed size in gzip trailer.
+
+        A file touched or rewritten with the same contents counts as unchanged,
+        taking on its new modification time.
+        """
+        archive, member = archives.split_path(self.filename)
+        if member is not None:  # Archive listing is reread only if archive changed
+            try: item = self.get_archive(archive).members[member]
+            except Exception: return False
+            return (datetime.datetime.fromtimestamp(item["mtime"]), item["size"]) != \
+                   (self.dt, self.size)
+
+        try: stat = os.stat(self.filename)
+        except Exception: return False
+        if stat.st_size != self.size: return True
+        dt = datetime.datetime.fromtimestamp(stat.st_mtime)
+        if dt == self.dt: return False
+        try: trailer = gzstream.read_trailer(self.filename)
+        except Exception: return True
+        if not trailer or trailer != self.trailer: return True
+        self.dt = dt
+        return False
+
+
+    def revert(self):
+        """Discards changes in loaded contents, restoring contents as last read or written."""
+        if self.raw0.buffer is self.raw:
+            for start, end in self.raw0.dirty_spans():
+                for view in self._snapshots: view.record(start, end)
+                self.raw[start:end] = self.raw0[start:end]
+            self.raw0.clear()
+            self.scanners.clear()
+        else:
+            raw, self.raw = self.raw, bytearray(self.raw0[:])
+            self.raw0 = spanbuffer.SpanBuffer(self.raw)
+            self._release(raw)
+            self._snapshots.clear()
+            self.parse_metadata()  # Rescan for sections shifted by resized changes
+            self.scanners = plugins.scanners(self)
+            self.map_sections()
         self.usize = len(self.raw)
+        self.revision += 1
+
+
+    def close(self):
+        """Releases loaded contents, closing memory map of disk cache if any."""
+        raw, self.raw = self.raw, bytearray()
+        self.raw0 = spanbuffer.SpanBuffer(self.raw)
+        self.scanners.clear()
+        self._release(raw)
+        self._snapshots.clear()
+        self.revision += 1
 
 
     def is_changed(self):
         """Returns whether loaded contents have changed."""
-        return self.raw != self.raw0
+        if self.raw0.buffer is self.raw: return self.raw0.is_changed()
+        return memoryview(self.raw) != memoryview(self.raw0.buffer)
+
+
+    def dirty_spans(self):
+        """Returns byte spans where loaded contents have changed, as [(start, end), ]."""
+        if self.raw0.buffer is self.raw: return self.raw0.dirty_spans()
+        return [(0, len(self.raw))] if self.is_changed() else []
+
+
+    def validate(self, spans=None):
+        """
+        Returns problems found by plugins in changed contents, like hero structs
+        no longer matching their format, checking only changed spans.
+
+        @param   spans  byte spans to check if not all changed spans, as [(start, end), ]
+        @return         [text, ]
+        """
+        return plugins.validate(self, self.dirty_spans() if spans is None else spans)
 
 
     def match_byte_ranges(self, positions, ranges):
@@ -1248,6 +1658,14 @@ class Savefile(object):
         return True
 
 
+    def _release(self, buffer):
+        """Closes buffer if memory map from disk cache, unless snapshot views still read it."""
+        if not isinstance(buffer, mmap.mmap) or any(x.buffer is buffer for x in self._snapshots):
+            return
+        try: buffer.close()
+        except BufferError: pass  # Views into map remain, map gets closed once they are gone
+
+
 
 class Store(object):
     """
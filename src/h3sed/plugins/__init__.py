@@ -34,8 +34,44 @@ Plugin modules are expected to have the following API (all methods optional):
         @param   category  value category like "props"
         '''
 
+    def scanner(savefile):
+        '''
+        Returns scanner for savefile contents being read, if any, with API
+        feed(buffer, final=False), invoked as decompressed content arrives.
+
+        @param   savefile  data.Savefile instance, with version detected
+        '''
+
+    def anchors(savefile):
+        '''
+        Returns named byte spans of items in savefile contents, like heroes,
+        as [(name, (start, end)), ], for relocating patches between savefiles.
+
+        @param   savefile  data.Savefile instance
+        '''
+
+    def sections(savefile):
+        '''
+        Returns named byte spans of savefile sections handled by plugin,
+        like hero table, as [(name, (start, end)), ], from scanner created
+        while reading savefile, once it has been fed all contents,
+        for building savefile section map.
+
+        @param   savefile  data.Savefile instance, with scanners fed all contents
+        '''
+
+    def validate(savefile, spans):
+        '''
+        Returns problems in changed savefile contents, as [text, ], checking
+        only given spans, like whether changed structs still match their format.
+
+        @param   savefile  data.Savefile instance, with original contents in `raw0`
+        @param   spans     changed byte spans, as [(start, end), ]
+        '''
 
-Plugin instances are expected to have the following API (all methods mandatory except get_changes):
+
+Plugin instances are expected to have the following API
+(all methods mandatory except get_changes and refresh):
 
     def render(self, reparse=False, reload=False, log=True):
         '''
@@ -61,13 +97,21 @@ Plugin instances are expected to have the following API (all methods mandatory e
     def get_changes(self, html=True):
         '''Optional. Returns unsaved changes, as HTML diff content or plain text brief.'''
 
+    def refresh(self, raw0):
+        '''
+        Optional. Updates state in place from savefile reread after change on disk,
+        returns whether succeeded, else plugin gets re-rendered with reparse.
+
+        @param   raw0  savefile contents before reread
+        '''
+
 
 ------------------------------------------------------------------------------
 This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   14.03.2020
-@modified  06.03.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import os
@@ -152,6 +196,62 @@ def adapt(source, category, value):
     return value
 
 
+def anchors(savefile):
+    """
+    Returns named byte spans from plugins, for savefile contents.
+
+    @return   [("plugin name/item name", (start, end)), ]
+    """
+    result = []
+    for p in PLUGINS:
+        if callable(getattr(p["module"], "anchors", None)):
+            items = p["module"].anchors(savefile)
+            result.extend(("%s/%s" % (p["name"], name), span) for name, span in items)
+    return result
+
+
+def scanners(savefile):
+    """
+    Returns content scanners from plugins, for savefile being read.
+
+    @return   {plugin name: scanner instance}
+    """
+    result = {}
+    for p in PLUGINS:
+        if callable(getattr(p["module"], "scanner", None)):
+            scanner = p["module"].scanner(savefile)
+            if scanner is not None: result[p["name"]] = scanner
+    return result
+
+
+def sections(savefile):
+    """
+    Returns named savefile sections from plugins, for savefile contents.
+
+    @return   [("plugin name/section name", (start, end)), ]
+    """
+    result = []
+    for p in PLUGINS:
+        if callable(getattr(p["module"], "sections", None)):
+            items = p["module"].sections(savefile)
+            result.extend(("%s/%s" % (p["name"], name), span) for name, span in items)
+    return result
+
+
+def validate(savefile, spans):
+    """
+    Returns problems found by plugins in changed savefile contents.
+
+    @param   spans  changed byte spans, as [(start, end), ]
+    @return         [text, ]
+    """
+    result = []
+    for p in PLUGINS:
+        if callable(getattr(p["module"], "validate", None)):
+            result.extend(p["module"].validate(savefile, spans))
+    return result
+
+
 
 class PluginCommand(wx.Command):
     """
@@ -74,25 +74,32 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   14.03.2020
-@modified  18.06.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
+import bisect
 import collections
 import copy
 import functools
 import glob
+import hashlib
 import importlib
 import json
 import logging
 import os
 import re
+import struct
 import sys
+import threading
+import time
 
 import step
 import yaml
 import wx
 import wx.html
 import wx.lib.agw.flatnotebook
+try: import numpy
+except ImportError: numpy = None
 
 from h3sed import conf
 from h3sed import gui
@@ -102,6 +109,9 @@ from h3sed import metadata
 from h3sed import plugins
 from h3sed import templates
 from h3sed.lib import controls
+from h3sed.lib import gzstream
+from h3sed.lib import scanner as scanners
+from h3sed.lib import structcodec
 from h3sed.lib import util
 from h3sed.lib import wx_accel
 
@@ -171,6 +181,34 @@ POS = {
 
 }
 
+# Struct formats of attributes in hero bytearray, little-endian, at positions from POS.
+# Skill arrays take their length from the number of skills in game version.
+LAYOUT = dict({
+    "movement_total":   "L",
+    "movement_left":    "L",
+    "exp":              "L",
+    "mana":             "H",
+    "level":            "B",
+    "skills_count":     "B",
+    "skills_level":     "%(skills)sB",
+    "skills_slot":      "%(skills)sB",
+    "army_types":       "7L",
+    "army_counts":      "7L",
+    "spells_book":      "70B",
+    "spells_available": "70B",
+    "attack":           "B",
+    "defense":          "B",
+    "power":            "B",
+    "knowledge":        "B",
+    "inventory":        "128L",  # 64 x (artifact ID, scroll spell ID or blank)
+    "reserved":         "B",     # For each slot in POS["reserved"]
+}, **{k: "2L" for k in ("helm", "cloak", "neck", "weapon", "shield", "armor", "lefthand",
+                       "righthand", "feet", "side1", "side2", "side3", "side4", "ballista",
+                       "ammo", "tent", "catapult", "spellbook", "side5")})
+
+"""Hero struct codecs and field accessor classes made, as {(kind, layout key): instance}."""
+LAYOUT_CACHE = {}
+
 SLOT_2_COL = {
     "weapon": 1,
     "shield": 2,
@@ -230,6 +268,33 @@ RGX_HERO = re.compile(b"""
 
 
 
+def anchors(savefile):
+    """Returns hero spans in savefile contents, as [(hero name, (start, end)), ]."""
+    scanner = savefile.scanners.get(PROPS["name"]) or HeroScanner(savefile)
+    if not scanner.done: scanner.feed(savefile.raw, final=True)
+    return [(x.name, x.span) for x in scanner.heroes()]
+
+
+def sections(savefile):
+    """
+    Returns hero sections in savefile contents, from scanner created while reading savefile,
+    as [("carryover", span before heroes with potential campaign carry-over heroes),
+        ("heroes", span from first to last hero)].
+    """
+    scanner = savefile.scanners.get(PROPS["name"])
+    spans = scanner.spans() if scanner and scanner.done and not scanner.cancelled else None
+    if not spans: return []
+    header = savefile.sections.get("header")
+    start, end = header[1] if header else 0, min(HeroScanner.START, spans[0][0])
+    return ([("carryover", (start, end))] if start < end else []) + \
+           [("heroes", (spans[0][0], spans[-1][1]))]
+
+
+def validate(savefile, spans):
+    """Returns problems in hero structs changed in savefile contents, as [text, ]."""
+    return HeroValidator(savefile).validate(spans)
+
+
 def init():
     """Loads hero plugins list."""
     global PLUGINS
@@ -247,41 +312,124 @@ def factory(savefile, panel, commandprocessor):
     return HeroPlugin(savefile, panel, commandprocessor)
 
 
+def scanner(savefile):
+    """Returns a new hero scanner for savefile contents being read."""
+    return HeroScanner(savefile)
+
+
 
 class Hero(object):
     """
     Container for all hero attributes.
 
-    Plugins will add their own specific attributes like `inventory`.
+    Hero bytes are a read-only memoryview window into savefile contents,
+    until set to a bytearray by serializing changes: plugins are expected to copy
+    bytes before modifying. Plugins will add their own specific attributes
+    like `inventory`, kept in a dictionary.
+
+    Hero copies are snapshots sharing immutable plugin attribute states
+    with the original and each other, only changed attributes getting frozen anew.
+    Frozen attributes get thawed to mutable copies on first access.
+
+    Plugin attributes not set are parsed from hero bytes on first access, if hero has
+    parsers. Parsed attributes are memoized until hero bytes are set anew.
     """
 
-    def __init__(self, name, bytes, place, span, savefile):
+    __slots__ = ("name", "place", "span", "savefile", "parsers", "basestats", "state0",
+                 "yaml", "yamls1", "yamls2", "_bytes", "_fields", "_states", "_frozen", "_parsed")
+
+    def __init__(self, name, bytes, place, span, savefile, fields=None, parsers=None):
+        """
+        @param   bytes    hero bytearray, or None for window into savefile contents at span
+        @param   fields   hero field accessor class from make_fields(), if any
+        @param   parsers  {plugin name: function(heroes) returning [state, ]}, if any,
+                          for parsing plugin attributes on demand
+        """
         self.name      = name
-        self.bytes     = bytes     # Hero bytearray
         self.place     = place     # Hero index in savefile
         self.span      = span      # Hero byte span in uncompressed savefile
         self.savefile  = savefile  # metadata.SaveFile instance
+        self.parsers   = parsers   # {plugin name: function(heroes) returning [state, ]}
         self.basestats = {}  # Primary attributes without artifact bonuses
-        self.state0    = {}  # Data after first load, as {category: {..} or [..]}
+        self.state0    = {}  # Data after first load, as {category: frozen {..} or [..]}
         self.yaml      = ""  # Data after first load or last change, as full hero charsheet YAML
         self.yamls1    = []  # Data after first load or last save, as [category YAML, ]
         self.yamls2    = []  # Data after last change, as [category YAML, ]
+        self._bytes    = bytes   # Hero bytearray if changed from savefile contents
+        self._fields   = fields  # Hero field accessor class
+        self._states   = {}      # Plugin attributes, as {plugin name: state}
+        self._frozen   = {}      # Plugin attributes as last snapshotted, as {plugin name: state}
+        self._parsed   = set()   # Plugin attributes parsed on demand from current bytes
+
+    @property
+    def bytes(self):
+        """Hero bytearray if set, else read-only memoryview of hero span in savefile contents."""
+        if self._bytes is not None: return self._bytes
+        view = memoryview(self.savefile.raw)[self.span[0]:self.span[1]]
+        return view.toreadonly() if hasattr(view, "toreadonly") else view
+
+    @bytes.setter
+    def bytes(self, value):
+        """
+        Sets hero bytearray, or None for window into savefile contents.
+        Drops plugin attributes parsed on demand, to be parsed anew from changed bytes.
+        """
+        self._bytes = value
+        for name in self._parsed: self._states.pop(name, None)
+        self._parsed.clear()
+
+    @property
+    def fields(self):
+        """Returns accessor of hero attributes by POS name, if hero has field accessor class."""
+        return self._fields(self) if self._fields else None
 
     def copy(self):
-        """Returns a copy of this hero."""
-        hero = Hero(self.name, self.bytes, self.place, self.span, self.savefile)
+        """Returns a snapshot copy of this hero."""
+        hero = Hero(self.name, None, self.place, self.span, self.savefile, self._fields,
+                    self.parsers)
         hero.update(self)
         return hero
 
     def update(self, hero):
-        """Replaces attributes on hero with copies from given hero."""
-        for k, v in vars(hero).items():
-            v2 = v if isinstance(v, metadata.Savefile) else copy.deepcopy(v)
-            setattr(self, k, v2)
+        """
+        Replaces attributes on hero with copies from given hero.
+
+        Bytes are copied only if given hero is a window into savefile contents,
+        bytearrays being replaced and not modified. Category states in `state0`
+        are shared, being immutable. Plugin attributes are shared as immutable snapshots.
+        """
+        self.name, self.place, self.span = hero.name, hero.place, hero.span
+        self.savefile, self._fields, self.parsers = hero.savefile, hero._fields, hero.parsers
+        self.basestats = dict(hero.basestats)
+        self.state0    = dict(hero.state0)
+        self.yaml      = hero.yaml
+        self.yamls1    = list(hero.yamls1)
+        self.yamls2    = list(hero.yamls2)
+        self._bytes    = hero._bytes if hero._bytes is not None else bytearray(hero.bytes)
+        self._states   = hero.snapshot()
+        self._frozen   = dict(self._states)
+        self._parsed   = set(hero._parsed)
+
+    def snapshot(self):
+        """
+        Returns plugin attributes as immutable states, as {plugin name: state},
+        freezing only attributes changed since last snapshot.
+        """
+        frozen = self._frozen
+        for name, value in self._states.items():
+            if name not in frozen or (frozen[name] is not value and frozen[name] != value):
+                frozen[name] = util.freeze(value)
+        for name in [x for x in frozen if x not in self._states]: frozen.pop(name)
+        return dict(frozen)
+
+    def invalidate(self):
+        """Drops all plugin attributes, to be parsed anew from hero bytes on demand."""
+        self._states.clear()
+        self._parsed.clear()
 
     def get_bytes(self, original=False):
         """Returns hero bytearray, current or original."""
-        if not original: return copy.copy(self.bytes)
+        if not original: return bytearray(self.bytes)
         return bytearray(self.savefile.raw0[self.span[0]:self.span[1]])
 
     def ensure_basestats(self, clear=False):
@@ -295,6 +443,30 @@ class Hero(object):
         for k, v in zip(metadata.PrimaryAttributes, diff):
             self.basestats[k] = self.stats[k] - v
 
+    def __getattr__(self, name):
+        """Returns plugin attribute, like `inventory`, thawing it first if frozen."""
+        if not name.startswith("__"):
+            try: states = object.__getattribute__(self, "_states")
+            except AttributeError: states = {}
+            if name in states:
+                value = states[name]
+                if isinstance(value, (util.FrozenDict, util.FrozenList)):
+                    value = states[name] = util.thaw(value)
+                return value
+            parsers = object.__getattribute__(self, "parsers")
+            if parsers and name in parsers:
+                states[name] = parsers[name]([self])[0]
+                self._parsed.add(name)
+                return states[name]
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """Sets hero attribute, or plugin attribute like `inventory`."""
+        if name in Hero.__slots__ or "bytes" == name: object.__setattr__(self, name, value)
+        else:
+            self._states[name] = value
+            self._parsed.discard(name)
+
     def __eq__(self, other):
         """Returns whether this hero is the same as given (same name and place)."""
         return isinstance(other, Hero) and (self.name, self.place) == (other.name, other.place)
@@ -305,15 +477,486 @@ class Hero(object):
 
 
 
+def make_array(heroes, pos, version):
+    """
+    Returns heroes decoded as one NumPy structured array, with a row per hero
+    and a column per hero attribute in LAYOUT, or None if NumPy not available.
+
+    Heroes still over savefile contents are gathered from contents directly.
+
+    @param   heroes   [Hero, ] from the same savefile
+    @param   pos      hero byte positions like POS, adapted for savefile version
+    @param   version  game version, for number of skills
+    """
+    codec = make_codec(pos, version)
+    if codec.dtype is None: return None
+    if heroes and all(h._bytes is None for h in heroes):
+        return codec.unpack_array(heroes[0].savefile.raw, [h.span[0] for h in heroes])
+    buffer = b"".join(bytes(h.bytes[:codec.size]) for h in heroes)
+    return codec.unpack_array(buffer, range(0, len(buffer), codec.size))
+
+
+def make_codec(pos, version):
+    """
+    Returns codec for unpacking and packing all hero attributes in one call,
+    compiled from LAYOUT at hero byte positions, cached per layout.
+
+    Nested positions like "reserved" are named as "reserved_helm" etc.
+
+    @param   pos      hero byte positions like POS, adapted for savefile version
+    @param   version  game version, for number of skills
+    @return           structcodec.StructCodec
+    """
+    fields = make_layout(pos, version)
+    key = ("codec", tuple(sorted(fields.items())))
+    if key not in LAYOUT_CACHE: LAYOUT_CACHE[key] = structcodec.StructCodec(fields)
+    return LAYOUT_CACHE[key]
+
+
+def make_columns(heroes, pos, version):
+    """
+    Returns hero attributes decoded for all heroes at once, as {name: [value for each hero]},
+    vectorized with NumPy if available. Attributes of several items have lists as values.
+
+    @param   heroes   [Hero, ] from the same savefile
+    @param   pos      hero byte positions like POS, adapted for savefile version
+    @param   version  game version, for number of skills
+    """
+    array = make_array(heroes, pos, version)
+    if array is not None:
+        return {name: array[name].tolist() for name in array.dtype.names}
+    codec = make_codec(pos, version)
+    rows = [codec.unpack(h.bytes) for h in heroes]
+    return {name: [x[name] for x in rows] for name in codec.fields}
+
+
+def make_fields(pos, version):
+    """
+    Returns class for accessing hero attributes by name, generated from hero byte positions,
+    as properties over hero bytes: attributes of a single number as integers,
+    arrays as byte slices. Nested positions like "reserved" are named as "reserved_helm" etc.
+
+    @param   pos      hero byte positions like POS, adapted for savefile version
+    @param   version  game version, for number of skills
+    """
+    fields = make_layout(pos, version)
+    key = ("fields", tuple(sorted(fields.items())))
+    if key in LAYOUT_CACHE: return LAYOUT_CACHE[key]
+
+    def make_property(name, offset, fmt):
+        length = struct.calcsize("<" + fmt)
+        if 1 == length: getter = lambda self: self._hero.bytes[offset]
+        elif fmt in ("H", "L"):
+            getter = lambda self: util.bytoi(self._hero.bytes[offset:offset + length])
+        else: getter = lambda self: self._hero.bytes[offset:offset + length]
+        return property(getter, doc="Hero %s, %s at byte %s." %
+                        (name, "value" if length in (1, 2, 4) else "%s bytes" % length, offset))
+
+    def __init__(self, hero): self._hero = hero
+
+    namespace = {k: make_property(k, o, f) for k, (o, f) in fields.items()}
+    namespace.update(__slots__=("_hero", ), __init__=__init__, __doc__="Hero attribute accessor.")
+    LAYOUT_CACHE[key] = cls = type("HeroFields", (object, ), namespace)
+    return cls
+
+
+def make_layout(pos, version):
+    """
+    Returns hero struct layout for game version, as {name: (offset, struct format)},
+    for attributes in both POS and LAYOUT.
+    """
+    skills = len(metadata.Store.get("skills", version) or ()) or 28
+    result = {}
+    for name, value in pos.items():
+        if name not in LAYOUT: continue # for name, value
+        fmt = LAYOUT[name] % dict(skills=skills)
+        if isinstance(value, dict):
+            result.update(("%s_%s" % (name, k), (v, fmt)) for k, v in value.items())
+        else: result[name] = (value, fmt)
+    return result
+
+
+def parse_states(heroes, names):
+    """
+    Parses plugin attributes not yet present in heroes, in one batch per attribute,
+    memoized in heroes same as attributes parsed on demand.
+
+    @param   heroes  [Hero, ] with parsers
+    @param   names   plugin names to parse attributes of
+    """
+    for name in names:
+        pending = [h for h in heroes if h.parsers and name in h.parsers and name not in h._states]
+        if not pending: continue # for name
+        for hero, state in zip(pending, pending[0].parsers[name](pending)):
+            hero._states[name] = state
+            hero._parsed.add(name)
+
+
+
+class HeroRegistry(object):
+    """
+    Heroes in index order, looked up by name and place, by byte offset in savefile
+    contents, and by hero tab page. Supports list-like access by index.
+    """
+
+    def __init__(self, heroes=()):
+        """
+        @param   heroes  [Hero, ] in index order
+        """
+        self._heroes  = []  # [Hero, ] in index order
+        self._keys    = {}  # {(name, place): index}
+        self._names   = {}  # {name: first index}
+        self._starts  = []  # [hero span start, ] ascending
+        self._spans   = []  # [(start, end, index), ] ascending
+        self._pages   = {}  # {tab page: index}
+        self._indexes = {}  # {index: tab page}
+        self.reset(heroes)
+
+
+    def reset(self, heroes):
+        """Replaces all heroes with given, in index order, clears tab pages."""
+        self._heroes[:] = heroes
+        self._keys  = {(h.name, h.place): i for i, h in enumerate(self._heroes)}
+        self._names = {}
+        for i, hero in enumerate(self._heroes): self._names.setdefault(hero.name, i)
+        self._spans  = sorted((h.span[0], h.span[1], i) for i, h in enumerate(self._heroes))
+        self._starts = [x[0] for x in self._spans]
+        self.clear_pages()
+
+
+    def index(self, hero):
+        """Returns index of hero with same name and place, raises ValueError if none."""
+        index = self._keys.get((hero.name, hero.place))
+        if index is None: raise ValueError("%s is not in registry" % hero)
+        return index
+
+
+    def get(self, name, place=None):
+        """Returns hero by name and place, or first hero by name if no place given, or None."""
+        index = self._names.get(name) if place is None else self._keys.get((name, place))
+        return None if index is None else self._heroes[index]
+
+
+    def find(self, name):
+        """Returns index of first hero with given name, or -1 if none."""
+        return self._names.get(name, -1)
+
+
+    def at(self, offset):
+        """Returns index of hero whose span contains byte offset, or None."""
+        i = bisect.bisect_right(self._starts, offset)
+        if i and offset < self._spans[i - 1][1]: return self._spans[i - 1][2]
+        return None
+
+
+    def within(self, start, end):
+        """Returns indexes of heroes with spans lying entirely within given span, in span order."""
+        result = []
+        for i in range(bisect.bisect_left(self._starts, start), len(self._spans)):
+            s, e, index = self._spans[i]
+            if s >= end: break # for i
+            if e <= end: result.append(index)
+        return result
+
+
+    def get_page(self, index):
+        """Returns tab page of hero at index, or None."""
+        return self._indexes.get(index)
+
+
+    def get_index(self, page):
+        """Returns index of hero on tab page, or None."""
+        return self._pages.get(page)
+
+
+    def set_page(self, page, index):
+        """Sets tab page for hero at index, replacing any previous page of either."""
+        self.pop_page(page), self.pop_page(self._indexes.get(index))
+        self._pages[page], self._indexes[index] = index, page
+
+
+    def pop_page(self, page):
+        """Removes tab page, returns index of hero on it, or None."""
+        index = self._pages.pop(page, None)
+        if index is not None: self._indexes.pop(index, None)
+        return index
+
+
+    def pages(self):
+        """Returns hero tab pages, as [(page, index), ]."""
+        return list(self._pages.items())
+
+
+    def clear_pages(self):
+        """Removes all tab pages."""
+        self._pages.clear()
+        self._indexes.clear()
+
+
+    def __contains__(self, hero):
+        """Returns whether registry has hero with same name and place."""
+        return isinstance(hero, Hero) and (hero.name, hero.place) in self._keys
+
+
+    def __getitem__(self, index):
+        """Returns hero at index, or list of heroes for slice."""
+        return self._heroes[index]
+
+
+    def __iter__(self):
+        """Yields heroes in index order."""
+        return iter(self._heroes)
+
+
+    def __len__(self):
+        """Returns number of heroes."""
+        return len(self._heroes)
+
+
+
+class HeroScanner(object):
+    """Finds hero structs in savefile contents, consuming contents as they arrive."""
+
+    """Offset to start searching from, jumping over potential campaign carry-over heroes."""
+    START = 30000
+
+    """Search window once heroes section reached, regex can get slow for remainder."""
+    WINDOW = 5000
+
+    """Filename extension of hero layout entries in savefile disk cache."""
+    LAYOUT_EXTENSION = ".lay"
+
+    RGX_STRIP = re.compile(br"^(?!\xFF+\x00+$)([^\x00-\x19]+)\x00+$")
+    RGX_NULLS = re.compile(br"^(\x00+)|(\x00{4}\xFF{4})+$")
+
+
+    def __init__(self, savefile, progress=None):
+        """
+        Starts searching from hero table in savefile section map if already mapped,
+        else from fixed offset past potential campaign carry-over heroes.
+
+        @param   savefile  metadata.Savefile instance
+        @param   progress  callback(pos, size) invoked as scanning proceeds, if any
+        """
+        self.name     = PROPS["name"]
+        self.savefile = savefile
+        regex = plugins.adapt(self, "regex", RGX_HERO)
+        cls = scanners.StreamScanner
+        if conf.VectorizedScan and scanners.MaskScanner.supports(regex): cls = scanners.MaskScanner
+        section = savefile.sections.get("%s/heroes" % self.name)
+        start = section[0] if section else self.START
+        self._scanner = cls(regex, start, self.WINDOW, self.accept,
+                            conf.ScanTimeBudget, progress)
+        self._layout  = self.load_layout()  # Hero spans from last scan of same map, if any
+        if self._layout: self._scanner.expect(self._layout)
+
+
+    def accept(self, match):
+        """Returns whether regex match is a valid hero struct."""
+        return bool(self.RGX_STRIP.match(match.group("name"))) \
+               and not self.RGX_NULLS.match(match.group("artifacts"))
+
+
+    def feed(self, buffer, final=False):
+        """
+        Scans savefile contents available so far.
+
+        If hero layout of same map is cached from an earlier scan, heroes are confirmed
+        at their cached spacing as contents arrive, with regular scanning taking over
+        wherever a hero is not where expected.
+        """
+        self._scanner.feed(buffer, final)
+        if final and self._scanner.done and not self._scanner.cancelled:
+            self.save_layout(self._layout)
+
+
+    def scan_file(self):
+        """
+        Scans savefile on disk, decompressing contents only until scanning is done,
+        for savefiles loaded with header only.
+        """
+        raw = bytearray()
+        with self.savefile.open_file() as f:
+            for chunk in gzstream.Inflater(f).iterate():
+                raw += chunk
+                self.feed(raw)
+                if self.done: break # for chunk
+        if not self.done: self.feed(raw, final=True)
+
+
+    def load_layout(self):
+        """Returns hero spans cached for savefile map, as [(start, end), ], or None."""
+        cache, key = self.savefile.get_cache(), self.get_layout_key()
+        data = cache.get(key, self.LAYOUT_EXTENSION) if cache and key else None
+        try: return data and [tuple(x) for x in json.loads(data[:].decode("utf-8"))]
+        except Exception:
+            logger.warning("Error reading cached hero layout of %s.", self.savefile.filename,
+                           exc_info=True)
+        finally: data and data.close()
+
+
+    def save_layout(self, layout0=None):
+        """Stores hero spans found in disk cache, unless unchanged from cached layout."""
+        spans = self.spans()
+        cache, key = self.savefile.get_cache(), self.get_layout_key()
+        if not spans or not cache or not key or spans == layout0: return
+        cache.put(key, json.dumps(spans).encode("utf-8"), self.LAYOUT_EXTENSION, overwrite=True)
+
+
+    def get_layout_key(self):
+        """Returns disk cache key for hero layout, from game version, map name and description."""
+        if not self.savefile.version: return None
+        mapdata = self.savefile.mapdata
+        parts = (self.savefile.version, mapdata.get("name"), mapdata.get("desc"))
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+    def spans(self):
+        """Returns spans of heroes found, as [(start, end), ] in savefile order."""
+        return [match.span() for match in self._scanner.matches]
+
+
+    def heroes(self, parsers=None):
+        """
+        Returns heroes found, as [Hero, ] in savefile order, over savefile contents.
+
+        @param   parsers  {plugin name: function(heroes) returning [state, ]} for heroes, if any
+        """
+        pos = plugins.adapt(self, "pos", POS)
+        result, fields = [], make_fields(pos, self.savefile.version)
+        for match in self._scanner.matches:
+            name = util.to_unicode(self.RGX_STRIP.match(match.group("name")).group(1))
+            result.append(Hero(name, None, len(result), match.span(), self.savefile, fields,
+                               parsers))
+        return result
+
+
+    def cancel(self):
+        """Stops scanning as soon as possible, keeping heroes found so far."""
+        self._scanner.cancel()
+
+
+    @property
+    def cancelled(self):
+        """Whether scanning was cancelled before reaching its end."""
+        return self._scanner.cancelled
+
+
+    @property
+    def progress(self):
+        """Callback(pos, size) invoked as scanning proceeds, if any."""
+        return self._scanner.progress
+
+
+    @progress.setter
+    def progress(self, progress):
+        """Sets callback(pos, size) invoked as scanning proceeds, or None."""
+        self._scanner.progress = progress
+
+
+    @property
+    def done(self):
+        """Whether scanning has reached its end."""
+        return self._scanner.done
+
+
+
+class HeroValidator(object):
+    """
+    Checks changed hero structs before savefile gets written, by matching hero struct
+    pattern anchored at each changed span only, instead of rescanning all contents.
+    """
+
+    """Maximum counts in slots reserved by combination artifacts, default 1."""
+    RESERVED_MAX = {"hand": 2, "side": 5}
+
+
+    def __init__(self, savefile):
+        self.name     = PROPS["name"]
+        self.savefile = savefile
+        self.regex    = plugins.adapt(self, "regex", RGX_HERO)
+        self.reserved = plugins.adapt(self, "pos", POS).get("reserved") or {}
+        self.width    = scanners.pattern_width(self.regex)
+
+
+    def validate(self, spans):
+        """
+        Returns problems in changed spans that originally lay within a hero struct,
+        as [text, ]: hero no longer matching hero struct pattern, or changed
+        combination artifact reserved slot counts out of range.
+
+        Spans longer than a hero struct, like fully rewritten contents, are not checked.
+
+        @param   spans  changed byte spans, as [(start, end), ]
+        """
+        result, raw, raw0, checked = [], self.savefile.raw, self.savefile.raw0, set()
+        for start, end in spans:
+            if end - start > self.width: continue # for start, end
+            offset = max(0, end - self.width)
+            bytes0 = bytearray(raw0[offset:start + self.width])
+            match0 = self.locate(bytes0, start - offset, end - offset)
+            if not match0: continue # for start, end  Not within a hero struct
+            hstart, hend = offset + match0.start(), offset + match0.end()
+            if hstart in checked: continue # for start, end
+            checked.add(hstart)
+            name = HeroScanner.RGX_STRIP.match(match0.group("name"))
+            name = util.to_unicode(name.group(1)) if name else "at byte %s" % hstart
+            match = self.regex.match(raw, hstart, hend)
+            if not match or match.end() != hend:
+                result.append("Hero %s no longer matches hero data format, at byte %s." %
+                              (name, hstart))
+                continue # for start, end
+            for slot, pos in sorted(self.reserved.items(), key=lambda x: x[1]):
+                value, value0 = raw[hstart + pos], bytes0[match0.start() + pos]
+                if value == value0 or value <= self.RESERVED_MAX.get(slot, 1):
+                    continue # for slot, pos
+                result.append("Hero %s has invalid count %s in combination artifact "
+                              "reserved %s slot, at byte %s." % (name, value, slot, hstart + pos))
+        return result
+
+
+    def locate(self, buffer, start, end):
+        """
+        Returns hero struct match in buffer covering span from start to end, or None.
+        Tries match anchored at span start first, as changes usually span whole heroes.
+        """
+        match = self.regex.match(buffer, start)
+        if match and match.end() >= end: return match
+        pos = max(0, end - self.width)
+        while pos <= start:
+            match = self.regex.search(buffer, pos, start + self.width)
+            if not match or match.start() > start: break # while
+            if match.end() >= end and HeroScanner.RGX_STRIP.match(match.group("name")):
+                return match
+            pos = match.start() + 1
+        return None
+
+
+
 class HeroPlugin(object):
     """Encapsulates hero-plugin state and behaviour."""
 
     """Milliseconds to wait after edit before applying search filter"""
     SEARCH_INTERVAL = 300
 
+    """Seconds to scan heroes before showing progress dialog."""
+    SCAN_DIALOG_DELAY = 0.5
+
+    """Seconds between progress dialog updates while scanning heroes."""
+    SCAN_POLL_INTERVAL = 0.1
+
     """Hero index columns for toggling."""
     INDEX_CATEGORIES = ["stats", "devices", "skills", "army", "artifacts", "inventory", "spells"]
 
+    """Plugins providing hero index columns, for columns named differently."""
+    INDEX_PLUGINS = {"devices": "stats"}
+
+    """Number of heroes to parse remaining categories for at a time, after showing index."""
+    INDEX_FILL_BATCH = 20
+
+    """Seconds between parsing batches of remaining hero categories."""
+    INDEX_FILL_INTERVAL = 0.01
+
 
     def __init__(self, savefile, panel, commandprocessor):
         self.name        = PROPS["name"]
@@ -321,9 +964,9 @@ class HeroPlugin(object):
         self._panel      = panel   # wxPanel container for plugin components
         self._undoredo   = commandprocessor # wx.CommandProcessor
         self._plugins    = []      # [{name, label, instance, panel}, ]
-        self._heroes     = []      # [Hero(name, bytes, place, span, ..), ] ordered by name
+        self._parsers    = {}      # {plugin name: plugin parse function} for heroes
+        self._heroes     = HeroRegistry()  # Heroes ordered by name, with their tab pages
         self._ctrls      = {}      # {name: wx.Control, }
-        self._pages      = {}      # {wx.Window from self._ctrls["tabs"]: hero index in self._heroes}
         self._indexpanel = None    # Heroes index panel
         self._hero       = None    # Currently selected Hero instance
         self._heropanel  = None    # Container for hero components
@@ -331,6 +974,7 @@ class HeroPlugin(object):
         self._ignore_events = False  # For ignoring change events from programmatic selections
         self._index = {
             "herotexts": [],       # [hero contents to search in, as [{category: plaintext}] ]
+            "refresh":   set(),    # {hero index in self._heroes, } to update contents for
             "html":      "",       # Current hero search results HTML
             "text":      "",       # Current search text
             "stale":     True,     # Whether should repopulate index before display
@@ -342,7 +986,8 @@ class HeroPlugin(object):
             "toggles":   collections.OrderedDict(),  # {category: toggled state}
         }
         self._dialog_export = wx.FileDialog(panel, "Export heroes to file",
-            wildcard="CSV spreadsheet (*.csv)|*.csv|HTML document (*.html)|*.html",
+            wildcard="CSV spreadsheet (*.csv)|*.csv|HTML document (*.html)|*.html" +
+                     ("|NumPy arrays (*.npz)|*.npz" if numpy else ""),
             style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT | wx.FD_CHANGE_DIR | wx.RESIZE_BORDER
         )
         self._dialog_export.FilterIndex = 1
@@ -380,7 +1025,8 @@ class HeroPlugin(object):
         export = wx.Button(indexpanel, label="Expo&rt")
         export.SetBitmap(bmpx)
         export.SetBitmapMargins(0, 0)
-        export.ToolTip = "Export heroes to HTML or CSV"
+        export.ToolTip = "Export heroes to HTML, CSV or NumPy arrays" if numpy else \
+                         "Export heroes to HTML or CSV"
         export.Bind(wx.EVT_BUTTON, self.on_export_heroes)
 
         for category in self.INDEX_CATEGORIES:
@@ -535,6 +1181,7 @@ class HeroPlugin(object):
             self._plugins = [x.copy() for x in PLUGINS]
             for p in self._plugins:
                 p["instance"] = p["module"].factory(self.savefile, self, panel=None)
+            self._parsers.update((p["name"], p["instance"].parse) for p in self._plugins)
         if reparse or reload: self._index["stale"] = True
         if reparse: self.reparse()
         elif self._hero and self._heropanel.Children:
@@ -548,17 +1195,17 @@ class HeroPlugin(object):
             value = kwargs["load"]
             if isinstance(value, int):
                 index = max(0, min(value, len(self._heroes) - 1))
-            else: index = next((i for i, x in enumerate(self._heroes) if x.name == value), -1)
+            else: index = self._heroes.find(value)
             if index >= 0 and self._heroes: self.select_hero(index)
         if kwargs.get("save"):
             tabs = self._ctrls["tabs"]
             heroes_open = []
-            for index, hero in enumerate(self._heroes):
-                if kwargs.get("spans") \
-                and not any(a <= hero.span[0] and hero.span[1] <= b for a, b in kwargs["spans"]):
-                    continue  # for index, hero
+            indexes = range(len(self._heroes)) if not kwargs.get("spans") else \
+                      sorted(set(i for a, b in kwargs["spans"] for i in self._heroes.within(a, b)))
+            for index in indexes:
+                hero = self._heroes[index]
                 hero.yamls1[:], hero.yamls2[:] = (hero.yamls2 or hero.yamls1), []
-                page = next((p for p, i in self._pages.items() if i == index), None)
+                page = self._heroes.get_page(index)
                 if page is not None:
                     heroes_open.append(hero)
                     tabs.SetPageText(tabs.GetPageIndex(page), hero.name)
@@ -572,12 +1219,12 @@ class HeroPlugin(object):
         """Reparses state from savefile and refreshes UI."""
         tabs = self._ctrls["tabs"]
         hero0 = self._hero if self._pages_visited[-1:] not in ([], [None]) else None
-        pages0 = [self._pages[p] for i in range(tabs.GetPageCount())
-                  for p in [tabs.GetPage(i)] if p in self._pages]  # [hero index, ]
+        pages0 = [i for i in (self._heroes.get_index(tabs.GetPage(j))  # [hero index, ]
+                              for j in range(tabs.GetPageCount())) if i is not None]
         heroes0  = self._heroes[:]
         visited0 = self._pages_visited[:]
         self._hero = None
-        self._pages.clear()
+        self._heroes.clear_pages()
         del self._pages_visited[:]
         for k, v in list(self._index.items()):
             if isinstance(v, (str, list)): self._index[k] = type(v)()
@@ -593,20 +1240,20 @@ class HeroPlugin(object):
                 hero1 = heroes0[index]
                 hero2 = index < len(self._heroes) and self._heroes[index]
                 if hero1 != hero2:
-                    hero2 = next((x for x in self._heroes if x == hero1), None)  # Match name+place
-                    hero2 = hero2 or next((x for x in self._heroes if x.name == hero1.name), None)
+                    hero2 = self._heroes.get(hero1.name, hero1.place)  # Match name+place
+                    hero2 = hero2 or self._heroes.get(hero1.name)
                 if not hero2:
                     visited0 = [i for i in visited0 if i != index]
                     continue  # for index
                 page = wx.Window(tabs)
-                self._pages[page] = index
+                self._heroes.set_page(page, index)
                 if not hero and hero0 and hero2.name == hero0.name: hero = hero2
                 tabs.AddPage(page, hero2.name, select=hero2 is hero)
 
             visited0 = [v for i, v in enumerate(visited0) if not i or v != visited0[i - 1]]
             self._pages_visited[:] = visited0
             if not hero and visited0[-1:] not in ([], [None]): hero = self._heroes[visited0[-1]]
-            index = next(i for i, x in enumerate(self._heroes) if x is hero) if hero else None
+            index = self._heroes.index(hero) if hero else None
             self.select_index() if index is None else self.select_hero(index, status=False)
             self._panel.Layout()
         finally:
@@ -614,6 +1261,53 @@ class HeroPlugin(object):
             self._panel.Thaw()
 
 
+    def refresh(self, raw0):
+        """
+        Updates heroes changed in savefile reread after external change, returns success.
+        Fails if heroes have been added, removed or relocated in savefile.
+
+        @param   raw0  savefile contents before reread
+        """
+        scanner = self.scan()
+        key = lambda x: (x.place, x.name, x.span)
+        if sorted(map(key, scanner.heroes())) != sorted(map(key, self._heroes)): return False
+
+        changed, raw = [], self.savefile.raw
+        for index, hero in enumerate(self._heroes):
+            if raw0[hero.span[0]:hero.span[1]] == raw[hero.span[0]:hero.span[1]]:
+                continue  # for index, hero
+            hero.bytes = None  # Window into reread contents
+            hero.invalidate()
+            hero.basestats.clear()
+            hero.state0.clear()
+            hero.yamls2[:] = []
+            changed.append(hero)
+            self._index["refresh"].add(index)
+        logger.info("Refreshed %s in %s%s.", util.plural("changed hero", changed),
+                    self.savefile.filename,
+                    ": %s" % ", ".join(x.name for x in changed) if changed else "")
+        if not changed: return True
+
+        if self._index["herotexts"]:
+            parse_states(changed, [p["name"] for p in self._plugins])
+            for hero in changed:
+                hero.ensure_basestats()
+                self.serialize_yaml(hero)
+        if self._hero in changed:
+            self._panel.Freeze()
+            try:
+                for p in self._plugins:
+                    self.render_plugin(p["name"], reload=True, log=False)
+                    self._hero.state0[p["name"]] = util.freeze(p["instance"].state())
+            finally: self._panel.Thaw()
+        tabs = self._ctrls["tabs"]
+        for page, index in self._heroes.pages():
+            tabs.SetPageText(tabs.GetPageIndex(page), self._heroes[index].name)
+        self._index["stale"] = True
+        if self._indexpanel.Shown: self.populate_index()
+        return True
+
+
     def populate_index(self, focus=False, force=False):
         """Populates heroes index page, filtered by current search if any."""
         if not self._panel: return
@@ -624,23 +1318,31 @@ class HeroPlugin(object):
 
         heroes, links = self._heroes[:], list(range(len(self._heroes)))
         pluginmap = {p["name"]: p["instance"] for p in self._plugins}
-        tpl = step.Template(templates.HERO_SEARCH_TEXT)
         tplargs = dict(pluginmap=pluginmap, categories=self._index["toggles"],
                        sort_col=self._index["sort_col"], sort_asc=self._index["sort_asc"])
-        maketexts = lambda h: {c: tpl.expand(hero=h, category=c, **tplargs).lower()
-                               for c in (["name"] + self.INDEX_CATEGORIES)}
+        # Parse and index only categories shown, others get filled in later
+        categories = [c for c in self.INDEX_CATEGORIES
+                      if self._index["toggles"][c] or c == self._index["sort_col"]]
         if not self._index["herotexts"]:
-            for p in self._plugins:
-                for hero, state in zip(heroes, p["instance"].parse(heroes)):
-                    setattr(hero, p["name"], state)
-            for hero in heroes:
-                hero.ensure_basestats()
-                self.serialize_yaml(hero)
-            self._index["herotexts"] = [maketexts(h) for h in heroes]
-        elif self._hero:
-            self._hero.ensure_basestats()
-            index = next(i for i, h in enumerate(self._heroes) if h == self._hero)
-            self._index["herotexts"][index] = maketexts(self._hero)
+            parse_states(heroes, [self.INDEX_PLUGINS.get(c, c) for c in categories])
+            self._index["herotexts"] = self.make_index_texts(heroes, categories)
+            wx.CallLater(int(1000 * self.INDEX_FILL_INTERVAL), self.fill_index,
+                         self._index["herotexts"])
+        else:
+            herotexts = self._index["herotexts"]
+            missing = [c for c in categories if any(c not in x for x in herotexts)]
+            if missing:
+                parse_states(heroes, [self.INDEX_PLUGINS.get(c, c) for c in missing])
+                for texts, texts2 in zip(herotexts, self.make_index_texts(heroes, missing)):
+                    texts.update(texts2)
+            indexes = set(self._index["refresh"])
+            if self._hero:
+                self._hero.ensure_basestats()
+                indexes.add(self._heroes.index(self._hero))
+            for index in indexes:
+                done = [c for c in self.INDEX_CATEGORIES if c in herotexts[index]]
+                herotexts[index] = self.make_index_texts([self._heroes[index]], done)[0]
+        self._index["refresh"].clear()
 
         if searchtext:
             words, herotexts = searchtext.strip().lower().split(), self._index["herotexts"]
@@ -668,6 +1370,38 @@ class HeroPlugin(object):
             self.select_index()
 
 
+    def fill_index(self, herotexts, start=0):
+        """
+        Parses remaining categories for a batch of heroes, serializes hero YAMLs
+        and fills in index texts, scheduling next batch until all heroes done.
+
+        @param   herotexts  index texts being filled, stops if index repopulated since
+        @param   start      index of first hero in batch
+        """
+        if not self._panel or herotexts is not self._index["herotexts"]: return
+        heroes = self._heroes[start:start + self.INDEX_FILL_BATCH]
+        parse_states(heroes, [p["name"] for p in self._plugins])
+        for i, hero in enumerate(heroes, start):
+            hero.ensure_basestats()
+            if not hero.yamls1: self.serialize_yaml(hero)
+            missing = [c for c in self.INDEX_CATEGORIES if c not in herotexts[i]]
+            if missing: herotexts[i].update(self.make_index_texts([hero], missing)[0])
+        if start + len(heroes) < len(self._heroes):
+            wx.CallLater(int(1000 * self.INDEX_FILL_INTERVAL), self.fill_index,
+                         herotexts, start + len(heroes))
+
+
+    def make_index_texts(self, heroes, categories):
+        """
+        Returns hero contents to search in, for hero name and given index categories,
+        as [{category: lowercase text}].
+        """
+        pluginmap = {p["name"]: p["instance"] for p in self._plugins}
+        tpl = step.Template(templates.HERO_SEARCH_TEXT)
+        return [{c: tpl.expand(hero=h, category=c, pluginmap=pluginmap).lower()
+                 for c in ["name"] + list(categories)} for h in heroes]
+
+
     def on_copy_hero(self, event=None):
         """Handler for copying a hero, adds hero data to clipboard."""
         if self._hero and wx.TheClipboard.Open():
@@ -736,9 +1470,9 @@ class HeroPlugin(object):
     def on_change_page(self, event):
         """Handler for changing a page in the heroes notebook, loads hero data."""
         if self._ignore_events or event.GetOldSelection() < 0: return
-        page = self._ctrls["tabs"].GetCurrentPage()
-        if page not in self._pages: self.select_index()
-        else: self.select_hero(self._pages[page], status=False)
+        index = self._heroes.get_index(self._ctrls["tabs"].GetCurrentPage())
+        if index is None: self.select_index()
+        else: self.select_hero(index, status=False)
 
 
     def on_close_page(self, event):
@@ -746,12 +1480,11 @@ class HeroPlugin(object):
         if self._ignore_events: return
         tabs = self._ctrls["tabs"]
         page = tabs.GetPage(event.GetSelection())
-        if page not in self._pages:
+        if self._heroes.get_index(page) is None:
             event.Veto()  # Disallow closing index
             return
         page0 = tabs.GetCurrentPage()
-        index = next((i for p, i in self._pages.items() if p == page), 0)
-        self._pages.pop(page, None)
+        index = self._heroes.pop_page(page)
         visited = [x for x in self._pages_visited if x != index]
         self._pages_visited = [v for i, v in enumerate(visited) if not i or v != visited[i - 1]]
         if page0 is page:  # Closed the active page
@@ -770,7 +1503,8 @@ class HeroPlugin(object):
         try:
             cur_page = tabs.GetCurrentPage()
             idx_index, idx_page = next((i, p) for i in range(tabs.GetPageCount())
-                                       for p in [tabs.GetPage(i)] if p not in self._pages)
+                                       for p in [tabs.GetPage(i)]
+                                       if self._heroes.get_index(p) is None)
             if idx_index > 0:
                 text = tabs.GetPageText(idx_index)
                 tabs.RemovePage(idx_index)
@@ -820,7 +1554,7 @@ class HeroPlugin(object):
             wx.MessageBox("Hero '%s' not found." % event.EventObject.Value,
                           conf.Title, wx.OK | wx.ICON_ERROR)
             return
-        self.select_hero(index, status=index not in self._pages.values())
+        self.select_hero(index, status=self._heroes.get_page(index) is None)
 
 
     def report_hero_inventory(self, hero_dict):
@@ -1014,11 +1748,20 @@ class HeroPlugin(object):
         wx.YieldIfNeeded() # Allow dialog to disappear
         path = controls.get_dialog_path(self._dialog_export)
         guibase.status("Exporting %s..", path, flash=True)
-        plugins = {p["name"]: p["instance"] for p in self._plugins}
-        if self._dialog_export.FilterIndex:
+        pluginmap = {p["name"]: p["instance"] for p in self._plugins}
+        if numpy and 2 == self._dialog_export.FilterIndex:  # Choice offered only with NumPy
+            heroes = self._index["visible"]
+            array = make_array(heroes, plugins.adapt(self, "pos", POS), self.savefile.version)
+            columns = {k: array[k] for k in array.dtype.names}
+            columns.update(name=numpy.array([h.name for h in heroes], dtype=str),
+                           place=numpy.array([h.place for h in heroes]),
+                           span=numpy.array([h.span for h in heroes]).reshape(-1, 2))
+            with open(path, "wb") as f:
+                numpy.savez_compressed(f, **columns)
+        elif self._dialog_export.FilterIndex:
             tpl = step.Template(templates.HERO_EXPORT_HTML, strip=False, escape=True)
             tplargs = dict(heroes=self._index["visible"], categories=self._index["toggles"],
-                           pluginmap=plugins, savefile=self.savefile, count=len(self._heroes))
+                           pluginmap=pluginmap, savefile=self.savefile, count=len(self._heroes))
             with open(path, "wb") as f:
                 tpl.stream(f, **tplargs)
         else:
@@ -1029,11 +1772,12 @@ class HeroPlugin(object):
             with util.csv_writer(path) as f:
                 f.writerow([c.capitalize() for c in COLS])
                 for hero in self._index["visible"]:
-                    vv = [tpl.expand(hero=hero, column=c, pluginmap=plugins).strip() for c in COLS]
+                    vv = [tpl.expand(hero=hero, column=c, pluginmap=pluginmap).strip()
+                          for c in COLS]
                     f.writerow(vv)
         guibase.status("Exported %s (%s).", path, util.format_bytes(os.path.getsize(path)),
                        flash=True)
-        util.start_file(path)
+        if 2 != self._dialog_export.FilterIndex: util.start_file(path) # No viewer for arrays
 
 
     def on_toggle_category(self, event):
@@ -1061,11 +1805,12 @@ class HeroPlugin(object):
         if not self._panel: return
         hero2 = self._heroes[index] if index < len(self._heroes) else None
         if not hero2: return
-        if hero2 is self._hero and index in self._pages.values():
+        if hero2 is self._hero and self._heroes.get_page(index) is not None:
             self.select_hero_tab(index)
             return
 
         hero2.ensure_basestats()
+        if not hero2.yamls1: self.serialize_yaml(hero2)  # Baseline for detecting changes
         combo, tabs, tb = self._ctrls["hero"], self._ctrls["tabs"], self._ctrls["toolbar"]
         busy = controls.BusyPanel(self._panel, "Loading %s." % hero2.name) if status else None
         if status: guibase.status("Loading %s.", hero2.name, flash=True)
@@ -1073,10 +1818,10 @@ class HeroPlugin(object):
         self._ignore_events = True
         self._panel.Freeze()
         combo.SetSelection(index)
-        page_existed = index in self._pages.values()
+        page_existed = self._heroes.get_page(index) is not None
         if not page_existed:
             page = wx.Window(tabs)
-            self._pages[page] = index
+            self._heroes.set_page(page, index)
             changed = hero2.yamls2 and hero2.yamls1 != hero2.yamls2
             title = "%s%s" % (hero2.name, "*" if changed else "")
             tabs.AddPage(page, title, select=True)
@@ -1098,7 +1843,7 @@ class HeroPlugin(object):
             do_state0 = not self._hero.state0
             for p in self._plugins:
                 self.render_plugin(p["name"], reload=True, log=not page_existed)
-                if do_state0: self._hero.state0[p["name"]] = copy.deepcopy(p["instance"].state())
+                if do_state0: self._hero.state0[p["name"]] = util.freeze(p["instance"].state())
 
         finally:
             if self._pages_visited[-1:] != [index]: self._pages_visited.append(index)
@@ -1114,7 +1859,7 @@ class HeroPlugin(object):
     def select_hero_tab(self, index):
         """Ensures hero tab is selected and hero panel shown."""
         combo, tabs, tb = self._ctrls["hero"], self._ctrls["tabs"], self._ctrls["toolbar"]
-        page = next(p for p, i in self._pages.items() if i == index)
+        page = self._heroes.get_page(index)
         idx  = next(i for i in range(tabs.GetPageCount()) if page is tabs.GetPage(i))
         if tabs.GetSelection() != idx: tabs.SetSelection(idx)
         style = tabs.GetAGWWindowStyleFlag() | wx.lib.agw.flatnotebook.FNB_X_ON_TAB
@@ -1150,37 +1895,62 @@ class HeroPlugin(object):
             search.SetSelection(*searchsel)
 
 
+    def scan(self):
+        """
+        Returns HeroScanner finished with savefile contents, using scanner created while
+        reading savefile if available, scanning in a background thread. If scanning takes
+        longer than a moment, shows progress dialog with option to cancel,
+        keeping heroes found so far.
+        """
+        scanner0 = self.savefile.scanners.get(self.name)
+        scanner = scanner0 or HeroScanner(self.savefile)
+        if not scanner.done:
+            state = {"pos": 0, "size": len(self.savefile.raw), "error": None}
+            def progress(pos, size): state.update(pos=pos, size=size)
+            def run():
+                try: scanner.feed(self.savefile.raw, final=True)
+                except Exception as e: state["error"] = e
+
+            scanner.progress = progress
+            worker = threading.Thread(target=run, name="h3sed-scan")
+            worker.daemon = True
+            worker.start()
+            dialog, started = None, time.time()
+            try:
+                while worker.is_alive():
+                    worker.join(self.SCAN_POLL_INTERVAL)
+                    if not worker.is_alive() or scanner.cancelled \
+                    or time.time() - started < self.SCAN_DIALOG_DELAY: continue # while
+                    if not dialog:
+                        dialog = wx.ProgressDialog(conf.Title, "Scanning %s for heroes.." %
+                                                   os.path.basename(self.savefile.filename), 100,
+                                                   self._panel.TopLevelParent, wx.PD_APP_MODAL |
+                                                   wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME)
+                    percent = min(99, 100 * state["pos"] // max(state["size"], 1))
+                    if not dialog.Update(percent)[0]: scanner.cancel()
+            finally:
+                scanner.progress = None
+                if dialog: dialog.Destroy()
+            if state["error"]: raise state["error"]
+            if scanner.cancelled:
+                logger.warning("Cancelled scanning heroes in %s at offset %s of %s.",
+                               self.savefile.filename, state["pos"], state["size"])
+        if scanner0:  # Map hero sections from scanner created for savefile as read
+            self.savefile.map_sections()
+            self.savefile.scanners.pop(self.name, None)
+        return scanner
+
+
     def parse(self):
         """
         Populates the list of hero bytearrays parsed from savefile binary,
         as [{"name": hero name, "bytes": bytearray()}], sorted by name.
         """
-        heroes = []
-
-        rgx_strip = re.compile(br"^(?!\xFF+\x00+$)([^\x00-\x19]+)\x00+$")
-        rgx_nulls = re.compile(br"^(\x00+)|(\x00{4}\xFF{4})+$")
-        RGX = plugins.adapt(self, "regex", RGX_HERO)
-
-        # Jump over potential campaign carry-over heroes, stored in savefile with their
-        # original armies+artifacts; the structs used by game come later.
-        pos = 30000
-        m = re.search(RGX, self.savefile.raw[pos:])
-        while m:
-            start, end = m.span()
-            if rgx_strip.match(m.group("name")) and not rgx_nulls.match(m.group("artifacts")):
-                blob = bytearray(self.savefile.raw[pos + start:pos + end])
-                name = util.to_unicode(rgx_strip.match(m.group("name")).group(1))
-                hero = Hero(name, blob, len(heroes), (start + pos, end + pos), self.savefile)
-                heroes.append(hero)
-                pos += end
-            else:
-                pos += start + 1
-            # Continue in small chunks once heroes section reached, regex can get slow for remainder
-            m = re.search(RGX, self.savefile.raw[pos:pos+5000])
+        heroes = self.scan().heroes(self._parsers)
 
         logger.info("%s heroes detected in %s as version '%s'.",
                     len(heroes) or "No ", self.savefile.filename, self.savefile.version)
-        self._heroes[:] = sorted(heroes, key=lambda x: x.name.lower())
+        self._heroes.reset(sorted(heroes, key=lambda x: x.name.lower()))
         self._index["stale"] = True
 
 
@@ -1297,12 +2067,12 @@ class HeroPlugin(object):
     def set_data(self, hero):
         """Sets current hero object."""
         combo, tabs = self._ctrls["hero"], self._ctrls["tabs"]
-        index = next(i for i, h in enumerate(self._heroes) if h == hero)
-        if index in self._pages.values():
+        index = self._heroes.index(hero)
+        if self._heroes.get_page(index) is not None:
             self.select_hero_tab(index)
         else:
             page = wx.Window(tabs)
-            self._pages[page] = index
+            self._heroes.set_page(page, index)
             tabs.AddPage(page, hero.name, select=True)
             self._indexpanel.Hide()
             self._heropanel.Show()
@@ -1330,11 +2100,11 @@ class HeroPlugin(object):
             if callable(getattr(p.get("instance"), "serialize", None)):
                 self._hero.bytes = p["instance"].serialize()
         self.savefile.patch(self._hero.bytes, self._hero.span)
+        self._hero.bytes = None  # Back to window into savefile contents, now patched
         self.serialize_yaml(self._hero, changes=True)
         changed = self._hero.yamls2 and self._hero.yamls1 != self._hero.yamls2
         title = "%s%s" % (self._hero.name, "*" if changed else "")
-        index = next(i for i, h in enumerate(self._heroes) if h == self._hero)
-        page = next(p for p, i in self._pages.items() if i == index)
+        page = self._heroes.get_page(self._heroes.index(self._hero))
         self._ctrls["tabs"].SetPageText(self._ctrls["tabs"].GetPageIndex(page), title)
         wx.PostEvent(self._panel, gui.SavefilePageEvent(self._panel.Id))
 
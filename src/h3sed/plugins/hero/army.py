@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   21.03.2020
-@modified  17.06.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import logging
@@ -18,7 +18,7 @@ from h3sed import gui
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 
 
 logger = logging.getLogger(__package__)
@@ -213,13 +213,13 @@ class ArmyPlugin(object):
         NAMES = {x[y]: y for x in [metadata.Store.get("ids", self._savefile.version)]
                  for y in metadata.Store.get("creatures", self._savefile.version)}
         MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, MYPOS, self._savefile.version)
 
-        for hero in heroes:
+        for units, counts in zip(COLUMNS["army_types"], COLUMNS["army_counts"]):
             values = []
             for prop in self.props():
                 for i in range(prop["max"]):
-                    unit, count = (util.bytoi(hero.bytes[MYPOS[k]  + i * 4:MYPOS[k]  + i * 4 + 4])
-                                   for k in ("army_types", "army_counts"))
+                    unit, count = units[i], counts[i]
                     name = NAMES.get(unit)
                     if not count or not name: values.append({})
                     else: values.append({"name": name, "count": count})
@@ -229,12 +229,15 @@ class ArmyPlugin(object):
 
     def serialize(self):
         """Returns new hero bytearray, with edited army section."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
         bytes0 = self._hero.get_bytes(original=True)
 
         IDS = {y: x[y] for x in [metadata.Store.get("ids", self._savefile.version)]
                for y in metadata.Store.get("creatures", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        CODEC = make_codec(plugins.adapt(self, "pos", POS), self._savefile.version)
+        fields0, fields = CODEC.unpack(bytes0), CODEC.unpack(result)
+        units, counts = list(fields["army_types"]), list(fields["army_counts"])
+        BLANK, NULL = util.bytoi(metadata.Blank * 4), util.bytoi(metadata.Null * 4)
 
         state0 = self._hero.state0.get("army") or []
         for prop in self.props():
@@ -242,14 +245,9 @@ class ArmyPlugin(object):
                 name, count = (self._state[i].get(x) for x in ("name", "count"))
                 if (not name or not count) and i < len(state0) and not state0[i].get("name"):
                     # Retain original bytes unchanged, as game uses both 0x00 and 0xFF
-                    b1 = bytes0[MYPOS["army_types"]  + i * 4:MYPOS["army_types"]  + i * 4 + 4]
-                    b2 = bytes0[MYPOS["army_counts"] + i * 4:MYPOS["army_counts"] + i * 4 + 4]
+                    units[i], counts[i] = fields0["army_types"][i], fields0["army_counts"][i]
                 else:
-                    b1, b2 = metadata.Blank * 4, metadata.Null * 4
-                    if count and name in IDS:
-                        b1 = util.itoby(IDS[name], 4)
-                        b2 = util.itoby(count,     4)
-                result[MYPOS["army_types"]  + i * 4:MYPOS["army_types"]  + i * 4 + 4] = b1
-                result[MYPOS["army_counts"] + i * 4:MYPOS["army_counts"] + i * 4 + 4] = b2
+                    units[i], counts[i] = BLANK, NULL
+                    if count and name in IDS: units[i], counts[i] = IDS[name], count
 
-        return result
+        return CODEC.pack(result, {"army_types": units, "army_counts": counts})
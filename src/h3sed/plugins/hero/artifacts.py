@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  17.06.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 from collections import defaultdict
@@ -20,7 +20,7 @@ from h3sed import gui
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 
 
 logger = logging.getLogger(__package__)
@@ -374,24 +374,24 @@ class ArtifactsPlugin(object):
                        for slot in slots}
         IDS   = metadata.Store.get("ids", version)
         NAMES = {x[y]: y for x in [IDS] for y in self._cache["inventory"]}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, plugins.adapt(self, "pos", POS), version)
+        BLANK = util.bytoi(metadata.Blank * 4)
 
-        def parse_item(hero, pos):
-            b, v = hero.bytes[pos:pos + 4], util.bytoi(hero.bytes[pos:pos + 4])
-            if all(x == ord(metadata.Blank) for x in b): return None # Blank
-            return util.bytoi(hero.bytes[pos:pos + 8]) if v == IDS["Spell Scroll"] else v
+        def parse_item(v, extra):
+            if v == BLANK: return None
+            return v | extra << 32 if v == IDS["Spell Scroll"] else v
 
-        for hero in heroes:
+        for i, _ in enumerate(heroes):
             values = {}
             for prop in self.props():
-                values[prop["name"]] = NAMES.get(parse_item(hero, MYPOS[prop["name"]]))
+                values[prop["name"]] = NAMES.get(parse_item(*COLUMNS[prop["name"]][i]))
             result.append(values)
         return result
 
 
     def serialize(self):
         """Returns new hero bytearray, with edited artifacts section."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
         bytes0 = self._hero.get_bytes(original=True)
         version = self._savefile.version
 
@@ -399,35 +399,35 @@ class ArtifactsPlugin(object):
                for y in self._cache["inventory"]}
         SCROLL_ARTIFACTS = self._cache["scroll"]
         MYPOS = plugins.adapt(self, "pos", POS)
+        CODEC = make_codec(MYPOS, version)
         SLOTS = metadata.Store.get("artifact_slots", version)
-        HAS_COMBOS = bool(MYPOS.get("reserved"))
+        BLANK = util.bytoi(metadata.Blank * 4)
+        RESERVED = ["reserved_%s" % x for x in MYPOS.get("reserved") or ()]
 
-        if HAS_COMBOS:
-            pos_reserved, len_reserved = min(MYPOS["reserved"].values()), len(MYPOS["reserved"])
-            result[pos_reserved:pos_reserved + len_reserved] = [0] * len_reserved
-            reserved_sets = set()  # [pos updated in combination artifact flags, ]
+        fields0 = CODEC.unpack(bytes0)
+        values = dict((k, 0) for k in RESERVED)  # Combination artifact flags reset
+        reserved_sets = set()  # [reserved field updated in combination artifact flags, ]
 
         state0 = self._hero.state0.get("artifacts") or {}
         for prop in self.props():
             name = self._state[prop["name"]]
-            v, pos = IDS.get(name), MYPOS[prop["name"]]
+            v = IDS.get(name)
             if name in SCROLL_ARTIFACTS:
-                b = util.itoby(v, 8)
+                values[prop["name"]] = (v & 0xFFFFFFFF, v >> 32)
             elif v:
-                b = util.itoby(v, 4) + metadata.Blank * 4
+                values[prop["name"]] = (v, BLANK)
             elif not state0.get(prop["name"]):
                 # Retain original bytes unchanged, as game uses both 0x00 and 0xFF
-                b = bytes0[pos:pos + 8]
+                values[prop["name"]] = fields0[prop["name"]]
             else:
-                b = metadata.Blank * 8
-            result[pos:pos + len(b)] = b
-            for slot in SLOTS.get(name, [])[1:] if HAS_COMBOS else ():
-                result[MYPOS["reserved"][slot]] += 1
-                reserved_sets.add(MYPOS["reserved"][slot])
-
-        for pos in range(pos_reserved, pos_reserved + len_reserved) if HAS_COMBOS else ():
-            if pos not in reserved_sets and bytes0[pos] > 5:
+                values[prop["name"]] = (BLANK, BLANK)
+            for slot in SLOTS.get(name, [])[1:] if RESERVED else ():
+                values["reserved_%s" % slot] += 1
+                reserved_sets.add("reserved_%s" % slot)
+
+        for key in RESERVED:
+            if key not in reserved_sets and fields0[key] > 5:
                 # Retain original bytes unchanged, Horn of the Abyss uses them for unknown purpose.
-                result[pos] = bytes0[pos]
+                values[key] = fields0[key]
 
-        return result
+        return CODEC.pack(result, values)
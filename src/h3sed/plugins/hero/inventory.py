@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  23.05.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import functools
@@ -21,7 +21,7 @@ from h3sed import guibase
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 from h3sed.plugins.hero.artifacts import UIPROPS as ARTIFACT_PROPS
 
 
@@ -198,18 +198,18 @@ class InventoryPlugin(object):
         IDS   = metadata.Store.get("ids", self._savefile.version)
         NAMES = {x[y]: y for x in [IDS] for y in
                  metadata.Store.get("artifacts", self._savefile.version, category="inventory")}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, plugins.adapt(self, "pos", POS), self._savefile.version)
+        BLANK = util.bytoi(metadata.Blank * 4)
 
-        def parse_item(hero, pos):
-            b, v = hero.bytes[pos:pos + 4], util.bytoi(hero.bytes[pos:pos + 4])
-            if all(x == metadata.Blank for x in b): return None # Blank
-            return util.bytoi(hero.bytes[pos:pos + 8]) if v == IDS["Spell Scroll"] else v
+        def parse_item(v, extra):
+            if v == BLANK: return None
+            return v | extra << 32 if v == IDS["Spell Scroll"] else v
 
-        for hero in heroes:
+        for items in COLUMNS["inventory"]:
             values = []
             for prop in self.props():
                 for i in range(prop["max"]):
-                    v = parse_item(hero, MYPOS["inventory"] + i*8)
+                    v = parse_item(*items[i * 2:i * 2 + 2])
                     values.append(NAMES.get(v))
             result.append(values)
         return result
@@ -217,27 +217,28 @@ class InventoryPlugin(object):
 
     def serialize(self):
         """Returns new hero bytearray, with edited inventory section."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
         bytes0 = self._hero.get_bytes(original=True)
 
         IDS = metadata.Store.get("ids", self._savefile.version)
         SCROLL_ARTIFACTS = metadata.Store.get("artifacts", self._savefile.version, category="scroll")
-        MYPOS = plugins.adapt(self, "pos", POS)
-        pos = MYPOS["inventory"]
+        CODEC = make_codec(plugins.adapt(self, "pos", POS), self._savefile.version)
+        BLANK = util.bytoi(metadata.Blank * 4)
+        items0, items = CODEC.unpack(bytes0)["inventory"], list(CODEC.unpack(result)["inventory"])
 
         state0 = self._hero.state0.get("inventory") or []
         for prop in self.props():
             for i, name in enumerate(self._state) if "itemlist" == prop["type"] else ():
                 v = IDS.get(name)
                 if name in SCROLL_ARTIFACTS:
-                    b = util.itoby(v, 8)
+                    pair = (v & 0xFFFFFFFF, v >> 32)
                 elif v:
-                    b = util.itoby(v, 4) + metadata.Blank * 4
+                    pair = (v, BLANK)
                 elif i < len(state0) and not state0[i]:
                     # Retain original bytes unchanged, as game uses both 0x00 and 0xFF
-                    b = bytes0[pos + i * 8:pos + (i + 1) * 8]
+                    pair = items0[i * 2:i * 2 + 2]
                 else:
-                    b = metadata.Blank * 4 + metadata.Null * 4
-                result[pos + i * len(b):pos + (i + 1) * len(b)] = b
+                    pair = (BLANK, 0)
+                items[i * 2:i * 2 + 2] = pair
 
-        return result
+        return CODEC.pack(result, {"inventory": items})
@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   14.03.2020
-@modified  27.01.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import logging
@@ -18,7 +18,7 @@ from h3sed.lib import controls
 from h3sed import gui
 from h3sed import metadata
 from h3sed import plugins
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 
 
 logger = logging.getLogger(__package__)
@@ -155,14 +155,14 @@ class SkillsPlugin(object):
                for y in metadata.Store.get("skills", version)}
         LEVELNAMES = {x[y]: y for x in [metadata.Store.get("ids", version)]
                       for y in metadata.Store.get("skill_levels", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, plugins.adapt(self, "pos", POS), version)
 
-        for hero in heroes:
+        for count, levels, slots in zip(*(COLUMNS[k] for k in
+                                          ("skills_count", "skills_level", "skills_slot"))):
             values = []
-            count = hero.bytes[MYPOS["skills_count"]]
             for name in metadata.Store.get("skills", version):
                 pos = IDS.get(name)
-                level, slot = (hero.bytes[MYPOS[k] + pos] for k in ("skills_level", "skills_slot"))
+                level, slot = levels[pos], slots[pos]
                 if not level or not slot or slot > count:
                     continue # for i
                 values.append({"name": name, "level": LEVELNAMES[level], "slot": slot})
@@ -172,13 +172,13 @@ class SkillsPlugin(object):
 
     def serialize(self):
         """Returns new hero bytearray, with edited skills sections."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
         version = self._savefile.version
         IDS    = {y: x[y] for x in [metadata.Store.get("ids", version)]
                   for y in metadata.Store.get("skills", version)}
         LEVELS = {y: x[y] for x in [metadata.Store.get("ids", version)]
                   for y in metadata.Store.get("skill_levels", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        CODEC = make_codec(plugins.adapt(self, "pos", POS), version)
 
         levels, count = bytearray(len(IDS)), 0
         slots         = bytearray(len(IDS))
@@ -191,8 +191,5 @@ class SkillsPlugin(object):
             count += 1
             levels[pos] = LEVELS[level]
             slots[pos] = slot
-        result[MYPOS["skills_level"]:MYPOS["skills_level"] + len(IDS)] = levels
-        result[MYPOS["skills_slot"] :MYPOS["skills_slot"]  + len(IDS)] = slots
-        result[MYPOS["skills_count"]] = count
-
-        return result
+        return CODEC.pack(result, {"skills_level": levels, "skills_slot": slots,
+                                   "skills_count": count})
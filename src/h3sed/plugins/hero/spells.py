@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   20.03.2020
-@modified  27.01.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import logging
@@ -16,7 +16,7 @@ from h3sed import gui
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 
 
 logger = logging.getLogger(__package__)
@@ -117,24 +117,26 @@ class SpellsPlugin(object):
         result = [] # Lists of values like ["Haste", ..]
         IDS = {y: x[y] for x in [metadata.Store.get("ids", self._savefile.version)]
                for y in metadata.Store.get("spells", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, plugins.adapt(self, "pos", POS), self._savefile.version)
 
-        for hero in heroes:
+        for book in COLUMNS["spells_book"]:
             values = []
             for name, pos in IDS.items():
-                if hero.bytes[MYPOS["spells_book"] + pos]: values.append(name)
+                if book[pos]: values.append(name)
             result.append(sorted(values))
         return result
 
 
     def serialize(self):
         """Returns new hero bytearray, with edited spells sections."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
         version = self._savefile.version
 
         IDS = {y: x[y] for x in [metadata.Store.get("ids", version)]
                for y in metadata.Store.get("spells", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        CODEC = make_codec(plugins.adapt(self, "pos", POS), version)
+        fields = CODEC.unpack(result)
+        book, availables = list(fields["spells_book"]), list(fields["spells_available"])
         state = self._state
 
         artispells, condspells = set(), set()
@@ -153,10 +155,9 @@ class SpellsPlugin(object):
             # Some maps may have certain spells banned, e.g. Summon Boat on maps with no water
             # in Horn of the Abyss; savefiles will not have these spell bits set.
             # At least try to avoid a needless file change if we can detect the ban being in effect.
-            if available and not in_book and not result[MYPOS["spells_available"] + pos] \
+            if available and not in_book and not availables[pos] \
             and name in condspells: available = False
 
-            result[MYPOS["spells_book"] + pos]      = in_book
-            result[MYPOS["spells_available"] + pos] = available
+            book[pos], availables[pos] = int(in_book), int(available)
 
-        return result
+        return CODEC.pack(result, {"spells_book": book, "spells_available": availables})
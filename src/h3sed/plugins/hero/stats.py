@@ -9,7 +9,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  17.06.2024
+@modified  18.10.2026
 ------------------------------------------------------------------------------
 """
 import functools
@@ -24,7 +24,7 @@ from h3sed import guibase
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import POS, make_codec, make_columns
 from h3sed.plugins.hero.artifacts import UIPROPS as ARTIFACT_PROPS
 
 
@@ -300,22 +300,21 @@ class StatsPlugin(object):
         result = []
         NAMES = {x[y]: y for x in [metadata.Store.get("ids", self._savefile.version)]
                  for y in metadata.Store.get("special_artifacts", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        COLUMNS = make_columns(heroes, plugins.adapt(self, "pos", POS), self._savefile.version)
+        BLANK = util.bytoi(metadata.Blank * 4)
 
-        def parse_special(hero, pos):
-            b, v = hero.bytes[pos:pos + 4], util.bytoi(hero.bytes[pos:pos + 4])
-            return None if all(x == ord(metadata.Blank) for x in b) else v
+        def parse_special(v, extra):
+            return None if v == BLANK else v
 
-        for hero in heroes:
+        for i, _ in enumerate(heroes):
             values = {}
             for prop in self.props():
-                pos = MYPOS[prop["name"]]
                 if "check" == prop["type"]:
-                    v = parse_special(hero, pos) is not None
+                    v = parse_special(*COLUMNS[prop["name"]][i]) is not None
                 elif "number" == prop["type"]:
-                    v = util.bytoi(hero.bytes[pos:pos + prop["len"]])
+                    v = COLUMNS[prop["name"]][i]
                 elif "combo" == prop["type"]:
-                    v = NAMES.get(parse_special(hero, pos), "")
+                    v = NAMES.get(parse_special(*COLUMNS[prop["name"]][i]), "")
                 values[prop["name"]] = v
             result.append(values)
         return result
@@ -323,26 +322,25 @@ class StatsPlugin(object):
 
     def serialize(self):
         """Returns new hero bytearray, with edited stats sections."""
-        result = self._hero.bytes[:]
+        result = self._hero.get_bytes()
 
         IDS = metadata.Store.get("ids", self._savefile.version)
-        MYPOS = plugins.adapt(self, "pos", POS)
+        CODEC = make_codec(plugins.adapt(self, "pos", POS), self._savefile.version)
+        BLANK = util.bytoi(metadata.Blank * 4)
+        fields, values = CODEC.unpack(result), {}
 
         for prop in self.props():
-            v, pos = self._state[prop["name"]], MYPOS[prop["name"]]
+            v, name = self._state[prop["name"]], prop["name"]
             if "check" == prop["type"]:
-                b = (util.itoby(prop["value"], 4) if v else metadata.Blank * 4)
-                b = b[:4] + result[pos + 4:pos + 8]
-            elif "number" == prop["type"]: b = util.itoby(v, prop["len"])
+                values[name] = (prop["value"] if v else BLANK, fields[name][1])
+            elif "number" == prop["type"]: values[name] = v
             elif "combo" == prop["type"]:
                 if v:
                     v = IDS.get(v)
                     if v is None:
-                        logger.warning("Unknown stats %s value: %s.", prop["name"],
-                                       self._state[prop["name"]])
+                        logger.warning("Unknown stats %s value: %s.", name, self._state[name])
                         continue # for prop
-                    b = util.itoby(v, 4)[:4] + result[pos + 4:pos + 8]
-                else: b = metadata.Blank * 4
-            result[pos:pos + len(b)] = b
+                    values[name] = (v, fields[name][1])
+                else: values[name] = (BLANK, fields[name][1])
 
-        return result
+        return CODEC.pack(result, values)
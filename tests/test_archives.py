@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for reading files inside zip and tar archives.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from h3sed.lib import archives
+from h3sed.lib import filecache
+
+
+"""Archive test members, as {name: contents}."""
+MEMBERS = {"a.GM1": b"first" * 1000, "dir/b.GM2": b"second", "dir/empty.GM1": b""}
+
+
+@pytest.fixture(autouse=True)
+def listings(monkeypatch):
+    """Clears session listings for each test."""
+    monkeypatch.setattr(archives, "LISTINGS", {})
+
+
+def make_archive(path):
+    """Writes archive with test members, format by filename extension, returns path."""
+    path = str(path)
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("dir/", b"")
+            for name, data in MEMBERS.items(): zf.writestr(name, data)
+        return path
+    with tarfile.open(path, "w:gz" if path.endswith(".gz") else "w") as tf:
+        info = tarfile.TarInfo("dir")
+        info.type = tarfile.DIRTYPE
+        tf.addfile(info)
+        for name, data in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size, info.mtime = len(data), 1E9
+            tf.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_paths(tmp_path):
+    path = make_archive(tmp_path / "saves.zip")
+    member = archives.join_path(path, "dir/b.GM2")
+    assert archives.split_path(member) == (path, "dir/b.GM2")
+    assert archives.split_path(path + "!\\dir\\b.GM2") == (path, "dir/b.GM2")
+    assert archives.split_path(path) == (path, None)
+    missing = str(tmp_path / "missing.zip!/a.GM1")
+    assert archives.split_path(missing) == (missing, None)
+    assert archives.is_archive("x.TAR.GZ") and not archives.is_archive("x.GM1")
+    assert archives.exists(member) and archives.exists(path)
+    assert not archives.exists(archives.join_path(path, "c.GM1"))
+
+
+@pytest.mark.parametrize("filename", ["saves.zip", "saves.tar", "saves.tar.gz"])
+def test_members(tmp_path, filename):
+    archive = archives.Archive(make_archive(tmp_path / filename))
+    assert list(archive.members) == list(MEMBERS)
+    plain = filename.endswith(".tar")
+    for name, data in MEMBERS.items():
+        assert (archive.members[name]["offset"] is not None) == plain
+        with archive.open(name) as f:
+            assert f.read(3) == data[:3]
+            assert f.read() == data[3:]
+            assert f.read() == b""
+    with pytest.raises(KeyError): archive.open("missing")
+
+
+def test_cached_listing(tmp_path):
+    cache = filecache.FileCache(str(tmp_path / "cache"), 2**20)
+    path = make_archive(tmp_path / "saves.tar")
+    members = archives.Archive(path, cache).members
+    archives.LISTINGS.clear()
+    calls = []
+    archive = archives.Archive(path, cache)
+    archive._read_listing = lambda: calls.append(1)
+    assert archive.members == members and not calls
+    with archive.open("dir/b.GM2") as f: assert f.read() == MEMBERS["dir/b.GM2"]
+
+
+def test_changed_archive(tmp_path):
+    path = make_archive(tmp_path / "saves.zip")
+    assert len(archives.Archive(path).members) == len(MEMBERS)
+    with zipfile.ZipFile(path, "a") as zf: zf.writestr("c.GM1", b"third")
+    os.utime(path, (2E9, 2E9))
+    assert list(archives.Archive(path).members) == list(MEMBERS) + ["c.GM1"]
+
+
+def test_open_compressed_tar_member(tmp_path, monkeypatch):
+    archive = archives.Archive(make_archive(tmp_path / "saves.tar.gz"))
+    archive.members
+    def fail(*args): raise AssertionError("Whole archive listed")
+    monkeypatch.setattr(tarfile.TarFile, "getmembers", fail)
+    with archive.open("a.GM1") as f: assert f.read() == MEMBERS["a.GM1"]
+    with archive.open("dir/empty.GM1") as f: assert f.read() == b""
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for deduplicating backup store.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import datetime
+import os
+import random
+import time
+
+import pytest
+
+from h3sed.lib import backupstore
+
+
+def make_content(size, seed=1):
+    """Returns pseudo-random content of given size."""
+    rnd = random.Random(seed)
+    return bytes(bytearray(rnd.randrange(256) for _ in range(size)))
+
+
+def reference_marks(data):
+    """Returns positions where sequential gear hash hits chunk boundary mask."""
+    result, value = [], 0
+    for i, byte in enumerate(bytearray(data)):
+        value = ((value << 1) + backupstore.GEAR[byte]) & 0xFFFFFFFF
+        if not value & backupstore.CHUNK_MASK: result.append(i)
+    return result
+
+
+def count_objects(store):
+    """Returns number of chunk files in store."""
+    root = os.path.join(store.directory, "objects")
+    return sum(len(files) for _, _, files in os.walk(root))
+
+
+def test_chunk_spans():
+    pytest.importorskip("numpy")
+    data = make_content(300000)
+    spans = backupstore.chunk_spans(data)
+    assert spans[0][0] == 0 and spans[-1][1] == len(data)
+    assert all(a[1] == b[0] for a, b in zip(spans, spans[1:]))
+    assert all(backupstore.CHUNK_MIN < e - s <= backupstore.CHUNK_MAX for s, e in spans[:-1])
+    marks = set(reference_marks(data))
+    assert all(e - s == backupstore.CHUNK_MAX or e - 1 in marks for s, e in spans[:-1])
+    assert backupstore.chunk_spans(data) == spans
+
+
+def test_chunk_spans_shift():
+    pytest.importorskip("numpy")
+    data = make_content(300000)
+    changed = data[:150000] + b"inserted" + data[150000:]
+    chunks1 = set(data[s:e] for s, e in backupstore.chunk_spans(data))
+    chunks2 = [changed[s:e] for s, e in backupstore.chunk_spans(changed)]
+    assert sum(x not in chunks1 for x in chunks2) <= 2
+
+
+@pytest.mark.parametrize("size", [0, 1, 10, backupstore.CHUNK_MAX * 3])
+def test_chunk_spans_edges(size, monkeypatch):
+    for numpy in ([None] if backupstore.numpy is None else [backupstore.numpy, None]):
+        monkeypatch.setattr(backupstore, "numpy", numpy)
+        spans = backupstore.chunk_spans(b"\x00" * size)
+        assert sum(e - s for s, e in spans) == size
+        assert all(0 < e - s <= backupstore.CHUNK_MAX for s, e in spans)
+
+
+def test_add_read(tmp_path):
+    store = backupstore.BackupStore(str(tmp_path))
+    data1 = make_content(100000)
+    data2 = data1[:50000] + b"changed" + data1[50007:]
+    manifest1 = store.add("file", data1, mtime=123)
+    objects = count_objects(store)
+    assert store.add("file", data1)["id"] == manifest1["id"]  # Unchanged, not added
+    manifest2 = store.add("file", data2)
+    assert count_objects(store) < objects * 2
+    assert [x["id"] for x in store.list("file")] == [manifest2["id"], manifest1["id"]]
+    assert store.read(manifest1) == data1 and store.read(manifest2) == data2
+    assert manifest1["mtime"] == 123 and manifest1["size"] == len(data1)
+    assert store.list("other") == []
+    store.add("other", b"")
+    assert len(store.list()) == 3 and store.read(store.list("other")[0]) == b""
+
+
+def test_read_corrupt(tmp_path):
+    store = backupstore.BackupStore(str(tmp_path))
+    manifest = store.add("file", make_content(50000))
+    os.remove(store._object_path(manifest["chunks"][0][0]))
+    with pytest.raises(Exception): store.read(manifest)
+    manifest = dict(manifest, chunks=manifest["chunks"][1:])
+    with pytest.raises(ValueError): store.read(manifest)
+
+
+def test_remove_collects_chunks(tmp_path):
+    store = backupstore.BackupStore(str(tmp_path))
+    data = make_content(100000)
+    manifest1 = store.add("file", data)
+    manifest2 = store.add("file", data + b"more")
+    store.remove([manifest1])
+    assert [x["id"] for x in store.list()] == [manifest2["id"]]
+    assert count_objects(store) == len(set(k for k, _ in manifest2["chunks"]))
+    assert store.read(manifest2) == data + b"more"
+    store.remove([manifest2])
+    assert store.list() == [] and count_objects(store) == 0
+
+
+def test_prune(tmp_path, monkeypatch):
+    store = backupstore.BackupStore(str(tmp_path), count=2, days=3)
+    noon = datetime.datetime.combine(datetime.date.today(), datetime.time(12))
+    day = 24 * 3600
+    now = time.mktime(noon.timetuple())
+    times = [now - 5 * day, now - 2 * day, now - 2 * day + 60, now - day, now, now + 60]
+    for i, created in enumerate(times):
+        monkeypatch.setattr(time, "time", lambda created=created: created)
+        store.add("file", ("content %s" % i).encode())
+    kept = sorted(x["created"] for x in store.list("file"))
+    assert kept == [now - 2 * day + 60, now - day, now, now + 60]
+    assert count_objects(store) == len(kept)
+
+
+def test_prune_unlimited(tmp_path):
+    store = backupstore.BackupStore(str(tmp_path))
+    for i in range(5): store.add("file", ("content %s" % i).encode())
+    assert store.prune("file") == [] and len(store.list("file")) == 5
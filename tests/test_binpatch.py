@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for binary patches of byte span changes.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import pytest
+
+from h3sed.lib.binpatch import Patch, Record
+
+
+"""Original contents in parts: header, two named spans, and trailer."""
+PARTS = [b"header....", b"hero:Orrin.........", b"hero:Valeska......", b"trailer"]
+OLD = b"".join(PARTS)
+ANCHORS = [("Orrin", (10, 29)), ("Valeska", (29, 47))]
+
+"""Changed contents in parts."""
+NEW_PARTS = [b"HEAder....", b"hero:Orrin.XYZ.....", b"hero:Valeska.abc..", b"trailer"]
+
+
+def apply(buffer, patch, locate=None):
+    """Returns buffer with patch applied."""
+    result = bytearray(buffer)
+    for offset, record in patch.resolve(result, locate):
+        result[offset:offset + len(record.old)] = record.new
+    return bytes(result)
+
+
+def make_patch():
+    """Returns patch of changes in both anchored spans and in unanchored header."""
+    new = b"".join(NEW_PARTS)
+    return Patch.from_spans(OLD, new, [(0, 3), (21, 24), (42, 45)], ANCHORS, "SoD"), new
+
+
+def test_from_spans():
+    patch, _ = make_patch()
+    assert patch.version == "SoD"
+    assert patch.records == [Record(0, b"hea", b"HEA", "", 0),
+                             Record(21, b"...", b"XYZ", "Orrin", 11),
+                             Record(42, b"...", b"abc", "Valeska", 13)]
+
+
+def test_dumps_loads():
+    patch, new = make_patch()
+    patch.records.append(Record(5, b"..", b"", "", 0))  # Resizing record
+    patch2 = Patch.loads(patch.dumps())
+    assert (patch2.version, patch2.records) == (patch.version, patch.records)
+    assert Patch.loads(Patch().dumps()).records == []
+
+
+def test_apply_in_place():
+    patch, new = make_patch()
+    locate = lambda: ANCHORS
+    assert apply(OLD, patch, locate) == new
+    positions = [offset for offset, _ in patch.resolve(OLD, locate)]
+    assert positions == sorted(positions, reverse=True)
+
+
+def test_apply_relocated():
+    patch, _ = make_patch()
+    buffer = b"".join([PARTS[0], PARTS[2], b"++", PARTS[1], PARTS[3]])
+    located = []
+    def locate():
+        located.append(1)
+        return [("Valeska", (10, 28)), ("Orrin", (30, 49))]
+    expected = b"".join([NEW_PARTS[0], NEW_PARTS[2], b"++", NEW_PARTS[1], NEW_PARTS[3]])
+    assert apply(buffer, patch, locate) == expected
+    assert located == [1]  # Anchors located once for all records
+
+
+def test_unanchored_without_locate():
+    patch = Patch(records=[Record(3, b"der", b"DER", "", 0)])
+    assert apply(OLD, patch) == b"heaDER" + OLD[6:]
+
+
+def test_mismatch_errors():
+    patch, _ = make_patch()
+    buffer = b"".join(NEW_PARTS[:2] + PARTS[2:])
+    with pytest.raises(ValueError) as e: patch.resolve(buffer, lambda: ANCHORS)
+    assert "2 of 3" in str(e.value) and "0, 21 (Orrin)" in str(e.value)
+    with pytest.raises(ValueError) as e: patch.resolve(OLD, lambda: ANCHORS[:1])
+    assert "1 of 3: 42 (Valeska)" in str(e.value)
+    with pytest.raises(ValueError) as e: patch.resolve(OLD)  # Anchors not locatable
+    assert "2 of 3" in str(e.value)
+
+
+def test_anchored_not_placed_at_absolute_offset():
+    patch, _ = make_patch()
+    # Anchor located elsewhere, absolute offset still holding original bytes
+    with pytest.raises(ValueError): patch.resolve(OLD, lambda: [("Orrin", (0, 19)),
+                                                               ("Valeska", (29, 47))])
+
+
+@pytest.mark.parametrize("data", [b"", b"garbage", Patch.MAGIC, Patch.MAGIC + b"\x03\x00ab"])
+def test_loads_invalid(data):
+    with pytest.raises(ValueError): Patch.loads(data)
+
+
+def test_loads_truncated():
+    patch, _ = make_patch()
+    data = patch.dumps()
+    for size in range(len(Patch.MAGIC), len(data)):
+        with pytest.raises(ValueError): Patch.loads(data[:size])
+
+
+def test_duplicate_anchors():
+    patch, new = make_patch()
+    buffer = OLD + PARTS[1]  # Second hero with same name, at end
+    with pytest.raises(ValueError) as e:
+        patch.resolve(buffer, lambda: ANCHORS + [("Orrin", (len(OLD), len(buffer)))])
+    assert "1 of 3: 21 (Orrin, occurs more than once)" in str(e.value)
+    anchors = ANCHORS + [("Orrin", (len(OLD), len(buffer)))]
+    with pytest.raises(ValueError): Patch.from_spans(buffer, new + PARTS[1], [(21, 24)], anchors)
+    patch = Patch.from_spans(buffer, new + PARTS[1], [(0, 3), (42, 45)], anchors)
+    assert [x.anchor for x in patch.records] == ["", "Valeska"]
+
+
+def test_overlapping_records():
+    patch = Patch(records=[Record(0, b"hea", b"HEA", "", 0), Record(2, b"ad", b"AD", "", 0)])
+    with pytest.raises(ValueError) as e: patch.resolve(OLD)
+    assert "overlap" in str(e.value)
+    patch = Patch(records=[Record(21, b"...", b"XYZ", "Orrin", 11),
+                           Record(42, b"...", b"abc", "Valeska", 13)])
+    # Anchors located so that relocated records overlap
+    with pytest.raises(ValueError) as e:
+        patch.resolve(OLD, lambda: [("Orrin", (10, 29)), ("Valeska", (9, 27))])
+    assert "Changes at 21 and 42 overlap, at 21 and 22." in str(e.value)
+    patch = Patch(records=[Record(0, b"hea", b"HEA", "", 0), Record(3, b"der", b"DER", "", 0)])
+    assert apply(OLD, patch) == b"HEADER" + OLD[6:]  # Adjacent records
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for streaming gzip functionality.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import gzip
+import io
+import random
+import time
+import zlib
+
+import pytest
+
+from h3sed.lib import gzstream
+
+
+def make_content(size, seed=1):
+    """Returns semi-compressible pseudo-random content of given size."""
+    rnd = random.Random(seed)
+    words = [bytes(bytearray(rnd.randrange(256) for _ in range(rnd.randrange(1, 12))))
+             for _ in range(200)]
+    result = bytearray()
+    while len(result) < size: result += rnd.choice(words)
+    return bytes(result[:size])
+
+
+def inflate(data, **kwargs):
+    """Returns (Inflater, uncompressed content) from decompressing gzipped bytes."""
+    inflater = gzstream.Inflater(io.BytesIO(data), **kwargs)
+    return inflater, b"".join(inflater)
+
+
+def test_inflate_roundtrip():
+    content = make_content(300000)
+    inflater, result = inflate(gzip.compress(content), chunksize=1000, outsize=4096)
+    assert result == content
+    assert (inflater.members, inflater.truncated, inflater.size) == (1, False, len(content))
+    assert inflater.crc == zlib.crc32(content) & 0xFFFFFFFF
+    assert inflater.trailer == (inflater.crc, len(content))
+
+
+def test_inflate_file_in_background(tmp_path):
+    content = make_content(100000)
+    filename = str(tmp_path / "file.gz")
+    with open(filename, "wb") as f: f.write(gzip.compress(content))
+    inflater = gzstream.Inflater(filename, chunksize=512, outsize=1024)
+    assert b"".join(inflater.iterate(background=True)) == content
+    assert inflater.members == 1
+
+
+def test_inflate_multiple_members():
+    parts = [make_content(5000, seed=i) for i in range(3)]
+    data = b"".join(gzip.compress(x) for x in parts[:2]) + b"\x00" * 100 + gzip.compress(parts[2])
+    inflater, result = inflate(data, chunksize=64)
+    assert result == b"".join(parts)
+    assert (inflater.members, inflater.truncated) == (3, False)
+
+
+def test_inflate_trailing_garbage():
+    content = make_content(5000)
+    inflater, result = inflate(gzip.compress(content) + b"not gzip content at all")
+    assert result == content
+    assert (inflater.members, inflater.truncated) == (1, False)
+
+
+@pytest.mark.parametrize("cut", [20, 1000, -4])
+def test_inflate_truncated(cut):
+    content = make_content(50000)
+    data = gzip.compress(content)
+    inflater, result = inflate(data[:cut], chunksize=100)
+    assert content.startswith(result)
+    assert inflater.truncated and not inflater.members
+
+
+def test_inflate_not_gzip():
+    with pytest.raises(ValueError): inflate(b"plain content, not compressed")
+    with pytest.raises(ValueError): inflate(b"")
+
+
+def test_header_length():
+    data = gzip.compress(b"content")
+    assert gzstream.header_length(data) == 10
+    assert gzstream.header_length(data[:9]) is None
+    named = gzstream.MAGIC + b"\x08" + bytes(bytearray([gzstream.FNAME])) + b"\x00" * 6 + b"name\x00"
+    assert gzstream.header_length(named) == len(named)
+    assert gzstream.header_length(named[:-1]) is None
+    with pytest.raises(ValueError): gzstream.header_length(b"x" * 20)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_compress_roundtrip(workers):
+    content = make_content(500000)
+    f = io.BytesIO()
+    blocks = gzstream.compress(content, f, level=6, workers=workers, blocksize=50000)
+    assert gzip.decompress(f.getvalue()) == content
+    assert [(b.start, b.end) for b in blocks] == [(i, min(i + 50000, len(content)))
+                                                  for i in range(0, len(content), 50000)]
+    assert all(b.crc == zlib.crc32(content[b.start:b.end]) & 0xFFFFFFFF for b in blocks)
+    inflater, result = inflate(f.getvalue())
+    assert result == content and inflater.members == 1 and not inflater.truncated
+
+
+@pytest.mark.parametrize("size", [0, 1, 1000])
+def test_compress_small(size):
+    content = make_content(size)
+    f = io.BytesIO()
+    blocks = gzstream.compress(content, f, blocksize=256)
+    assert gzip.decompress(f.getvalue()) == content
+    assert len(blocks) == (size + 255) // 256
+
+
+def test_compress_levels_equivalent():
+    content = make_content(100000)
+    results = []
+    for level in (1, 9):
+        f = io.BytesIO()
+        gzstream.compress(content, f, level=level, blocksize=30000)
+        assert gzip.decompress(f.getvalue()) == content
+        results.append(len(f.getvalue()))
+    assert results[0] >= results[1]
+
+
+@pytest.mark.parametrize("len1,len2", [(0, 0), (0, 10), (10, 0), (1, 1), (1000, 77777)])
+def test_crc32_combine(len1, len2):
+    content = make_content(len1 + len2)
+    crc1 = zlib.crc32(content[:len1]) & 0xFFFFFFFF
+    crc2 = zlib.crc32(content[len1:]) & 0xFFFFFFFF
+    expected = zlib.crc32(content) & 0xFFFFFFFF
+    assert gzstream.crc32_combine(crc1, crc2, len2) == expected
+
+
+def test_compress_reuse_blocks():
+    blocksize = gzstream.WINDOW_SIZE
+    content = bytearray(make_content(blocksize * 8))
+    blocks = gzstream.compress(content, io.BytesIO(), blocksize=blocksize)
+    content[blocksize * 3 + 5:blocksize * 3 + 9] = b"XXXX"
+    f = io.BytesIO()
+    changed = [(blocksize * 3 + 5, blocksize * 3 + 9)]
+    blocks2 = gzstream.compress(content, f, blocksize=blocksize, blocks=blocks, changed=changed)
+    assert gzip.decompress(f.getvalue()) == content
+    # Changed block and the next one, with changed content in its dictionary, get recompressed
+    reused = [i for i, (a, b) in enumerate(zip(blocks, blocks2)) if a is b]
+    assert reused == [0, 1, 2, 5, 6, 7]
+
+
+def test_compress_reuse_none_if_unknown():
+    content = make_content(100000)
+    blocks = gzstream.compress(content, io.BytesIO(), blocksize=10000)
+    for kwargs in [dict(changed=None), dict(changed=[], level=1)]:
+        f = io.BytesIO()
+        blocks2 = gzstream.compress(content, f, blocksize=10000, blocks=blocks, **kwargs)
+        assert gzip.decompress(f.getvalue()) == content
+        assert not any(a is b for a, b in zip(blocks, blocks2))
+    f = io.BytesIO()
+    blocks2 = gzstream.compress(content[:-1], f, blocksize=10000, blocks=blocks, changed=[])
+    assert gzip.decompress(f.getvalue()) == content[:-1]
+    assert not any(a is b for a, b in zip(blocks, blocks2))
+
+
+def test_index_roundtrip():
+    points = [(100, 20, b""), (0, 10, b""), (5000, 900, make_content(gzstream.WINDOW_SIZE))]
+    index = gzstream.Index(points)
+    assert index.points == sorted(points)
+    index2 = gzstream.Index.loads(index.dumps())
+    assert index2.points == index.points
+    assert gzstream.Index.loads(gzstream.Index().dumps()).points == []
+
+
+def test_index_locate():
+    index = gzstream.Index([(0, 10, b""), (100, 20, b"a"), (200, 30, b"b")])
+    assert index.locate(0) == (0, 10, b"")
+    assert index.locate(99) == (0, 10, b"")
+    assert index.locate(100) == (100, 20, b"a")
+    assert index.locate(10**9) == (200, 30, b"b")
+    assert gzstream.Index([(50, 10, b"")]).locate(10) is None
+
+
+@pytest.mark.parametrize("data", [b"", b"garbage", gzstream.Index.MAGIC,
+                                  gzstream.Index.MAGIC + b"\x05\x00\x00\x00" + b"\x00" * 10])
+def test_index_loads_invalid(data):
+    with pytest.raises(ValueError): gzstream.Index.loads(data)
+
+
+def test_read_range_with_index(tmp_path):
+    content = make_content(400000)
+    filename = str(tmp_path / "file.gz")
+    with open(filename, "wb") as f: blocks = gzstream.compress(content, f, blocksize=30000)
+    index = gzstream.Index.loads(gzstream.Index.from_blocks(blocks, content).dumps())
+    assert len(index.points) == len(blocks)
+    for start, end in [(0, 10), (29990, 30010), (123456, 234567), (399990, 400000),
+                       (399990, 500000), (0, len(content))]:
+        assert gzstream.read_range(filename, start, end, index) == content[start:end]
+        assert gzstream.read_range(filename, start, end) == content[start:end]
+    with open(filename, "rb") as f:
+        assert gzstream.read_range(f, 1000, 2000) == content[1000:2000]
+
+
+def test_read_trailer(tmp_path):
+    content = make_content(70000)
+    filename = str(tmp_path / "file.gz")
+    with open(filename, "wb") as f: f.write(gzip.compress(content))
+    assert gzstream.read_trailer(filename) == (zlib.crc32(content) & 0xFFFFFFFF, len(content))
+    with open(filename, "wb") as f: f.write(gzip.compress(content)[:17])
+    assert gzstream.read_trailer(filename) is None
+
+
+def test_inflate_background_aborted():
+    content = make_content(2000000)
+    inflater = gzstream.Inflater(io.BytesIO(gzip.compress(content)), outsize=1024)
+    def consume():
+        for chunk in inflater.iterate(background=True):
+            time.sleep(0.5)  # Lets worker fill queue
+            raise ValueError("Consumer failed")
+    with pytest.raises(ValueError): consume()  # Joins worker thread on exit
+    assert inflater.size < len(content)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for hero plugin: validating changed hero structs.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import gzip
+import random
+import struct
+
+import pytest
+
+pytest.importorskip("wx")
+
+from h3sed import conf
+from h3sed import metadata
+from h3sed import plugins
+
+
+"""Game versions as (major, minor) in savefile header, and hero struct sizes."""
+VERSIONS = {"sod": ((43, 4), 1025), "hota": ((44, 7), 1090)}
+
+
+def make_hero(name, rnd, version):
+    """Returns synthetic hero struct bytes, with random values in unchecked fields."""
+    b = bytearray(rnd.randrange(33, 250) for _ in range(VERSIONS[version][1]))
+    b[12:16] = bytes(bytearray([2, 0, 0, 0]))
+    b[18] = rnd.randrange(1, 30)
+    for i in range(7):  # Army types and counts
+        b[82 + i * 4:86 + i * 4] = struct.pack("<L", rnd.randrange(100) if i < 3 else 0xFFFFFFFF)
+        b[110 + i * 4:114 + i * 4] = struct.pack("<L", rnd.randrange(1, 100) if i < 3 else 0)
+    b[138:151] = name.encode("latin1").ljust(13, b"\x00")
+    b[151:207] = bytes(bytearray(56))
+    b[154], b[182], b[158], b[186] = 2, 1, 3, 2
+    b[207:211] = bytes(bytearray(rnd.randrange(20) for _ in range(4)))
+    b[211:351] = bytes(bytearray(rnd.randrange(2) for _ in range(140)))
+    b[351:503] = struct.pack("<L", rnd.randrange(7, 100)) + b"\xFF" * 148
+    b[503:1015] = b"\xFF" * 512
+    b[1015:1025] = bytes(bytearray(10))
+    if "hota" == version:
+        b[151:180] = bytes(bytearray(29))
+        b[154], b[158] = 2, 3
+        b[1061:1090] = bytes(bytearray(29))
+        b[1064], b[1068] = 1, 2
+    return b
+
+
+def make_savefile(path, version, count=5, seed=1):
+    """Writes synthetic savefile with heroes, returns filename."""
+    rnd = random.Random(seed)
+    (major, minor), _ = VERSIONS[version]
+    name, desc = b"Test Map", b"A synthetic test map."
+    raw = bytearray(b"H3SVG" + b"abc" + bytearray([major]) + b"xyz" + bytearray([minor]) + b"q" +
+                    b"\x00\x00\x00\x07" + struct.pack("<H", len(name)) + name +
+                    struct.pack("<H", len(desc)) + desc)
+    raw += bytes(bytearray(rnd.randrange(33, 256) for _ in range(plugins.hero.HeroScanner.START)))
+    for i in range(count):
+        raw += make_hero("Hero%03d" % i, rnd, version)
+        raw += bytes(bytearray(rnd.randrange(33, 256) for _ in range(rnd.randrange(50, 300))))
+    filename = str(path / ("%s.GM1" % version))
+    with open(filename, "wb") as f: f.write(gzip.compress(bytes(raw)))
+    return filename
+
+
+def load(path, version, monkeypatch):
+    """Returns (Savefile, [hero span, ]) for new synthetic savefile."""
+    monkeypatch.setattr(conf, "CacheEnabled", False)
+    plugins.init()
+    savefile = metadata.Savefile(make_savefile(path, version))
+    scanner = plugins.hero.HeroScanner(savefile)
+    scanner.feed(savefile.raw, final=True)
+    return savefile, [h.span for h in scanner.heroes()]
+
+
+@pytest.mark.parametrize("version", ["sod", "hota"])
+def test_valid_changes(tmp_path, monkeypatch, version):
+    savefile, spans = load(tmp_path, version, monkeypatch)
+    assert len(spans) == 5
+    start, end = spans[2]
+    savefile.patch(b"\x07", (start + 18, start + 19))  # Level
+    savefile.patch(b"\x05", (start + 1024, start + 1025))
+    savefile.patch(b"\x00", (start - 10, start - 9))  # Outside hero structs
+    savefile.patch(bytes(savefile.raw[start:end]), (start, end))
+    assert savefile.validate() == []
+    savefile.patch(b"\x01" * (end - start + 1), (start, end + 1))  # Too long to check
+    assert savefile.validate() == []
+
+
+def test_invalid_struct(tmp_path, monkeypatch):
+    savefile, spans = load(tmp_path, "sod", monkeypatch)
+    start, _ = spans[3]
+    savefile.patch(b"\x55", (start + 152, start + 153))
+    savefile.patch(b"\x55", (start + 153, start + 154))  # Same hero reported once
+    problems = savefile.validate()
+    assert problems == ["Hero Hero003 no longer matches hero data format, at byte %s." % start]
+    with pytest.raises(ValueError):
+        savefile.write(str(tmp_path / "out.GM1"), validate=True)
+    savefile.write(str(tmp_path / "out.GM1"))
+
+
+def test_reserved_counts(tmp_path, monkeypatch):
+    savefile, spans = load(tmp_path, "hota", monkeypatch)
+    start, _ = spans[1]
+    savefile.patch(b"\x07", (start + 1024, start + 1025))
+    problems = savefile.validate()
+    assert len(problems) == 1 and "invalid count 7" in problems[0]
+    assert "reserved side slot, at byte %s." % (start + 1024) in problems[0]
+
+
+def test_reserved_counts_unchanged(tmp_path, monkeypatch):
+    savefile, spans = load(tmp_path, "hota", monkeypatch)
+    start, _ = spans[1]
+    savefile.patch(b"\x07", (start + 1024, start + 1025))
+    savefile.write()
+    savefile.patch(b"\x09", (start + 18, start + 19))  # Out-of-range count left as original
+    assert savefile.validate() == []
+
+
+def test_read_leaves_scanning_to_plugin(tmp_path, monkeypatch):
+    savefile, spans = load(tmp_path, "sod", monkeypatch)
+    scanner = savefile.scanners["hero"]
+    assert not scanner.done and not scanner.spans()
+    assert "hero/heroes" not in savefile.sections
+    scanner.feed(savefile.raw, final=True)
+    assert scanner.spans() == spans
+    savefile.map_sections()
+    assert savefile.sections.get("hero/heroes") == (spans[0][0], spans[-1][1])
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for savefile reading and writing.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import gzip
+import os
+import stat
+import zipfile
+
+import pytest
+
+pytest.importorskip("wx")
+
+from h3sed import conf
+from h3sed import metadata
+from h3sed.lib import archives
+from h3sed.lib import util
+
+
+"""Uncompressed content of test savefile: SoD header with map name, and filler."""
+CONTENT = b"H3SVGabc+xyz\x04q\x00\x00\x00\x07\x04\x00Test\x00\x00" + \
+          bytes(bytearray(range(256))) * 100
+
+
+@pytest.fixture
+def savefile(tmp_path, monkeypatch):
+    """Returns Savefile read from a new gzipped file in temporary directory."""
+    monkeypatch.setattr(conf, "CacheEnabled", False)
+    monkeypatch.setattr(conf, "BackupDirectory", str(tmp_path / "backups"))
+    filename = str(tmp_path / "test.GM1")
+    with open(filename, "wb") as f: f.write(gzip.compress(CONTENT))
+    return metadata.Savefile(filename)
+
+
+def read_gzip(filename):
+    """Returns uncompressed content of gzipped file."""
+    with open(filename, "rb") as f: return gzip.decompress(f.read())
+
+
+def test_write_all(savefile):
+    savefile.patch(b"abc", (300, 303))
+    savefile.write()
+    expected = CONTENT[:300] + b"abc" + CONTENT[303:]
+    assert read_gzip(savefile.filename) == expected
+    assert not savefile.is_changed()
+    assert os.listdir(os.path.dirname(savefile.filename)) == ["test.GM1"]
+
+
+def test_write_spans(savefile):
+    savefile.patch(b"abc", (300, 303))
+    savefile.patch(b"xyz", (1000, 1003))
+    savefile.write(spans=[(1000, 1003)])
+    assert read_gzip(savefile.filename) == CONTENT[:1000] + b"xyz" + CONTENT[1003:]
+    assert savefile.dirty_spans() == [(300, 303)]
+
+
+def test_write_keeps_permissions(savefile):
+    os.chmod(savefile.filename, 0o640)
+    savefile.patch(b"abc", (300, 303))
+    savefile.write()
+    assert stat.S_IMODE(os.stat(savefile.filename).st_mode) == 0o640
+
+
+def test_write_failure_keeps_target(savefile, monkeypatch):
+    def fail(src, dst): raise IOError("Disk full")
+    monkeypatch.setattr(util, "replace_file", fail)
+    savefile.patch(b"abc", (300, 303))
+    with pytest.raises(IOError): savefile.write()
+    assert read_gzip(savefile.filename) == CONTENT
+    assert os.listdir(os.path.dirname(savefile.filename)) == ["test.GM1"]
+
+
+def test_read_range(savefile):
+    savefile.patch(b"abc", (300, 303))
+    assert savefile.read_range(290, 310) == CONTENT[290:310]
+    assert savefile.read_range(len(CONTENT) - 5, len(CONTENT) + 5) == CONTENT[-5:]
+
+
+def test_disk_changed(savefile):
+    assert not savefile.disk_changed()
+    os.utime(savefile.filename, (1E9, 1E9))  # Touched only
+    assert not savefile.disk_changed()
+    with open(savefile.filename, "r+b") as f:  # Same size, different trailer CRC
+        f.seek(-8, 2)
+        f.write(b"\x00\x00\x00\x00")
+    os.utime(savefile.filename, (2E9, 2E9))
+    assert savefile.disk_changed()
+    with open(savefile.filename, "wb") as f: f.write(gzip.compress(CONTENT + b"more"))
+    assert savefile.disk_changed()
+    os.remove(savefile.filename)
+    assert not savefile.disk_changed()
+
+
+def test_revert(savefile):
+    savefile.patch(b"abc", (300, 303))
+    savefile.patch(b"resized", (1000, 1003))
+    assert savefile.is_changed()
+    savefile.revert()
+    assert bytes(savefile.raw) == CONTENT and not savefile.is_changed()
+
+
+def test_read_archive_member(tmp_path, monkeypatch):
+    monkeypatch.setattr(conf, "CacheEnabled", False)
+    path = str(tmp_path / "saves.zip")
+    with zipfile.ZipFile(path, "w") as zf: zf.writestr("dir/test.GM1", gzip.compress(CONTENT))
+    savefile = metadata.Savefile(archives.join_path(path, "dir/test.GM1"))
+    assert bytes(savefile.raw) == CONTENT
+    assert savefile.read_range(10, 20) == CONTENT[10:20]
+    with pytest.raises(ValueError): savefile.write()
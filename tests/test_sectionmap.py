@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for map of named sections in binary content.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import pytest
+
+from h3sed.lib.sectionmap import SectionMap
+
+
+def make_map():
+    """Returns map with header and heroes sections, and unknown regions around heroes."""
+    return SectionMap(100, [("heroes", (40, 70)), ("header", (0, 20))])
+
+
+def test_items():
+    sections = make_map()
+    assert sections.items() == [("header", (0, 20)), ("unknown", (20, 40)),
+                                ("heroes", (40, 70)), ("unknown", (70, 100))]
+    assert SectionMap(10).items() == [("unknown", (0, 10))]
+    assert SectionMap().items() == []
+    assert "heroes" in sections and "towns" not in sections
+
+
+def test_find():
+    sections = make_map()
+    assert sections.find(0) == ("header", (0, 20))
+    assert sections.find(19) == ("header", (0, 20))
+    assert sections.find(20) == ("unknown", (20, 40))
+    assert sections.find(69) == ("heroes", (40, 70))
+    assert sections.find(99) == ("unknown", (70, 100))
+    assert sections.find(100) is None and sections.find(-1) is None
+
+
+def test_add_remove():
+    sections = make_map()
+    sections.add("towns", (20, 40))  # Adjacent on both sides
+    assert sections.get("towns") == (20, 40)
+    sections.add("towns", (80, 120))  # Replaced, growing content size
+    assert sections.get("towns") == (80, 120) and sections.size == 120
+    assert sections.find(30) == ("unknown", (20, 40))
+    sections.remove("towns")
+    sections.remove("towns")
+    assert sections.get("towns") is None
+
+
+@pytest.mark.parametrize("span", [(10, 30), (30, 50), (45, 50), (0, 100), (60, 50)])
+def test_add_overlap(span):
+    sections = make_map()
+    with pytest.raises(ValueError): sections.add("towns", span)
+    assert sections.items() == make_map().items()
+
+
+def test_resize():
+    sections = make_map()
+    sections.resize((50, 52), 12)  # Grown inside heroes
+    assert sections.items() == [("header", (0, 20)), ("unknown", (20, 40)),
+                                ("heroes", (40, 80)), ("unknown", (80, 110))]
+    sections.resize((25, 35), 0)  # Shrunk in unknown region
+    assert sections.items() == [("header", (0, 20)), ("unknown", (20, 30)),
+                                ("heroes", (30, 70)), ("unknown", (70, 100))]
+    sections.resize((30, 40), 10)  # Same size
+    assert sections.get("heroes") == (30, 70)
+    sections.resize((15, 35), 0)  # Partially overlapping both: dropped
+    assert sections.items() == [("unknown", (0, 80))]
+
+
+def test_copy():
+    sections = make_map()
+    other = sections.copy()
+    other.resize((0, 10), 0)
+    other.add("towns", (80, 90))
+    assert sections.items() == make_map().items()
+    assert other.get("heroes") == (30, 60) and "towns" not in sections
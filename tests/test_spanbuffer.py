@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for span overlay of buffer original contents.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import random
+
+from h3sed.lib.spanbuffer import SpanBuffer
+
+
+def patch(view, buffer, start, data):
+    """Records span in view and patches buffer in place."""
+    view.record(start, start + len(data))
+    buffer[start:start + len(data)] = data
+
+
+def test_unpatched():
+    buffer = bytearray(b"0123456789")
+    view = SpanBuffer(buffer, revision=3)
+    assert (len(view), view[:], view[4], view[-1], view.revision) == (10, b"0123456789", 52, 57, 3)
+    assert not view.is_changed() and view.dirty_spans() == []
+
+
+def test_original_contents():
+    buffer = bytearray(b"0123456789")
+    view = SpanBuffer(buffer)
+    patch(view, buffer, 2, b"ab")
+    patch(view, buffer, 3, b"XYZ")  # Overlaps previous patch
+    patch(view, buffer, 8, b"!")
+    assert buffer == b"01aXYZ67!9"
+    assert view[:] == b"0123456789"
+    assert view[3:9] == b"345678"
+    assert view[::2] == b"02468"
+    assert (view[3], view[-2], view[0]) == (ord("3"), ord("8"), ord("0"))
+    assert view.dirty_spans() == [(2, 6), (8, 9)]
+    assert view.is_changed()
+
+
+def test_restored_content_not_dirty():
+    buffer = bytearray(b"0123456789")
+    view = SpanBuffer(buffer)
+    patch(view, buffer, 4, b"ab")
+    patch(view, buffer, 4, b"45")
+    assert not view.is_changed() and view.dirty_spans() == []
+
+
+def test_discard_and_copy():
+    buffer = bytearray(b"0123456789")
+    view = SpanBuffer(buffer)
+    patch(view, buffer, 2, b"abcdef")
+    other = view.copy()
+    view.discard(4, 6)
+    assert view[:] == b"0123cd6789"
+    assert view.dirty_spans() == [(2, 4), (6, 8)]
+    assert other[:] == b"0123456789"
+    view.clear()
+    assert view[:] == bytes(buffer) and not view.is_changed()
+
+
+def test_random_patches():
+    rnd = random.Random(1)
+    original = bytes(bytearray(rnd.randrange(256) for _ in range(1000)))
+    buffer = bytearray(original)
+    view = SpanBuffer(buffer)
+    for _ in range(200):
+        start = rnd.randrange(len(buffer))
+        data = bytes(bytearray(rnd.randrange(256) for _ in range(rnd.randrange(1, 30))))
+        patch(view, buffer, start, data[:len(buffer) - start])
+        lo, hi = sorted(rnd.randrange(len(buffer) + 1) for _ in range(2))
+        assert view[lo:hi] == original[lo:hi]
+    assert view[:] == original
+    for start, end in view.dirty_spans():
+        assert buffer[start:end] != original[start:end]
+    changed = [i for i in range(len(buffer)) if buffer[i] != original[i]]
+    assert all(any(s <= i < e for s, e in view.dirty_spans()) for i in changed)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for fixed-layout binary struct codecs.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import random
+import struct
+
+import pytest
+
+from h3sed.lib import structcodec
+from h3sed.lib.structcodec import StructCodec
+
+
+"""Test field layout, with gaps between fields."""
+FIELDS = {"name": (10, "13s"), "level": (0, "B"), "army": (30, "3L"), "exp": (2, "I"),
+          "flag": (23, "B"), "stats": (24, "4b")}
+
+
+def make_content(size, seed=1):
+    """Returns pseudo-random content of given size."""
+    rnd = random.Random(seed)
+    return bytes(bytearray(rnd.randrange(256) for _ in range(size)))
+
+
+def test_unpack():
+    codec = StructCodec(FIELDS)
+    assert codec.size == 42
+    buffer = bytearray(make_content(50))
+    buffer[0], buffer[2:6], buffer[10:23] = 7, struct.pack("<I", 12345), b"Orrin".ljust(13, b"\0")
+    buffer[23], buffer[24:28] = 1, struct.pack("4b", -1, 2, -3, 4)
+    buffer[30:42] = struct.pack("<3L", 1, 2, 0xFFFFFFFF)
+    values = codec.unpack(buffer)
+    assert values == dict(level=7, exp=12345, name=b"Orrin".ljust(13, b"\0"), flag=1,
+                          stats=(-1, 2, -3, 4), army=(1, 2, 0xFFFFFFFF))
+
+
+def test_pack_roundtrip():
+    codec = StructCodec(FIELDS)
+    buffer = make_content(60)
+    assert codec.pack(buffer, {}) == buffer
+    values = dict(level=99, army=[5, 6, 7], name=b"Valeska", stats=(0, 0, 0, 0))
+    result = codec.pack(buffer, values)
+    assert isinstance(result, bytearray) and len(result) == len(buffer)
+    unpacked = codec.unpack(result)
+    assert unpacked["name"] == b"Valeska".ljust(13, b"\0")
+    assert (unpacked["level"], unpacked["army"], unpacked["stats"]) == (99, (5, 6, 7), (0,) * 4)
+    assert unpacked["exp"] == codec.unpack(buffer)["exp"]
+    for start, end in [(1, 2), (6, 10), (28, 30), (42, 60)]:  # Gaps and tail kept as is
+        assert result[start:end] == buffer[start:end]
+
+
+def test_pack_errors():
+    codec = StructCodec(FIELDS)
+    with pytest.raises(ValueError): codec.pack(make_content(50), {"army": [1, 2]})
+    with pytest.raises(KeyError): codec.pack(make_content(50), {"missing": 1})
+    with pytest.raises(struct.error): codec.pack(make_content(20), {})
+    with pytest.raises(struct.error): codec.pack(make_content(50), {"level": 256})
+
+
+@pytest.mark.parametrize("fields", [{"a": (0, "I"), "b": (3, "B")},
+                                    {"a": (0, "2H"), "b": (2, "H")},
+                                    {"a": (0, "4s"), "b": (0, "B")}])
+def test_overlap(fields):
+    with pytest.raises(ValueError): StructCodec(fields)
+
+
+def test_adjacent():
+    codec = StructCodec({"a": (0, "I"), "b": (4, "B"), "c": (5, "2x"), "d": (7, "H")})
+    assert codec.size == 9
+    assert codec.unpack(b"\x01\0\0\0\x02\xFF\xFF\x03\0") == dict(a=1, b=2, c=(), d=3)
+
+
+def test_unpack_array():
+    numpy = pytest.importorskip("numpy")
+    codec = StructCodec(FIELDS)
+    buffer = make_content(1000)
+    offsets = [0, 100, 17, 958]
+    array = codec.unpack_array(buffer, offsets)
+    assert array.shape == (len(offsets), )
+    for row, offset in zip(array, offsets):
+        values = codec.unpack(buffer[offset:])
+        for name, value in values.items():
+            expected = value if isinstance(value, (bytes, int)) else list(value)
+            actual = row[name].tolist()
+            if isinstance(value, bytes): expected = value.rstrip(b"\0")  # NumPy strips nulls
+            assert actual == expected, name
+    assert len(codec.unpack_array(buffer, [])) == 0
+    assert isinstance(codec.unpack_array(bytearray(buffer), [1]), numpy.ndarray)
+
+
+def test_dtype(monkeypatch):
+    pytest.importorskip("numpy")
+    assert StructCodec(FIELDS).dtype.itemsize == 42
+    with pytest.raises(ValueError): StructCodec({"a": (0, "B2H")}).dtype
+    monkeypatch.setattr(structcodec, "numpy", None)
+    assert StructCodec(FIELDS).dtype is None
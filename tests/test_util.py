@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for miscellaneous utility functions.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created     18.10.2026
+@modified    18.10.2026
+------------------------------------------------------------------------------
+"""
+import os
+
+from h3sed.lib import util
+
+
+def test_replace_file(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    with open(src, "wb") as f: f.write(b"new")
+    with open(dst, "wb") as f: f.write(b"old")
+    util.replace_file(src, dst)
+    assert not os.path.exists(src)
+    with open(dst, "rb") as f: assert f.read() == b"new"
+
+
+def test_replace_file_missing_target(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    with open(src, "wb") as f: f.write(b"new")
+    util.replace_file(src, dst)
+    assert os.listdir(str(tmp_path)) == ["dst"]